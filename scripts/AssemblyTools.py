@@ -0,0 +1,104 @@
+import json
+import os
+
+
+def gfa_to_fasta(gfafile: str, fastafile: str, faifile: str, width: int = 80) -> list:
+    """
+    Write the segments of a GFA file as fasta, wrapped at width bases, together
+    with its samtools style .fai index, in one pass over the GFA.
+
+    args:
+        gfafile -> str: GFA file (e.g. hifiasm p_ctg.gfa)
+        fastafile -> str: output fasta
+        faifile -> str: output .fai index
+        width -> int: bases per fasta line
+    returns:
+        list of the segment lengths, in GFA order
+    """
+    lengths = []
+    offset = 0
+    with open(gfafile, "rb") as gfa, open(fastafile, "wb") as fasta, open(
+        faifile + ".tmp", "w"
+    ) as fai:
+        for line in gfa:
+            if not line.startswith(b"S\t"):
+                continue
+            fields = line.rstrip(b"\r\n").split(b"\t")
+            name, seq = fields[1], fields[2]
+            header = b">" + name + b"\n"
+            fasta.write(header)
+            offset += len(header)
+            linebases = min(width, len(seq))
+            # as write_fai, an empty segment has no lines: 0 bases and 0 bytes per line
+            fai.write(
+                "\t".join(
+                    [
+                        name.decode(),
+                        str(len(seq)),
+                        str(offset),
+                        str(linebases),
+                        str(linebases + 1 if linebases else 0),
+                    ]
+                )
+                + "\n"
+            )
+            for start in range(0, len(seq), width):
+                fasta.write(seq[start : start + width] + b"\n")
+            offset += len(seq) + -(-len(seq) // width)
+            lengths.append(len(seq))
+    os.replace(faifile + ".tmp", faifile)
+    return lengths
+
+
+def assembly_stats(lengths: list, genomesize: int = None) -> dict:
+    """
+    Contiguity statistics of an assembly from its contig lengths, in one pass over
+    the lengths sorted from long to short.
+
+    args:
+        lengths -> list: contig lengths
+        genomesize -> int: expected genome size for NG50/LG50 (optional)
+    returns:
+        dictionary with contigs, total_length, largest, n50, l50, ng50 and lg50
+        (ng50/lg50 None without a genome size or when the assembly is smaller than half of it)
+    """
+    stats = {
+        "contigs": len(lengths),
+        "total_length": sum(lengths),
+        "largest": max(lengths) if lengths else 0,
+        "n50": 0,
+        "l50": 0,
+        "ng50": None,
+        "lg50": None,
+    }
+    cumulative = 0
+    for rank, length in enumerate(sorted(lengths, reverse=True), 1):
+        cumulative += length
+        if not stats["l50"] and 2 * cumulative >= stats["total_length"]:
+            stats["n50"], stats["l50"] = length, rank
+        if genomesize and stats["lg50"] is None and 2 * cumulative >= genomesize:
+            stats["ng50"], stats["lg50"] = length, rank
+    return stats
+
+
+def save_assembly_stats(statsfile: str, stats: dict):
+    """
+    args:
+        statsfile -> str: output json
+        stats -> dict: assembly_stats output
+    """
+    with open(statsfile, "w") as f:
+        json.dump(stats, f)
+
+
+def load_assembly_stats(statsfile: str) -> dict:
+    """
+    args:
+        statsfile -> str: json written by save_assembly_stats
+    returns:
+        assembly_stats output, None when the file is missing or empty
+    """
+    if not os.path.exists(statsfile) or os.path.getsize(statsfile) == 0:
+        return None
+    with open(statsfile, "r") as f:
+        return json.load(f)
@@ -0,0 +1,86 @@
+from __future__ import division
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from FastaTools import read_fasta
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", type=str, action='store', dest='fasta', nargs='+', metavar='FASTA',help='define contig fasta files of the genera, in {workingdirectory}/{genus}/')
+parser.add_argument("-r", type=str, action='store', dest='workdir', metavar='WORKDIR',help='define working directory holding the genus directories')
+parser.add_argument("-l", type=str, action='store', dest='lineages', metavar='LINEAGES',help='define table of genus and lineage dataset (BuscoLineage.py output)')
+parser.add_argument("-d", type=str, action='store', dest='dir', metavar='BATCHDIR',help='define output directory, gets {dataset}.full_table.tsv per lineage dataset')
+parser.add_argument("-dl", type=str, action='store', dest='download', help='define directory of the staged busco dbs')
+parser.add_argument("-c", type=int, action='store', dest='cpu', default=1, help='define total number of threads')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def readLineages(lineagefile):
+    '''
+    input:
+    - BuscoLineage.py output
+    output:
+    - dictionary of form {genus: dataset}
+    '''
+    lineages = {}
+    with open(lineagefile, 'r') as m:
+        for line in m:
+            name, dataset = line.rstrip('\n').split('\t')
+            lineages[name] = dataset
+    return lineages
+
+def writeBatch(batchfasta, members):
+    '''
+    input:
+    - fasta file of the batch
+    - list of (genus, contig fasta file)
+    output:
+    - fasta file with all contigs, headers prefixed with '{genus}.'
+    '''
+    with open(batchfasta, 'w') as k:
+        for genus, fastafile in members:
+            for name, seq in read_fasta(fastafile):
+                k.write('>' + genus + '.' + name + '\n' + seq.decode() + '\n')
+
+def runBatch(dataset, cpu):
+    '''
+    input:
+    - lineage dataset of the batch
+    - number of threads of this run
+    output:
+    - dataset (None when BUSCO failed); the table is moved to {dataset}.full_table.tsv
+    '''
+    prefix = os.path.join(args.dir, dataset)
+    subprocess.run(['python', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'BuscoConfig.py'), '-b', dataset, '-f', prefix + '.fa', '-d', prefix, '-dl', args.download, '-c', str(cpu), '-o', prefix + '.ini'], check=True)
+    subprocess.run(['busco', '--config', prefix + '.ini', '-f'])
+    runs = glob.glob(prefix + '/busco/run_*/full_table.tsv')
+    if not runs:
+        sys.stderr.write('[Warning] BUSCO did not finish on ' + prefix + '.fa\n')
+        return None
+    shutil.move(runs[0], prefix + '.full_table.tsv')
+    shutil.rmtree(prefix)
+    os.remove(prefix + '.fa')
+    os.remove(prefix + '.ini')
+    return dataset
+
+lineages = readLineages(args.lineages)
+batches = {}
+for fastafile in args.fasta:
+    if os.path.getsize(fastafile) > 0:
+        genus = os.path.relpath(fastafile, args.workdir).split(os.sep)[0]
+        batches.setdefault(lineages[genus], []).append((genus, fastafile))
+
+os.makedirs(args.dir, exist_ok=True)
+for dataset, members in batches.items():
+    print(dataset + '\t' + ','.join(genus for genus, fastafile in members))
+    writeBatch(os.path.join(args.dir, dataset + '.fa'), members)
+
+#one BUSCO run per lineage dataset; the threads are split over the runs in parallel
+workers = min(max(args.cpu // 4, 1), max(len(batches), 1))
+cpu = max(args.cpu // workers, 1)
+with ThreadPoolExecutor(max_workers=workers) as pool:
+    for done in as_completed([pool.submit(runBatch, dataset, cpu) for dataset in batches]):
+        done.result()
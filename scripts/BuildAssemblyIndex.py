@@ -0,0 +1,97 @@
+from __future__ import division
+import argparse
+import os
+from collections import Counter
+import numpy as np
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-r", type=str, action='store', dest='refseq', metavar='REFSEQ',help='define assembly_summary_refseq.txt')
+parser.add_argument("-g", type=str, action='store', dest='genbank', metavar='GENBANK',help='define assembly_summary_genbank.txt')
+parser.add_argument("-no", type=str, action='store', dest='nodesfile', metavar='NODES',help='NCBI nodes.dmp')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define assembly availability index')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def readNodes(nodes_tax_file):
+    '''
+    input:
+    - nodes.dmp (NCBI Taxonomy)
+    output:
+    - array of taxids
+    - array of form parent[node], -1 for taxids not in nodes.dmp
+    '''
+    nodes = []
+    parents = []
+    with open(nodes_tax_file, 'r') as nodes_tax:
+        for line in nodes_tax:
+            node = line.split('\t|\t', 2)
+            nodes.append(int(node[0]))
+            parents.append(int(node[1]))
+    nodes = np.array(nodes, dtype=np.int64)
+    tax_parents = np.full(nodes.max() + 1, -1, dtype=np.int64)
+    tax_parents[nodes] = parents
+    return nodes, tax_parents
+
+def countAssemblies(summaryfile, size, paired=None):
+    '''
+    input:
+    - NCBI assembly summary file
+    - length of the taxid array
+    - set of accessions (without version) already counted; assemblies paired with one of them (gbrs_paired_asm) are skipped
+    output:
+    - array of form count[taxid] with the number of assemblies of every taxid
+    - set of the accessions (without version) counted
+    '''
+    taxids = Counter()
+    accessions = set()
+    with open(summaryfile, 'r') as f:
+        for line in f:
+            if not line.startswith('#'):
+                fields = line.split('\t', 18)
+                if paired is not None and fields[17].split('.')[0] in paired:
+                    continue
+                accessions.add(fields[0].split('.')[0])
+                taxids[fields[5]] += 1
+    counts = np.zeros(size, dtype=np.int64)
+    for taxid, n in taxids.items():
+        if taxid.isdigit() and int(taxid) < size:
+            counts[int(taxid)] += n
+    return counts, accessions
+
+def aggregate(nodes, tax_parents, counts):
+    '''
+    input:
+    - array of taxids and parent array (readNodes output)
+    - array of form count[taxid]
+    output:
+    - array of form count[taxid] holding the count of the taxid and all its descendants
+    '''
+    depth = np.zeros(len(nodes), dtype=np.int64)
+    current = nodes.copy()
+    active = tax_parents[current] != current
+    while active.any():
+        current[active] = tax_parents[current[active]]
+        depth[active] += 1
+        active[active] = tax_parents[current[active]] != current[active]
+    total = counts.copy()
+    #children pass their totals to their parents, deepest level first
+    order = np.argsort(-depth, kind='stable')
+    levels = np.flatnonzero(np.diff(depth[order])) + 1
+    for level in np.split(order, levels):
+        level = level[depth[level] > 0]
+        np.add.at(total, tax_parents[nodes[level]], total[nodes[level]])
+    return total
+
+nodes, taxparents = readNodes(args.nodesfile)
+refseqcounts, refseqaccessions = countAssemblies(args.refseq, len(taxparents))
+refseq = aggregate(nodes, taxparents, refseqcounts)
+#a genbank assembly with a refseq copy is counted once
+genbankcounts = countAssemblies(args.genbank, len(taxparents), refseqaccessions)[0]
+allsources = refseq + aggregate(nodes, taxparents, genbankcounts)
+
+k = open(args.out + '.tmp', 'w')
+k.write('#taxid\trefseq\tall_unique\n')
+for taxid in np.flatnonzero(allsources):
+    k.write(str(taxid) + '\t' + str(refseq[taxid]) + '\t' + str(allsources[taxid]) + '\n')
+k.close()
+os.replace(args.out + '.tmp', args.out)
@@ -5,22 +5,6 @@ import os
 import sys
 
 parser = argparse.ArgumentParser()
-parser.add_argument(
-    "-na",
-    type=str,
-    action="store",
-    dest="namesfile",
-    metavar="NAMES",
-    help="NCBI names.dmp",
-)
-parser.add_argument(
-    "-no",
-    type=str,
-    action="store",
-    dest="nodesfile",
-    metavar="NODES",
-    help="NCBI nodes.dmp",
-)
 parser.add_argument(
     "-f",
     type=str,
@@ -38,7 +22,20 @@ parser.add_argument(
     help="define working directory for busco",
 )
 parser.add_argument(
-    "-db", type=str, action="store", dest="db", help="define available dbs file"
+    "-l",
+    type=str,
+    action="store",
+    dest="lineages",
+    metavar="LINEAGES",
+    help="define table of genus and lineage dataset (BuscoLineage.py output)",
+)
+parser.add_argument(
+    "-b",
+    type=str,
+    action="store",
+    dest="dataset",
+    metavar="DATASET",
+    help="define lineage dataset (instead of the dataset of the genus in -l)",
 )
 parser.add_argument(
     "-dl",
@@ -59,81 +56,19 @@ parser.add_argument(
 parser.add_argument("--version", action="version", version="%(prog)s 1.0")
 args = parser.parse_args()
 
+if args.dataset:
+    buscoset = args.dataset
+else:
+    genus = args.out.split("/config")[0].split("/")[-1]
 
-def readNames(names_tax_file):
-    """
-    input:
-    - name.dmp (NCBI Taxonomy)
-    output:
-    - dictionary of form {node: name}
-    - dictionary of form {sci name: node}
-    """
-    tax_names = {}
-    tax_names_reverse = {}
-    with open(names_tax_file, "r") as nodes_tax:
-        for line in nodes_tax:
-            node = [field.strip() for field in line.split("|")]
-            if "scientific" in line:
-                tax_names[node[1]] = node[0]
-                tax_names_reverse[node[0]] = node[1]
-    return tax_names_reverse, tax_names
-
-
-def readNodes(nodes_tax_file):
-    """
-    input:
-    - nodes.dmp (NCBI Taxonomy)
-    output:
-    - dictionary of form {parent: node}
-    - dictionary of form {node: type}
-    """
-
-    tax_nodes = {}
-    tax_types = {}
-    with open(nodes_tax_file, "r") as nodes_tax:
-        for line in nodes_tax:
-            node = [field.strip() for field in line.split("|")]  # make list of line
-            tax_nodes[node[0]] = node[1]  # couple node with parent
-            tax_types[node[0]] = node[2]  # couple node with rank
-    return tax_nodes
-
-
-taxparents = readNodes(args.nodesfile)
-taxnames, namestax = readNames(args.namesfile)
-
-genus = args.out.split("/config")[0].split("/")[-1]
-if "_" in genus:
-    genus = genus.replace("_", " ")
-
-busco_dbs = []
-busco_short = []
-m = open(args.db, "r")
-for line in m:
-    line = line.strip()
-    if "db" in line:
-        # if 'eukaryota' in line:
-        #    break
-        dbname = line.split(" ")[-1].split("_odb")[0]
-        # print(dbname)
-        dbname2 = line.split(" ")[-1].split("_")[0]
-        busco_short.append(dbname2)
-        busco_dbs.append(dbname)
-
-buscoset = "Bacteria"
-if genus in namestax:
-    taxid = namestax[genus]
-    parent = taxparents[taxid]
-    while parent != taxparents[parent]:
-        print(taxnames[parent])
-        if taxnames[parent].lower() in busco_short:
-            buscoset = taxnames[parent]
-            print(buscoset)
-            if taxnames[parent].lower() + "_phylum" in busco_dbs:
-                buscoset = taxnames[parent].lower() + "_phylum"
-            break
-        parent = taxparents[parent]
+    lineages = {}
+    with open(args.lineages, "r") as m:
+        for line in m:
+            name, dataset = line.rstrip("\n").split("\t")
+            lineages[name] = dataset
+    buscoset = lineages[genus]
 
-print(genus + "\t" + buscoset)
+    print(genus + "\t" + buscoset)
 
 condadir = os.environ["CONDA_DEFAULT_ENV"]
 
@@ -144,8 +79,8 @@ in = {args.genome}
 out = busco
 # Where to store the output directory
 out_path = {args.dir}
-# Path to the BUSCO dataset
-lineage_dataset = {buscoset.lower()}
+# Path to the BUSCO dataset, staged in the download path beforehand
+lineage_dataset = {os.path.join(args.download, "lineages", buscoset)}
 # Which mode to run (genome / proteins / transcriptome)
 mode = genome
 # How many threads to use for multithreaded steps
@@ -154,6 +89,8 @@ cpu = {args.cpu}
 ;force = False
 # Local destination path for downloaded lineage datasets
 download_path = {args.download}
+# Use the staged lineage dataset without checking for updates (True/False)
+offline = True
 ;[tblastn]
 ;path = {condadir}/bin/
 ;command = tblastn
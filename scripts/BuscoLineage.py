@@ -0,0 +1,170 @@
+from __future__ import division
+import argparse
+import hashlib
+import json
+import os
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "-g",
+    type=str,
+    action="store",
+    dest="genera",
+    nargs="+",
+    metavar="GENUS",
+    help="define genera (names of the genus directories)",
+)
+parser.add_argument(
+    "-na",
+    type=str,
+    action="store",
+    dest="namesfile",
+    metavar="NAMES",
+    help="NCBI names.dmp",
+)
+parser.add_argument(
+    "-no",
+    type=str,
+    action="store",
+    dest="nodesfile",
+    metavar="NODES",
+    help="NCBI nodes.dmp",
+)
+parser.add_argument(
+    "-db", type=str, action="store", dest="db", help="define available dbs file"
+)
+parser.add_argument(
+    "-j",
+    type=str,
+    action="store",
+    dest="cache",
+    metavar="CACHE",
+    help="define cache of the genus to lineage dataset mapping",
+)
+parser.add_argument(
+    "-o",
+    type=str,
+    action="store",
+    dest="out",
+    metavar="OUTFILE",
+    help="define table of genus and lineage dataset",
+)
+parser.add_argument("--version", action="version", version="%(prog)s 1.0")
+args = parser.parse_args()
+
+
+def readNames(names_tax_file):
+    """
+    input:
+    - name.dmp (NCBI Taxonomy)
+    output:
+    - dictionary of form {node: name}
+    - dictionary of form {sci name: node}
+    """
+    tax_names = {}
+    tax_names_reverse = {}
+    with open(names_tax_file, "r") as nodes_tax:
+        for line in nodes_tax:
+            node = [field.strip() for field in line.split("|")]
+            if "scientific" in line:
+                tax_names[node[1]] = node[0]
+                tax_names_reverse[node[0]] = node[1]
+    return tax_names_reverse, tax_names
+
+
+def readNodes(nodes_tax_file):
+    """
+    input:
+    - nodes.dmp (NCBI Taxonomy)
+    output:
+    - dictionary of form {node: parent}
+    """
+    tax_nodes = {}
+    with open(nodes_tax_file, "r") as nodes_tax:
+        for line in nodes_tax:
+            node = [field.strip() for field in line.split("|")]  # make list of line
+            tax_nodes[node[0]] = node[1]  # couple node with parent
+    return tax_nodes
+
+
+def readDatasets(dbfile):
+    """
+    input:
+    - busco --list-datasets output
+    output:
+    - dictionary of form {dataset name without _odb version: dataset name}
+    - list of the dataset names up to the first '_'
+    """
+    busco_dbs = {}
+    busco_short = []
+    with open(dbfile, "r") as m:
+        for line in m:
+            line = line.strip()
+            if "db" in line:
+                dataset = line.split(" ")[-1]
+                busco_dbs[dataset.split("_odb")[0]] = dataset
+                busco_short.append(dataset.split("_")[0])
+    return busco_dbs, busco_short
+
+
+def resolveLineage(genus, taxparents, taxnames, namestax, busco_dbs, busco_short):
+    """
+    input:
+    - genus (or family) name
+    - taxonomy (readNodes and readNames output)
+    - available datasets (readDatasets output)
+    output:
+    - dataset of the closest ancestor with a BUSCO dataset, bacteria when there is none
+    """
+    buscoset = "Bacteria"
+    if genus in namestax:
+        taxid = namestax[genus]
+        parent = taxparents[taxid]
+        while parent != taxparents[parent]:
+            if taxnames[parent].lower() in busco_short:
+                buscoset = taxnames[parent]
+                if taxnames[parent].lower() + "_phylum" in busco_dbs:
+                    buscoset = taxnames[parent].lower() + "_phylum"
+                break
+            parent = taxparents[parent]
+    return busco_dbs.get(buscoset.lower(), buscoset.lower())
+
+
+# the mapping depends on the dataset list and the taxonomy; when either changes the cache starts over
+with open(args.db, "rb") as f:
+    key = (
+        hashlib.sha1(f.read()).hexdigest()
+        + " "
+        + str(int(os.path.getmtime(args.namesfile)))
+    )
+cache = {"key": key, "genera": {}}
+if os.path.exists(args.cache):
+    with open(args.cache, "r") as f:
+        cached = json.load(f)
+    if cached["key"] == key:
+        cache = cached
+
+# the taxonomy is only loaded for genera that were not resolved before
+missing = [genus for genus in args.genera if genus not in cache["genera"]]
+if missing:
+    taxparents = readNodes(args.nodesfile)
+    taxnames, namestax = readNames(args.namesfile)
+    busco_dbs, busco_short = readDatasets(args.db)
+    for genus in missing:
+        cache["genera"][genus] = resolveLineage(
+            genus.replace("_", " "),
+            taxparents,
+            taxnames,
+            namestax,
+            busco_dbs,
+            busco_short,
+        )
+    tmpfile = args.cache + "." + str(os.getpid()) + ".tmp"
+    with open(tmpfile, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmpfile, args.cache)
+
+with open(args.out, "w") as k:
+    for genus in args.genera:
+        print(genus + "\t" + cache["genera"][genus])
+        k.write(genus + "\t" + cache["genera"][genus] + "\n")
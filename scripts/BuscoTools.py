@@ -0,0 +1,229 @@
+import numpy as np
+
+STATUSORDER = ["Complete", "Duplicated", "Fragmented", "Missing"]
+
+
+def read_full_table(tablefile: str, genes: dict, header: list):
+    """
+    Add the rows of a BUSCO full_table.tsv to a dictionary of genes. Missing
+    genes are added without rows, so every searched gene is listed.
+
+    args:
+        tablefile -> str: BUSCO full_table.tsv
+        genes -> dict: dictionary of form {gene: [rows of found copies]}, rows as lists of fields
+        header -> list: list to add the comment lines to, only filled when it is empty
+    """
+    fill = not header
+    with open(tablefile, "r") as f:
+        for line in f:
+            if line.startswith("#"):
+                if fill:
+                    header.append(line)
+                continue
+            fields = line.rstrip("\n").split("\t")
+            genes.setdefault(fields[0], [])
+            if fields[1] != "Missing":
+                genes[fields[0]].append(fields)
+
+
+def gene_status(rows: list):
+    """
+    Status of a gene from all its found copies, as BUSCO assigns it: Duplicated
+    for more than one complete copy, Fragmented when only fragments were found.
+
+    args:
+        rows -> list: rows of the found copies of a gene
+    returns:
+        status of the gene
+    """
+    complete = [row for row in rows if row[1] in ("Complete", "Duplicated")]
+    if len(complete) > 1:
+        return "Duplicated"
+    if complete:
+        return "Complete"
+    if rows:
+        return "Fragmented"
+    return "Missing"
+
+
+def status_counts(genes: dict):
+    """
+    args:
+        genes -> dict: dictionary of form {gene: [rows of found copies]}
+    returns:
+        dictionary of form {status: number of genes}
+    """
+    counts = dict((status, 0) for status in STATUSORDER)
+    for rows in genes.values():
+        counts[gene_status(rows)] += 1
+    return counts
+
+
+def write_full_table(tablefile: str, header: list, genes: dict):
+    """
+    Write genes as a BUSCO full_table.tsv, with the statuses recomputed over all
+    rows of every gene. A fragmented gene keeps its first fragment only.
+
+    args:
+        tablefile -> str: output table
+        header -> list: comment lines of the table
+        genes -> dict: dictionary of form {gene: [rows of found copies]}
+    """
+    with open(tablefile, "w") as k:
+        for line in header:
+            k.write(line)
+        for gene, rows in genes.items():
+            status = gene_status(rows)
+            if status == "Missing":
+                k.write(gene + "\tMissing\n")
+            elif status == "Fragmented":
+                k.write("\t".join([gene, status] + rows[0][2:]) + "\n")
+            else:
+                for row in rows:
+                    if row[1] in ("Complete", "Duplicated"):
+                        k.write("\t".join([gene, status] + row[2:]) + "\n")
+
+
+def write_summary(summaryfile: str, header: list, genes: dict, note: str):
+    """
+    Write a short summary in the BUSCO layout, the one-line score on its own
+    tab-indented line.
+
+    args:
+        summaryfile -> str: output summary
+        header -> list: comment lines of the table, the lineage dataset line is kept
+        genes -> dict: dictionary of form {gene: [rows of found copies]}
+        note -> str: comment line on how the results were obtained
+    """
+    counts = status_counts(genes)
+    n = sum(counts.values())
+    pct = dict(
+        (status, 100 * counts[status] / n if n else 0.0) for status in STATUSORDER
+    )
+    with open(summaryfile, "w") as k:
+        for line in header:
+            if "lineage dataset" in line:
+                k.write(line)
+        k.write("# " + note + "\n\n")
+        k.write(
+            "\tC:{:.1f}%[S:{:.1f}%,D:{:.1f}%],F:{:.1f}%,M:{:.1f}%,n:{}\n".format(
+                pct["Complete"] + pct["Duplicated"],
+                pct["Complete"],
+                pct["Duplicated"],
+                pct["Fragmented"],
+                pct["Missing"],
+                n,
+            )
+        )
+        k.write(
+            "\t"
+            + str(counts["Complete"] + counts["Duplicated"])
+            + "\tComplete BUSCOs (C)\n"
+        )
+        k.write(
+            "\t" + str(counts["Complete"]) + "\tComplete and single-copy BUSCOs (S)\n"
+        )
+        k.write(
+            "\t" + str(counts["Duplicated"]) + "\tComplete and duplicated BUSCOs (D)\n"
+        )
+        k.write("\t" + str(counts["Fragmented"]) + "\tFragmented BUSCOs (F)\n")
+        k.write("\t" + str(counts["Missing"]) + "\tMissing BUSCOs (M)\n")
+        k.write("\t" + str(n) + "\tTotal BUSCO groups searched\n")
+
+
+def contig_of(sequence: str, contigs):
+    """
+    Contig of a BUSCO sequence name, matched exactly against the contig names
+    of the searched fasta. The name is the contig itself, or the contig with a
+    '_{gene number}' (prodigal) or ':{start}-{end}' (metaeuk) suffix; the
+    longest known contig name followed by such a suffix is taken.
+
+    args:
+        sequence -> str: Sequence column of full_table.tsv
+        contigs -> set/dict: contig names (e.g. read_fai output)
+    returns:
+        contig name, None when no contig matches
+    """
+    if sequence in contigs:
+        return sequence
+    for cut in range(len(sequence) - 1, 0, -1):
+        if sequence[cut] in "_:" and sequence[:cut] in contigs:
+            return sequence[:cut]
+    return None
+
+
+def read_busco_hits(tablefile: str, contigs) -> dict:
+    """
+    Parse a BUSCO full_table.tsv in one pass into typed columns of the found
+    gene copies, with every sequence mapped to its contig (contig_of).
+
+    args:
+        tablefile -> str: BUSCO full_table.tsv
+        contigs -> set/dict: contig names of the searched fasta
+    returns:
+        dictionary with "genes" (all searched genes, in table order) and the
+        columns "gene", "status", "contig" (str arrays), "start", "end"
+        (int arrays) and "score" (float array) of the found copies; copies on
+        unknown contigs are left out
+    """
+    genes = {}
+    rows = []
+    with open(tablefile, "r") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            genes[fields[0]] = None
+            if fields[1] == "Missing":
+                continue
+            contig = contig_of(fields[2], contigs)
+            if contig is None:
+                continue
+            rows.append(
+                (
+                    fields[0],
+                    fields[1],
+                    contig,
+                    int(fields[3]),
+                    int(fields[4]),
+                    float(fields[6]),
+                )
+            )
+    columns = list(zip(*rows)) if rows else [[]] * 6
+    return {
+        "genes": list(genes),
+        "gene": np.array(columns[0], dtype=str),
+        "status": np.array(columns[1], dtype=str),
+        "contig": np.array(columns[2], dtype=str),
+        "start": np.array(columns[3], dtype=np.int64),
+        "end": np.array(columns[4], dtype=np.int64),
+        "score": np.array(columns[5], dtype=np.float64),
+    }
+
+
+def genes_per_contig(hits: dict) -> dict:
+    """
+    args:
+        hits -> dict: read_busco_hits output
+    returns:
+        dictionary of form {contig: set of genes found on it}
+    """
+    contiggenes = {}
+    for contig, gene in zip(hits["contig"].tolist(), hits["gene"].tolist()):
+        contiggenes.setdefault(contig, set()).add(gene)
+    return contiggenes
+
+
+def duplicated_copies(hits: dict) -> dict:
+    """
+    args:
+        hits -> dict: read_busco_hits output
+    returns:
+        dictionary of form {gene: [(contig, start, end)]} of the duplicated genes
+    """
+    copies = {}
+    for i in np.flatnonzero(hits["status"] == "Duplicated"):
+        copies.setdefault(str(hits["gene"][i]), []).append(
+            (str(hits["contig"][i]), int(hits["start"][i]), int(hits["end"][i]))
+        )
+    return copies
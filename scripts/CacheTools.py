@@ -0,0 +1,152 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+
+from FastaTools import read_fasta
+
+
+# Caches of per-sequence results (SSU classifications, contig coverage by
+# reference genomes) in datadir, shared by the runs of the pipeline
+
+
+def sequence_hash(seq: bytes) -> str:
+    """
+    sha1 of a sequence, ignoring case, used as key of the cache.
+    """
+    return hashlib.sha1(seq.upper()).hexdigest()
+
+
+def library_key(fastafile: str, blockbytes: int = 1 << 24) -> str:
+    """
+    Key of a library of versioned sequences (e.g. reference genomes): the
+    sha1 of its sorted sequence ids. A versioned accession always names the
+    same sequence, so only the headers are read, not the sequences.
+
+    args:
+        fastafile -> str: fasta file with accession.version sequence ids
+        blockbytes -> int: bytes read at once
+    """
+    ids = []
+    tail = b"\n"
+    with open(fastafile, "rb") as f:
+        for block in iter(lambda: f.read(blockbytes), b""):
+            block = tail + block
+            end = block.rfind(b"\n")
+            ids.extend(re.findall(rb"\n>(\S*)", block[: end + 1]))
+            tail = block[end:]
+    ids.extend(re.findall(rb"\n>(\S*)", tail))
+    return hashlib.sha1(b"\n".join(sorted(ids))).hexdigest()
+
+
+def cache_file(cachedir: str, name: str, key: str) -> str:
+    """
+    Path of the cache of one classifier or aligner; key holds everything the
+    results depend on (database version, parameters), so a changed key starts
+    a new cache.
+
+    args:
+        cachedir -> str: cache directory (in datadir)
+        name -> str: classifier or aligner name, e.g. sina
+        key -> str: database version and parameters
+    """
+    return os.path.join(cachedir, name + "." + hashlib.sha1(key.encode()).hexdigest()[:16] + ".json")
+
+
+def load_cache(cachefile: str) -> dict:
+    """
+    Load a cache; a missing file is an empty cache.
+
+    returns:
+        dictionary of form {"header": header line or None, "rows": {sequence hash: [row without sequence name]}}
+    """
+    if not os.path.exists(cachefile):
+        return {"header": None, "rows": {}}
+    with open(cachefile, "r") as f:
+        return json.load(f)
+
+
+def save_cache(cachefile: str, cache: dict):
+    """
+    Write a cache, keeping entries another run added in the
+    meantime, and replace the old file in one rename. A lock file next to the
+    cache is held from reading to replacing, so runs saving at the same time
+    do not drop each other's entries.
+    """
+    os.makedirs(os.path.dirname(cachefile), exist_ok=True)
+    with open(cachefile + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        current = load_cache(cachefile)
+        current["rows"].update(cache["rows"])
+        if cache["header"] is not None:
+            current["header"] = cache["header"]
+        tmpfile = cachefile + "." + str(os.getpid()) + ".tmp"
+        with open(tmpfile, "w") as f:
+            json.dump(current, f)
+        os.replace(tmpfile, cachefile)
+        fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def cache_lookup(fastafile: str, cache: dict, missesfile: str) -> int:
+    """
+    Write the sequences of a fasta file that are not in a cache.
+
+    args:
+        fastafile -> str: sequences to classify
+        cache -> dict: load_cache output
+        missesfile -> str: fasta output of the uncached sequences
+    returns:
+        number of uncached sequences
+    """
+    misses = 0
+    with open(missesfile, "w") as out:
+        for name, seq in read_fasta(fastafile):
+            if sequence_hash(seq) not in cache["rows"]:
+                out.write(">" + name + "\n" + seq.decode() + "\n")
+                misses += 1
+    return misses
+
+
+def cache_merge(fastafile: str, cache: dict, resultsfile: str, outfile: str, sep: str = "\t", header: bool = False) -> dict:
+    """
+    Combine cached results and the classifier output for the uncached
+    sequences into one output in fasta order. Uncached sequences without
+    results are returned with no rows, so they are not classified again.
+
+    args:
+        fastafile -> str: sequences to classify
+        cache -> dict: load_cache output
+        resultsfile -> str: classifier output for the uncached sequences, sequence name in the first column
+        outfile -> str: merged output
+        sep -> str: column separator of the classifier output
+        header -> bool: classifier output starts with a header line
+    returns:
+        cache of the new results, for save_cache
+    """
+    headerline = None
+    newrows = {}
+    with open(resultsfile, "r") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if header and headerline is None:
+                headerline = line
+                continue
+            name, rest = line.split(sep, 1)
+            newrows.setdefault(name, []).append(rest)
+    if headerline is None:
+        headerline = cache["header"]
+    added = {"header": headerline, "rows": {}}
+    with open(outfile, "w") as out:
+        if header and headerline is not None:
+            out.write(headerline + "\n")
+        for name, seq in read_fasta(fastafile):
+            seqhash = sequence_hash(seq)
+            if seqhash in cache["rows"]:
+                rows = cache["rows"][seqhash]
+            else:
+                rows = newrows.get(name, [])
+                added["rows"][seqhash] = rows
+            for rest in rows:
+                out.write(name + sep + rest + "\n")
+    return added
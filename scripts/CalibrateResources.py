@@ -0,0 +1,54 @@
+from __future__ import division
+import argparse
+import glob
+import os
+from ResourceTools import add_benchmark, fit_resource_model, load_resource_model, save_resource_model
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-b", type=str, action='store', dest='benchdir', metavar='BENCHDIR',help='define directory of the {rule}.{genus}.tsv snakemake benchmarks and {rule}.{genus}.size input sizes (bytes; for jobs running several programs at once followed by the bytes of one run and the number of runs)')
+parser.add_argument("-m", type=str, action='store', dest='model', metavar='MODEL',help='define resource model json, updated with the benchmarks')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def readBenchmark(benchfile):
+    '''
+    input:
+    - snakemake benchmark file
+    output:
+    - cpu seconds (wall time times mean load when cpu_time is not reported) and peak memory (MB), None when not measured
+    '''
+    with open(benchfile, 'r') as f:
+        header = f.readline().rstrip('\n').split('\t')
+        values = dict(zip(header, f.readline().rstrip('\n').split('\t')))
+    try:
+        if 'cpu_time' in values:
+            cpu_s = float(values['cpu_time'])
+        else:
+            cpu_s = float(values['s']) * float(values['mean_load']) / 100
+        return cpu_s, float(values['max_rss'])
+    except (KeyError, ValueError):
+        return None
+
+model = load_resource_model(args.model)
+added = 0
+for benchfile in sorted(glob.glob(os.path.join(args.benchdir, '*.tsv'))):
+    rule = os.path.basename(benchfile).split('.')[0]
+    sizefile = benchfile[:-len('.tsv')] + '.size'
+    if rule not in model['rules'] or not os.path.exists(sizefile):
+        continue
+    measured = readBenchmark(benchfile)
+    with open(sizefile, 'r') as f:
+        sizes = f.read().split() or ['0']
+    size = int(sizes[0]) / 1e6
+    if measured is None or size == 0:
+        continue
+    runsize, runs = (int(sizes[1]) / 1e6, int(sizes[2])) if len(sizes) == 3 else (None, 1)
+    key = os.path.abspath(benchfile) + ' ' + str(int(os.path.getmtime(benchfile)))
+    if add_benchmark(model, rule, key, size, measured[0], measured[1], runsize, runs):
+        added = added + 1
+
+fit_resource_model(model)
+save_resource_model(args.model, model)
+print('Added ' + str(added) + ' benchmarks to ' + args.model)
+for rule, coef in sorted(model['rules'].items()):
+    print(rule + '\t' + str(len(model['points'].get(rule, []))) + ' benchmarks\tcpu ' + "{:.1f}".format(coef['cpu_s']) + 's + ' + "{:.2f}".format(coef['cpu_s_per_mb']) + 's/MB\tmemory ' + "{:.0f}".format(coef['mem_mb']) + 'MB + ' + "{:.2f}".format(coef['mem_mb_per_mb']) + 'MB/MB')
@@ -0,0 +1,117 @@
+from __future__ import division
+import argparse
+import configparser
+import glob
+import os
+import random
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from BuscoTools import read_full_table, status_counts, write_full_table, write_summary
+from FastaTools import read_fasta
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", type=str, action='store', dest='config', metavar='CONFIG',help='define BUSCO config of the read set (BuscoConfig.py output)')
+parser.add_argument("-n", type=int, action='store', dest='chunksize', default=20000, help='define number of reads per chunk (default 20000)')
+parser.add_argument("-c", type=int, action='store', dest='cpu', default=1, help='define total number of threads')
+parser.add_argument("-w", type=int, action='store', dest='workers', default=0, help='define number of BUSCO runs at the same time (default: one per 4 threads)')
+parser.add_argument("-s", type=float, action='store', dest='stable', default=0, help='define change in completeness (percentage points) below which no more chunks are started once two chunks in a row changed it less (default 0: run all chunks)')
+parser.add_argument("-t", type=str, action='store', dest='table', metavar='TABLE',help='define merged full_table.tsv')
+parser.add_argument("-o", type=str, action='store', dest='summary', metavar='SUMMARY',help='define merged short summary')
+parser.add_argument("-b", type=str, action='store', dest='benchsize', metavar='BENCHSIZE',help='define file to write the input bytes, the input bytes of one BUSCO run and the number of runs at the same time to (used by CalibrateResources)')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def writeChunks(fastafile, chunkprefix, chunksize):
+    '''
+    input:
+    - fasta file of reads
+    - prefix of chunk files
+    - number of reads per chunk
+    output:
+    - list of chunk fasta files; reads are spread randomly, so every chunk is a random subsample
+    '''
+    reads = [name for name, seq in read_fasta(fastafile)]
+    nchunks = max(-(-len(reads) // chunksize), 1)
+    random.seed(len(reads))
+    assignment = [i % nchunks for i in range(len(reads))]
+    random.shuffle(assignment)
+    chunks = [chunkprefix + '.' + str(i) + '.fa' for i in range(nchunks)]
+    handles = [open(chunk, 'w') for chunk in chunks]
+    for chunk, (name, seq) in zip(assignment, read_fasta(fastafile)):
+        handles[chunk].write('>' + name + '\n' + seq.decode() + '\n')
+    for handle in handles:
+        handle.close()
+    return chunks
+
+def runChunk(config, chunk, cpu):
+    '''
+    input:
+    - BUSCO config of the read set
+    - chunk fasta file
+    - number of threads of this run
+    output:
+    - run directory of the chunk (None when BUSCO failed)
+    '''
+    chunkconfig = configparser.ConfigParser()
+    chunkconfig.read_dict(config)
+    rundir = chunk[:-len('.fa')]
+    chunkconfig['busco_run']['in'] = chunk
+    chunkconfig['busco_run']['out'] = os.path.basename(rundir)
+    chunkconfig['busco_run']['out_path'] = os.path.dirname(rundir)
+    chunkconfig['busco_run']['cpu'] = str(cpu)
+    with open(rundir + '.ini', 'w') as f:
+        chunkconfig.write(f)
+    subprocess.run(['busco', '--config', rundir + '.ini', '-f'])
+    runs = glob.glob(rundir + '/run_*/full_table.tsv')
+    if not runs:
+        sys.stderr.write('[Warning] BUSCO did not finish on ' + chunk + '\n')
+        return None
+    return os.path.dirname(runs[0])
+
+config = configparser.ConfigParser()
+config.read(args.config)
+chunkdir = os.path.join(config['busco_run']['out_path'], 'chunks')
+os.makedirs(chunkdir, exist_ok=True)
+chunks = writeChunks(config['busco_run']['in'], os.path.join(chunkdir, 'chunk'), args.chunksize)
+workers = min(args.workers if args.workers > 0 else max(args.cpu // 4, 1), len(chunks))
+cpu = max(args.cpu // workers, 1)
+if args.benchsize:
+    with open(args.benchsize, 'w') as f:
+        f.write(str(sum(os.path.getsize(chunk) for chunk in chunks)) + '\t' + str(max(os.path.getsize(chunk) for chunk in chunks)) + '\t' + str(workers) + '\n')
+
+#chunks are started in order; with -s no new chunks are started once the completeness has stabilised
+genes = {}
+header = []
+runs = []
+history = []
+with ThreadPoolExecutor(max_workers=workers) as pool:
+    futures = [pool.submit(runChunk, config, chunk, cpu) for chunk in chunks]
+    for done in as_completed(futures):
+        if done.cancelled():
+            continue
+        rundir = done.result()
+        if rundir is None:
+            continue
+        runs.append(rundir)
+        read_full_table(os.path.join(rundir, 'full_table.tsv'), genes, header)
+        counts = status_counts(genes)
+        history.append(100 * (counts['Complete'] + counts['Duplicated']) / max(sum(counts.values()), 1))
+        if args.stable > 0 and len(history) >= 3 and abs(history[-1] - history[-2]) < args.stable and abs(history[-2] - history[-3]) < args.stable:
+            for future in futures:
+                future.cancel()
+
+if not runs:
+    #no score is better than a merged score of no BUSCO genes
+    shutil.rmtree(chunkdir)
+    sys.exit('[Error] BUSCO did not finish on any chunk of ' + config['busco_run']['in'])
+
+if len(chunks) == 1:
+    #a single chunk is a normal BUSCO run, its own outputs are kept
+    shutil.copyfile(os.path.join(runs[0], 'full_table.tsv'), args.table)
+    shutil.copyfile(os.path.join(runs[0], 'short_summary.txt'), args.summary)
+else:
+    write_full_table(args.table, header, genes)
+    write_summary(args.summary, header, genes, 'Results merged over ' + str(len(runs)) + ' of ' + str(len(chunks)) + ' chunks of at most ' + str(args.chunksize) + ' reads')
+shutil.rmtree(chunkdir)
@@ -0,0 +1,32 @@
+from __future__ import division
+import argparse
+import sys
+from CacheTools import cache_file, load_cache, save_cache, cache_lookup, cache_merge, library_key
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-a", type=str, action='store', dest='action', choices=['lookup', 'merge', 'key'], help='define action: lookup writes the uncached sequences, merge combines cached and new results and stores the new ones, key prints the key of a library of versioned sequences (-f) for -k')
+parser.add_argument("-f", type=str, action='store', dest='fasta', metavar='FASTA',help='define fasta file of the sequences to classify')
+parser.add_argument("-d", type=str, action='store', dest='cachedir', metavar='CACHEDIR',help='define cache directory')
+parser.add_argument("-n", type=str, action='store', dest='classifier', metavar='CLASSIFIER',help='define classifier name')
+parser.add_argument("-k", type=str, action='store', dest='key', metavar='KEY',help='define database version and parameters the results depend on')
+parser.add_argument("-m", type=str, action='store', dest='misses', metavar='MISSES',help='define fasta output of uncached sequences (lookup)')
+parser.add_argument("-r", type=str, action='store', dest='results', metavar='RESULTS',help='define classifier output for the uncached sequences (merge)')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define merged classifier output for all sequences (merge)')
+parser.add_argument("-s", type=str, action='store', dest='sep', default='\t', help='define column separator of the classifier output (default tab)')
+parser.add_argument("-H", action='store_true', dest='header', help='classifier output starts with a header line')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+if args.action == 'key':
+    print(library_key(args.fasta))
+    sys.exit(0)
+
+cachefile=cache_file(args.cachedir,args.classifier,args.key)
+cache=load_cache(cachefile)
+
+if args.action == 'lookup':
+    cache_lookup(args.fasta,cache,args.misses)
+else:
+    added=cache_merge(args.fasta,cache,args.results,args.out,args.sep,args.header)
+    if added['rows']:
+        save_cache(cachefile,added)
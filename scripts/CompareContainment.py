@@ -0,0 +1,44 @@
+from __future__ import division
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-r", type=str, action='store', dest='reference', metavar='REFERENCE',help='define contig overview of the nucmer run')
+parser.add_argument("-q", type=str, action='store', dest='query', metavar='QUERY',help='define contig overview of the minimap2 run')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def readOverview(overview):
+    '''
+    input:
+    - ParseNucmer.py output
+    output:
+    - dictionary of form {contig: (complete, percentage covered)}
+    '''
+    contigs={}
+    with open(overview,'r') as f:
+        for line in f:
+            fields=line.rstrip('\n').split('\t')
+            complete=fields[0] != 'NOT COMPLETE:'
+            if not complete:
+                fields=fields[1:]
+            contigs[fields[0]]=(complete,float(fields[2].rstrip('%')))
+    return contigs
+
+reference=readOverview(args.reference)
+query=readOverview(args.query)
+
+agree=0
+difference=0
+for contig in sorted(set(reference) | set(query)):
+    #contigs without any alignment are not listed and count as 0% covered
+    refcomplete,refpct=reference.get(contig,(False,0.0))
+    qcomplete,qpct=query.get(contig,(False,0.0))
+    difference=difference+abs(refpct-qpct)
+    if refcomplete == qcomplete:
+        agree=agree+1
+    else:
+        print('DISAGREE:\t'+contig+'\t'+"{:.2f}".format(refpct)+'%\t'+"{:.2f}".format(qpct)+'%')
+total=len(set(reference) | set(query))
+agreement=float(agree/total)*100 if total else 100.0
+meandiff=difference/total if total else 0.0
+print('Agreement: '+str(agree)+'/'+str(total)+' ('+"{:.2f}".format(agreement)+'%), mean coverage difference: '+"{:.2f}".format(meandiff)+'%')
@@ -0,0 +1,34 @@
+from __future__ import division
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-r", type=str, action='store', dest='reference', metavar='REFERENCE',help='define readsinfo of the unfiltered nhmmscan run')
+parser.add_argument("-q", type=str, action='store', dest='query', metavar='QUERY',help='define readsinfo of the prefiltered nhmmscan run')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def readHits(readsinfo):
+    hits={}
+    with open(readsinfo,'r') as f:
+        for line in f:
+            fields=line.rstrip('\n').split('\t')
+            hits[fields[0]]=fields
+    return hits
+
+reference=readHits(args.reference)
+query=readHits(args.query)
+
+found=0
+identical=0
+for contig in reference:
+    if contig in query:
+        found=found+1
+        if query[contig] == reference[contig]:
+            identical=identical+1
+    else:
+        print('MISSED:\t'+'\t'.join(reference[contig]))
+for contig in query:
+    if contig not in reference:
+        print('EXTRA:\t'+'\t'.join(query[contig]))
+recall=float(found/len(reference))*100 if reference else 100.0
+print('Recall: '+str(found)+'/'+str(len(reference))+' ('+"{:.2f}".format(recall)+'%), identical rows: '+str(identical))
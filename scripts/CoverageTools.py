@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def interval_union(groups: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """
+    Union of half-open intervals [start, end) within every group, computed
+    with one sort and a sweep over all groups at once. Overlapping and
+    touching intervals are joined; reversed intervals are flipped first and
+    empty intervals are dropped.
+
+    args:
+        groups -> np.ndarray: non-negative integer group id (e.g. contig) of every interval
+        starts -> np.ndarray: interval starts
+        ends -> np.ndarray: interval ends
+    returns:
+        arrays (groups, starts, ends) of the disjoint merged intervals,
+        sorted by group and start
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    lo = np.minimum(starts, ends).astype(np.int64)
+    hi = np.maximum(starts, ends).astype(np.int64)
+    nonempty = lo < hi
+    if not nonempty.all():
+        groups, lo, hi = groups[nonempty], lo[nonempty], hi[nonempty]
+    if len(groups) == 0:
+        return groups, lo, hi
+    order = np.lexsort((lo, groups))
+    groups = groups[order]
+    lo = lo[order]
+    hi = hi[order]
+    del order
+    # shift every group past the end of the previous one, so that a single
+    # running maximum restarts at each group boundary; done in place, as this
+    # runs on all alignments of an assembly at once
+    base = int(lo.min())
+    shift = groups * (int(hi.max()) - base + 1) - base
+    lo += shift
+    hi += shift
+    reach = np.maximum.accumulate(hi, out=hi)
+    first = np.ones(len(lo), dtype=bool)
+    np.greater(lo[1:], reach[:-1], out=first[1:])
+    first = np.flatnonzero(first)
+    last = np.append(first[1:] - 1, len(lo) - 1)
+    return groups[first], lo[first] - shift[first], reach[last] - shift[first]
+
+def covered_bases(groups: np.ndarray, starts: np.ndarray, ends: np.ndarray, ngroups: int) -> np.ndarray:
+    """
+    Number of bases covered by the half-open intervals of every group.
+
+    args:
+        groups -> np.ndarray: group id (0..ngroups-1) of every interval
+        starts -> np.ndarray: interval starts
+        ends -> np.ndarray: interval ends
+        ngroups -> int: number of groups
+    """
+    ugroups, ustarts, uends = interval_union(groups, starts, ends)
+    return np.bincount(ugroups, weights=uends - ustarts, minlength=ngroups).astype(np.int64)
@@ -0,0 +1,50 @@
+from __future__ import division
+import argparse
+import os
+import sys
+from BuscoTools import read_full_table, write_full_table, write_summary
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-g", type=str, action='store', dest='genus', metavar='GENUS',help='define genus')
+parser.add_argument("-l", type=str, action='store', dest='lineages', metavar='LINEAGES',help='define table of genus and lineage dataset (BuscoLineage.py output)')
+parser.add_argument("-d", type=str, action='store', dest='dir', metavar='BATCHDIR',help='define BatchBusco.py output directory')
+parser.add_argument("-t", type=str, action='store', dest='table', metavar='TABLE',help='define full_table.tsv of the genus')
+parser.add_argument("-o", type=str, action='store', dest='summary', metavar='SUMMARY',help='define short summary of the genus')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def readLineages(lineagefile):
+    '''
+    input:
+    - BuscoLineage.py output
+    output:
+    - dictionary of form {genus: dataset}
+    '''
+    lineages = {}
+    with open(lineagefile, 'r') as m:
+        for line in m:
+            name, dataset = line.rstrip('\n').split('\t')
+            lineages[name] = dataset
+    return lineages
+
+lineages = readLineages(args.lineages)
+dataset = lineages[args.genus]
+batchtable = os.path.join(args.dir, dataset + '.full_table.tsv')
+if not os.path.exists(batchtable):
+    sys.exit('[Error] No BUSCO results of the batch of ' + dataset)
+
+#every genus of the dataset can be in the batch; the longest matching prefix owns a sequence
+members = sorted((genus for genus in lineages if lineages[genus] == dataset), key=len, reverse=True)
+batchgenes = {}
+header = []
+read_full_table(batchtable, batchgenes, header)
+genes = {}
+for gene, rows in batchgenes.items():
+    genes[gene] = []
+    for row in rows:
+        owner = next((genus for genus in members if row[2].startswith(genus + '.')), None)
+        if owner == args.genus:
+            genes[gene].append([row[0], row[1], row[2][len(owner) + 1:]] + row[3:])
+
+write_full_table(args.table, header, genes)
+write_summary(args.summary, header, genes, 'Results of ' + args.genus + ' from a BUSCO run on all genera with this lineage dataset')
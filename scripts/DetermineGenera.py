@@ -1,8 +1,10 @@
 from __future__ import division
 
 import argparse
+import json
 import os
-from NCBIApiTools import NcbiApi
+from functools import lru_cache
+from NCBIApiTools import LocalAssemblyIndex, NcbiApi
 
 parser = argparse.ArgumentParser()
 parser.add_argument(
@@ -71,6 +73,24 @@ parser.add_argument(
     required=False,
     default=os.environ.get("NCBI_API_KEY"),
 )
+parser.add_argument(
+    "-a",
+    type=str,
+    action="store",
+    dest="assemblyindex",
+    metavar="INDEX",
+    help="assembly availability index (BuildAssemblyIndex.py), used instead of querying NCBI",
+    required=False,
+)
+parser.add_argument(
+    "-l",
+    type=str,
+    action="store",
+    dest="log",
+    metavar="LOG",
+    help="JSON file the decision taken for every SILVA lineage is written to",
+    required=False,
+)
 parser.add_argument("--version", action="version", version="%(prog)s 1.0")
 args = parser.parse_args()
 
@@ -217,38 +237,62 @@ def getTaxParent(tax_nodes, tax_types, taxid, ranking):
     return tax_parents
 
 
-api_instance = NcbiApi(args.key)
+@lru_cache(maxsize=None)
+def ancestors(taxid, ranking):
+    """
+    input:
+    - taxid
+    - rank to stop at
+    output:
+    - tuple of the ancestors of taxid up to the first one of the rank (or the root), None if taxid is not in nodes.dmp
+    """
+    lineage = getTaxParent(taxparents, taxtypes, taxid, ranking)[str(taxid)]
+    if lineage is None:
+        return None
+    return tuple(lineage)
 
-# determine the lineage where your tax id belongs to (lineage taken until upper level = args.type)
-taxparents, taxtypes = readNodes(args.nodesfile)
-taxnames, namestax, taxnames_sci, multiple_names = readNames(args.namesfile)
 
-eukgens = []
-prokgens = []
+@lru_cache(maxsize=None)
+def assemblyCount(taxid, source):
+    """
+    input:
+    - taxid
+    - assembly source ("refseq" or "all")
+    output:
+    - number of assemblies available for the taxon
+    """
+    return api_instance.assembly_count_for_taxon(
+        taxon=str(taxid), filters_assembly_source=source
+    )
+
 
-spoifamily = ""
-spoiclade = ""
-spoigenus = args.spoi.split()[0]
-spoispecies = args.spoi
-if spoispecies in namestax:
-    lineage = getTaxParent(taxparents, taxtypes, namestax[spoispecies], args.type)
-    lineage2 = getTaxParent(taxparents, taxtypes, namestax[spoispecies], "order")
-    if lineage[namestax[spoispecies]] != None:
-        spoifamily = taxnames[lineage[namestax[spoispecies]][-1]]
-        spoiclade = taxnames[lineage2[namestax[spoispecies]][-1]]
+@lru_cache(maxsize=None)
+def eukLineage(name):
+    """
+    input:
+    - scientific name
+    output:
+    - name followed by the names of its ancestors up to the superkingdom, ',' separated
+    """
+    return ",".join(
+        [name] + [taxnames[elem] for elem in ancestors(namestax[name], "superkingdom")]
+    )
 
-print(spoigenus + "\t" + spoifamily + "\t" + spoiclade)
 
-k = open(args.tax, "r")
-for line in k:
-    line = line.strip()
-    sciname = line.split(";")[-2]
+def lineName(fields):
+    """
+    input:
+    - SILVA lineage split on ';'
+    output:
+    - scientific name the lineage is resolved with
+    """
+    sciname = fields[-2]
     if "environmental" in sciname:
-        sciname = line.split(";")[-3]
+        sciname = fields[-3]
     if sciname == "uncultured":
-        sciname = line.split(";")[-3]
+        sciname = fields[-3]
     if sciname == "endosymbionts":
-        sciname = line.split(";")[-3]
+        sciname = fields[-3]
     if "Hafnia-Obesumbacterium" in sciname:
         sciname = sciname.split("-")[0]
     if "Escherichia-Shigella" in sciname:
@@ -259,196 +303,146 @@ for line in k:
         and sciname != "Chloroplast"
         and sciname != "Mitochondrion"
     ):
-        sciname = line.split(";")[-3]
-        print("NOW: " + sciname)
-    print(sciname)
+        sciname = fields[-3]
+    return sciname
+
+
+@lru_cache(maxsize=None)
+def resolveHomonym(sciname, context):
+    """
+    input:
+    - scientific name shared by several taxids (multiple_names)
+    - frozenset of the names in the SILVA lineage
+    output:
+    - taxid whose lineage up to the superkingdom shares most names with the SILVA lineage
+    """
+    besttaxid = namestax[sciname]
+    bestcounter = 0
+    for elem in multiple_names[sciname]:
+        counter = sum(taxnames[x] in context for x in ancestors(elem, "superkingdom"))
+        if counter > bestcounter:
+            bestcounter = counter
+            besttaxid = elem
+    return besttaxid
+
+
+@lru_cache(maxsize=None)
+def resolve(sciname, context):
+    """
+    input:
+    - scientific name
+    - frozenset of the names in the SILVA lineage, only used for homonyms (None otherwise)
+    output:
+    - dictionary describing the decision: taxid, rank, superkingdom, order, the family (or order)
+      kept and its number of genomes, and the output (euk/prok) and entry written for it
+    """
+    taxid = (
+        resolveHomonym(sciname, context) if context is not None else namestax[sciname]
+    )
+    decision = {
+        "sciname": sciname,
+        "taxid": taxid,
+        "rank": taxtypes.get(taxid),
+        "superkingdom": None,
+        "clade": None,
+        "level": None,
+        "genomes": None,
+        "decision": None,
+        "output": None,
+        "entry": None,
+    }
+    if ancestors(taxid, args.type) is None:
+        decision["decision"] = "not in nodes.dmp"
+        return decision
+    rootlevelname = taxnames[ancestors(taxid, "superkingdom")[-1]]
+    cladelevelname = taxnames[ancestors(taxid, "order")[-1]]
+    eukaryote = "Eukaryota" == rootlevelname
+    decision["superkingdom"] = rootlevelname
+    decision["clade"] = cladelevelname
+
+    # genomes are counted for the taxid of the level, as names can be shared by several taxids
+    if taxtypes[taxid] == args.type:
+        taxlevelname = sciname
+        leveltaxid = taxid
+    elif int(ancestors(taxid, args.type)[-1]) != 1:
+        leveltaxid = ancestors(taxid, args.type)[-1]
+        taxlevelname = taxnames_sci[leveltaxid]
+    else:
+        decision["decision"] = "no " + args.type
+        return decision
+    decision["level"] = taxlevelname
+    decision["genomes"] = assemblyCount(leveltaxid, "all" if eukaryote else "refseq")
+    decision["decision"] = args.type
+    if decision["genomes"] == 0:
+        # the order is tried instead, except for prokaryotes classified below the family
+        if cladelevelname == "root" or (not eukaryote and taxtypes[taxid] != args.type):
+            decision["decision"] = "no genomes"
+            return decision
+        taxlevelname = cladelevelname
+        decision["level"] = taxlevelname
+        decision["genomes"] = assemblyCount(ancestors(taxid, "order")[-1], "all")
+        decision["decision"] = "order"
+
+    if taxlevelname == spoifamily or cladelevelname == spoiclade:
+        decision["decision"] = "species of interest"
+    elif decision["genomes"] == 0:
+        decision["decision"] = "no genomes"
+    elif eukaryote:
+        decision["output"] = "euk"
+        decision["entry"] = eukLineage(taxlevelname)
+    else:
+        decision["output"] = "prok"
+        decision["entry"] = taxlevelname
+    return decision
+
+
+# determine the lineage where your tax id belongs to (lineage taken until upper level = args.type)
+taxparents, taxtypes = readNodes(args.nodesfile)
+taxnames, namestax, taxnames_sci, multiple_names = readNames(args.namesfile)
+
+if args.assemblyindex:
+    api_instance = LocalAssemblyIndex(args.assemblyindex)
+else:
+    api_instance = NcbiApi(args.key)
+
+spoifamily = ""
+spoiclade = ""
+spoigenus = args.spoi.split()[0]
+spoispecies = args.spoi
+if spoispecies in namestax and ancestors(namestax[spoispecies], args.type) != None:
+    spoifamily = taxnames[ancestors(namestax[spoispecies], args.type)[-1]]
+    spoiclade = taxnames[ancestors(namestax[spoispecies], "order")[-1]]
+
+print(spoigenus + "\t" + spoifamily + "\t" + spoiclade)
+
+# identical lineages are resolved once, in order of appearance
+with open(args.tax, "r") as k:
+    lines = list(dict.fromkeys(line.strip() for line in k if line.strip()))
+
+output = {"euk": [], "prok": []}
+written = {"euk": set(), "prok": set()}
+decisions = []
+for line in lines:
+    fields = line.split(";")
+    sciname = lineName(fields)
     if sciname in namestax:
-        # print(sciname)
-        taxid_line = 0
-        if sciname in multiple_names:
-            print(sciname)
-            found_true_lineage = False
-            besttaxid = ""
-            bestcounter = 0
-            for elem in multiple_names[sciname]:
-                lineage = getTaxParent(taxparents, taxtypes, elem, args.type)
-                fulllineage = getTaxParent(taxparents, taxtypes, elem, "superkingdom")
-                counterhere = 0
-                for x in fulllineage[elem]:
-                    # print(x)
-                    cnt = line.split(";").count(taxnames[x])
-                    if cnt > 0:
-                        print(taxnames[x])
-                        counterhere = counterhere + 1
-                if int(counterhere) > int(bestcounter):
-                    bestcounter = counterhere
-                    besttaxid = elem
-            taxid_line = besttaxid
-            lineage = getTaxParent(taxparents, taxtypes, taxid_line, args.type)
-            fulllineage = getTaxParent(taxparents, taxtypes, taxid_line, "superkingdom")
-            cladelineage = getTaxParent(taxparents, taxtypes, taxid_line, "order")
-            rootlevelname = taxnames[fulllineage[taxid_line][-1]]
-            cladelevelname = taxnames[cladelineage[taxid_line][-1]]
-        else:
-            taxid_line = namestax[sciname]
-            lineage = getTaxParent(taxparents, taxtypes, namestax[sciname], args.type)
-            fulllineage = getTaxParent(
-                taxparents, taxtypes, namestax[sciname], "superkingdom"
-            )
-            cladelineage = getTaxParent(
-                taxparents, taxtypes, namestax[sciname], "order"
-            )
-            rootlevelname = taxnames[fulllineage[namestax[sciname]][-1]]
-            cladelevelname = taxnames[cladelineage[namestax[sciname]][-1]]
-        if taxtypes[taxid_line] == args.type:
-            print("FAMILY:" + sciname + " CLADE:" + cladelevelname)
-            taxlevelname = sciname
-            if "Eukaryota" == rootlevelname:
-                n_genomes = api_instance.assembly_count_for_taxon(
-                    taxon=str(taxlevelname)
-                )
-            else:
-                n_genomes = api_instance.assembly_count_for_taxon(
-                    taxon=str(taxlevelname),
-                    filters_assembly_source="refseq",
-                )
-            foundlevel = False
-            if n_genomes > 0:
-                foundlevel = True
-            if foundlevel:
-                if (
-                    "Eukaryota" == rootlevelname
-                    and taxlevelname not in eukgens
-                    and taxlevelname != spoifamily
-                    and cladelevelname != spoiclade
-                ):
-                    fulllineage_euk = taxlevelname
-                    for elem in getTaxParent(
-                        taxparents, taxtypes, namestax[taxlevelname], "superkingdom"
-                    )[namestax[taxlevelname]]:
-                        fulllineage_euk = fulllineage_euk + "," + taxnames[elem]
-                    print(fulllineage_euk)
-                    eukgens.append(fulllineage_euk)
-                elif (
-                    taxlevelname not in prokgens
-                    and taxlevelname != spoifamily
-                    and cladelevelname != spoiclade
-                ):
-                    prokgens.append(taxlevelname)
-            else:
-                print("No genomes in databases")
-                if cladelevelname != "root":
-                    taxlevelname = cladelevelname
-                    if (
-                        "Eukaryota" == rootlevelname
-                        and taxlevelname not in eukgens
-                        and taxlevelname != spoifamily
-                        and cladelevelname != spoiclade
-                    ):
-                        fulllineage_euk = taxlevelname
-                        for elem in getTaxParent(
-                            taxparents, taxtypes, namestax[taxlevelname], "superkingdom"
-                        )[namestax[taxlevelname]]:
-                            fulllineage_euk = fulllineage_euk + "," + taxnames[elem]
-                        print(fulllineage_euk)
-                        n_genomes = api_instance.assembly_count_for_taxon(
-                            taxon=str(taxlevelname.split(",")[0])
-                        )
-                        if n_genomes > 0:
-                            eukgens.append(fulllineage_euk)
-                    elif (
-                        taxlevelname not in prokgens
-                        and taxlevelname != spoifamily
-                        and cladelevelname != spoiclade
-                    ):
-                        n_genomes = api_instance.assembly_count_for_taxon(
-                            taxon=str(taxlevelname)
-                        )
-                        if n_genomes > 0:
-                            prokgens.append(taxlevelname)
-        elif lineage[taxid_line] != None:
-            print("DIFFERENT THAN FAMILY:" + sciname + " CLADE:" + cladelevelname)
-            taxlevelname = taxnames_sci[lineage[taxid_line][-1]]
-            if int(lineage[taxid_line][-1]) != 1:
-                if "Eukaryota" == rootlevelname:
-                    n_genomes = api_instance.assembly_count_for_taxon(
-                        taxon=str(taxlevelname)
-                    )
-                else:
-                    n_genomes = api_instance.assembly_count_for_taxon(
-                        taxon=str(taxlevelname),
-                        filters_assembly_source="refseq",
-                    )
-                foundlevel = False
-                if n_genomes > 0:
-                    foundlevel = True
-                if foundlevel == True:
-                    # if taxtypes[namestax[sciname]] == args.type:
-                    if (
-                        "Eukaryota" == rootlevelname
-                        and taxlevelname not in eukgens
-                        and taxlevelname != spoifamily
-                        and cladelevelname != spoiclade
-                    ):
-                        fulllineage_euk = taxlevelname
-                        for elem in getTaxParent(
-                            taxparents, taxtypes, namestax[taxlevelname], "superkingdom"
-                        )[namestax[taxlevelname]]:
-                            fulllineage_euk = fulllineage_euk + "," + taxnames[elem]
-                        print(fulllineage_euk)
-                        eukgens.append(fulllineage_euk)
-                    elif (
-                        taxlevelname not in prokgens
-                        and taxlevelname != spoifamily
-                        and cladelevelname != spoiclade
-                    ):
-                        prokgens.append(taxlevelname)
-                else:
-                    print("No genomes in databases")
-                    if cladelevelname != "root":
-                        taxlevelname = cladelevelname
-                        if (
-                            "Eukaryota" == rootlevelname
-                            and taxlevelname not in eukgens
-                            and taxlevelname != spoifamily
-                            and cladelevelname != spoiclade
-                        ):
-                            fulllineage_euk = taxlevelname
-                            for elem in getTaxParent(
-                                taxparents,
-                                taxtypes,
-                                namestax[taxlevelname],
-                                "superkingdom",
-                            )[namestax[taxlevelname]]:
-                                fulllineage_euk = fulllineage_euk + "," + taxnames[elem]
-                            print(fulllineage_euk)
-                            n_genomes = api_instance.assembly_count_for_taxon(
-                                taxon=str(taxlevelname.split(",")[0])
-                            )
-                            if n_genomes > 0:
-                                eukgens.append(fulllineage_euk)
-                        elif (
-                            taxlevelname not in prokgens
-                            and taxlevelname != spoifamily
-                            and cladelevelname != spoiclade
-                        ):
-                            genome_summary = api_instance.assembly_count_for_taxon(
-                                taxon=str(taxlevelname)
-                            )
-                            i = 0
-                            if n_genomes > 0:
-                                prokgens.append(taxlevelname)
+        context = frozenset(fields) if sciname in multiple_names else None
+        decision = resolve(sciname, context)
     else:
         print("NOT FOUND:" + sciname + "\t" + line)
+        decision = {"sciname": sciname, "decision": "not found", "output": None}
+    decisions.append(dict(decision, line=line))
+    kingdom = decision["output"]
+    if kingdom is not None and decision["entry"] not in written[kingdom]:
+        written[kingdom].add(decision["entry"])
+        output[kingdom].append(decision["entry"])
+
+for kingdom in ("prok", "euk"):
+    k = open(args.outdir + "/" + kingdom + "." + args.suffix, "w")
+    for elem in output[kingdom]:
+        k.write(elem + "\n")
+    k.close()
 
-file1 = args.outdir + "/prok." + args.suffix
-k = open(file1, "w")
-for elem in prokgens:
-    k.write(elem + "\n")
-k.close()
-
-file1 = args.outdir + "/euk." + args.suffix
-k = open(file1, "w")
-for elem in eukgens:
-    k.write(elem + "\n")
-k.close()
+if args.log:
+    with open(args.log, "w") as k:
+        json.dump(decisions, k, indent=1)
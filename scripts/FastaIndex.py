@@ -0,0 +1,25 @@
+from __future__ import division
+import argparse
+import os
+import sys
+from FastaTools import write_fai, write_wrapped
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-f", type=str, action='store', dest='fasta', metavar='FASTA',help='define fasta file')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define .fai index to write')
+parser.add_argument("-c", type=str, action='store', dest='copy', metavar='COPY',help='define fasta file the index refers to: a link to FASTA, or a copy wrapped at 80 bases when the lines of FASTA differ in length (without it such a FASTA is an error)')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+if args.copy:
+    if os.path.lexists(args.copy):
+        os.remove(args.copy)
+    try:
+        write_fai(args.fasta, args.out)
+        os.symlink(os.path.abspath(args.fasta), args.copy)
+    except ValueError as error:
+        sys.stderr.write(str(error) + ', indexing a copy wrapped at 80 bases\n')
+        write_wrapped(args.fasta, args.copy)
+        write_fai(args.copy, args.out)
+else:
+    write_fai(args.fasta, args.out)
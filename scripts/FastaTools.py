@@ -0,0 +1,136 @@
+import os
+
+COMPLEMENT = bytes.maketrans(b"ACGTNacgtnRYKMrykmBDHVbdhv", b"TGCANtgcanYRMKyrmkVHDBvhdb")
+
+
+def read_fasta(fastafile: str):
+    """
+    Iterate over the records of a fasta file.
+
+    args:
+        fastafile -> str: fasta file
+    yields:
+        (name, sequence as bytes), name being the first word of the header
+    """
+    name = None
+    seq = []
+    with open(fastafile, "rb") as f:
+        for line in f:
+            if line.startswith(b">"):
+                if name is not None:
+                    yield name, b"".join(seq)
+                name = line[1:].split()[0].decode()
+                seq = []
+            else:
+                seq.append(line.strip())
+    if name is not None:
+        yield name, b"".join(seq)
+
+
+def write_fai(fastafile: str, faifile: str):
+    """
+    Write a samtools style .fai index (name, length, offset of the first base,
+    bases per line, bytes per line) of a fasta file with fixed line lengths.
+    As in samtools, only the last line of a record may be shorter than the
+    first one; other line lengths raise a ValueError.
+
+    args:
+        fastafile -> str: fasta file
+        faifile -> str: output index
+    """
+    entries = []
+    offset = 0
+    entry = None
+    # a line shorter than the first line of the record ends its sequence
+    ended = False
+    with open(fastafile, "rb") as f:
+        for number, line in enumerate(f, 1):
+            if line.startswith(b">"):
+                if entry is not None:
+                    entries.append(entry)
+                entry = [line[1:].split()[0].decode(), 0, offset + len(line), 0, 0]
+                ended = False
+            elif entry is not None:
+                bases = len(line.rstrip(b"\r\n"))
+                if entry[3] == 0 and not ended:
+                    entry[3] = bases
+                    entry[4] = len(line)
+                    ended = bases == 0
+                elif bases > 0 and (
+                    ended or bases > entry[3] or len(line) > entry[4]
+                ):
+                    raise ValueError(
+                        "Different line length in sequence '%s' at line %i of %s"
+                        % (entry[0], number, fastafile)
+                    )
+                elif bases != entry[3] or len(line) != entry[4]:
+                    ended = True
+                entry[1] += bases
+            offset += len(line)
+    if entry is not None:
+        entries.append(entry)
+    with open(faifile + ".tmp", "w") as f:
+        for entry in entries:
+            f.write("\t".join(str(field) for field in entry) + "\n")
+    os.replace(faifile + ".tmp", faifile)
+
+
+def write_wrapped(fastafile: str, outfile: str, width: int = 80):
+    """
+    Copy a fasta file with the sequences wrapped at a fixed width, so it can
+    be indexed with write_fai.
+
+    args:
+        fastafile -> str: fasta file
+        outfile -> str: output fasta file
+        width -> int: bases per line
+    """
+    with open(outfile + ".tmp", "wb") as f:
+        for name, seq in read_fasta(fastafile):
+            f.write(b">" + name.encode() + b"\n")
+            for start in range(0, len(seq), width):
+                f.write(seq[start : start + width] + b"\n")
+    os.replace(outfile + ".tmp", outfile)
+
+
+def read_fai(faifile: str) -> dict:
+    """
+    Read a .fai index.
+
+    args:
+        faifile -> str: .fai index
+    returns:
+        dictionary of form {name: (length, offset, bases per line, bytes per line)}, in fasta order
+    """
+    index = {}
+    with open(faifile, "r") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            index[fields[0]] = tuple(int(field) for field in fields[1:5])
+    return index
+
+
+def fetch_region(handle, entry: tuple, start: int, end: int) -> bytes:
+    """
+    Read bases [start, end) (0-based, clipped to the sequence) of one fasta
+    record, seeking to the byte range of the region only.
+
+    args:
+        handle -> binary file object of the fasta file
+        entry -> tuple: read_fai value of the record
+        start -> int: 0-based start
+        end -> int: 0-based exclusive end
+    """
+    length, offset, linebases, linewidth = entry
+    start = max(start, 0)
+    end = min(end, length)
+    if end <= start:
+        return b""
+    first = offset + (start // linebases) * linewidth + start % linebases
+    last = offset + ((end - 1) // linebases) * linewidth + (end - 1) % linebases
+    handle.seek(first)
+    return handle.read(last - first + 1).replace(b"\n", b"").replace(b"\r", b"")
+
+
+def reverse_complement(seq: bytes) -> bytes:
+    return seq.translate(COMPLEMENT)[::-1]
@@ -11,11 +11,11 @@ parser.add_argument("-o", type=str, action='store', dest='out', metavar='INPUT',
 parser.add_argument('--version', action='version', version='%(prog)s 1.0')
 results = parser.parse_args()
 
-ids=[]
+ids=set()
 m =open(results.input,'r')
 for record in m:
     record=record.strip()
-    ids.append(record)
+    ids.add(record)
 
 f=open(results.out,"w")
 l=open(results.fasta,"r")
@@ -0,0 +1,51 @@
+from __future__ import division
+import argparse
+from FastaTools import read_fai, fetch_region, reverse_complement
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-g", type=str, action='store', dest='genome', metavar='GENOME',help='define genome fasta file')
+parser.add_argument("-x", type=str, action='store', dest='fai', metavar='FAI',help='define .fai index of the genome')
+parser.add_argument("-i", type=str, action='store', dest='input', metavar='INPUT',help='define HMM parsed coordinates file')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define outfile')
+parser.add_argument("-m", type=str, action='store', dest='inputmicro', metavar='INPUTMICRO',help='define HMM parsed coordinates file of microsporidia hits')
+parser.add_argument("-n", type=str, action='store', dest='outmicro', metavar='OUTMICRO',help='define outfile of microsporidia loci')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def readCoords(coordfile):
+    coords={}
+    m=open(coordfile,'r')
+    for record in m:
+        fields=record.split()
+        coords[fields[0]]=(int(fields[4]),int(fields[5]))
+    m.close()
+    return coords
+
+def writeLoci(genome, index, coords, outfile):
+    '''
+    input:
+    - binary file object of the genome
+    - .fai index of the genome
+    - dictionary of form {contig: (start, stop)} with HMM coordinates, stop < start for hits on the reverse strand
+    - outfile
+    output:
+    - fasta file of the loci in genome order; only the byte range of every locus is read from the genome
+    '''
+    f=open(outfile,'w')
+    for contig in index:
+        if contig not in coords:
+            continue
+        start,stop=coords[contig]
+        f.write('>'+contig+'\n')
+        if start > stop:
+            f.write(reverse_complement(fetch_region(genome,index[contig],stop-1,start-1)).decode()+'\n')
+        else:
+            f.write(fetch_region(genome,index[contig],start,stop).decode()+'\n')
+    f.close()
+
+index=read_fai(args.fai)
+genome=open(args.genome,'rb')
+writeLoci(genome,index,readCoords(args.input),args.out)
+if args.inputmicro:
+    writeLoci(genome,index,readCoords(args.inputmicro),args.outmicro)
+genome.close()
@@ -0,0 +1,30 @@
+from __future__ import division
+import argparse
+from SSUTools import best_ssu_hits, ssu_readsinfo
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", type=str, action='store', dest='input', metavar='INPUT',help='define hmmer tabular output file')
+parser.add_argument("-e", type=str, action='store', dest='engine', default='nhmmscan', choices=['nhmmscan', 'nhmmer'], help='define hmmer program that wrote the table (default nhmmscan)')
+parser.add_argument("-x", type=str, action='store', dest='micromodel', default='RF02542.afa', help='define name of the microsporidia SSU model (default RF02542.afa)')
+parser.add_argument("-o", type=str, action='store', dest='readsinfo', metavar='READSINFO',help='define readsinfo output of prokaryotic SSU hits')
+parser.add_argument("-l", type=str, action='store', dest='readslist', metavar='READSLIST',help='define list of reads with prokaryotic SSU hits')
+parser.add_argument("-m", type=str, action='store', dest='readsinfomicro', metavar='READSINFOMICRO',help='define readsinfo output of microsporidia SSU hits')
+parser.add_argument("-n", type=str, action='store', dest='readslistmicro', metavar='READSLISTMICRO',help='define list of reads with microsporidia SSU hits')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+info=open(args.readsinfo,'w')
+reads=open(args.readslist,'w')
+infomicro=open(args.readsinfomicro,'w')
+readsmicro=open(args.readslistmicro,'w')
+for model,row in ssu_readsinfo(best_ssu_hits(args.input,args.engine)):
+    if model == args.micromodel:
+        infomicro.write(row+'\n')
+        readsmicro.write(row.split('\t',1)[0]+'\n')
+    else:
+        info.write(row+'\n')
+        reads.write(row.split('\t',1)[0]+'\n')
+info.close()
+reads.close()
+infomicro.close()
+readsmicro.close()
@@ -0,0 +1,16 @@
+from __future__ import division
+import argparse
+from AssemblyTools import assembly_stats, gfa_to_fasta, save_assembly_stats
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-g", type=str, action='store', dest='gfa', metavar='GFA',help='define GFA file of the assembly')
+parser.add_argument("-o", type=str, action='store', dest='fasta', metavar='FASTA',help='define fasta output, indexed in {FASTA}.fai')
+parser.add_argument("-s", type=str, action='store', dest='stats', metavar='STATS',help='define json output of the assembly statistics')
+parser.add_argument("-e", type=int, action='store', dest='genomesize', default=None, help='define expected genome size for NG50 (optional)')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+lengths = gfa_to_fasta(args.gfa, args.fasta, args.fasta + '.fai')
+stats = assembly_stats(lengths, args.genomesize)
+save_assembly_stats(args.stats, stats)
+print(str(stats['contigs']) + ' contigs, ' + str(stats['total_length']) + ' bp, N50 ' + str(stats['n50']))
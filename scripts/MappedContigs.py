@@ -3,10 +3,14 @@ import argparse
 import configparser
 import os
 import sys
+import numpy as np
+from PafTools import load_paf_store, store_rows, store_chunk, select_alignments
+from CoverageTools import covered_bases
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-m", type=str, action='store', dest='map', metavar='MAP',help='define mapping file kraken reads to genome')
 parser.add_argument("-r", type=str, action='store', dest='reads', metavar='READS',help='define all reads mapping per ctg')
+parser.add_argument("-s", type=str, action='store', dest='store', metavar='STORE',help='define PAF store (PafStore.py) of all reads to genome, used instead of -r')
 parser.add_argument('--version', action='version', version='%(prog)s 1.0')
 results = parser.parse_args()
 
@@ -22,11 +26,28 @@ for record in f:
             contiglist.append(record.split('\t')[1])
 f.close()
 
-m = open(results.reads,'r')
-for record in m:
-    record=record.strip()
-    ctgname=record.split('\t')[0]
-    if ctgname in contiglist:
-        for read in record.split('\t')[1].split(','):
-            print(read)
-m.close()
\ No newline at end of file
+if results.store:
+    #only the alignments of the selected contigs are read, through the store's contig index
+    store=load_paf_store(results.store)
+    chunk=store_chunk(store,store_rows(store,'t',contiglist))
+    keep=select_alignments(chunk)
+    names,first,groups=np.unique(chunk['tname'][keep],return_index=True,return_inverse=True)
+    groups=groups.ravel()
+    covered=covered_bases(groups,chunk['tstart'][keep],chunk['tend'][keep],len(names))
+    lengths=chunk['tlen'][keep][first]
+    order=np.argsort(groups,kind='stable')
+    readnames=chunk['qname'][keep][order]
+    bounds=np.concatenate(([0],np.cumsum(np.bincount(groups,minlength=len(names)))))
+    for i in range(len(names)):
+        if float(int(covered[i])/int(lengths[i]))*100 >= 80:
+            for read in readnames[bounds[i]:bounds[i+1]]:
+                print(read.decode())
+else:
+    m = open(results.reads,'r')
+    for record in m:
+        record=record.strip()
+        ctgname=record.split('\t')[0]
+        if ctgname in contiglist:
+            for read in record.split('\t')[1].split(','):
+                print(read)
+    m.close()
@@ -0,0 +1,56 @@
+import fcntl
+import json
+import os
+
+
+def record_metrics(storefile: str, genus: str, metrics: dict):
+    """
+    Append the metrics of a pipeline stage to the JSON-lines metrics store of a
+    sample. The store is locked while writing, so jobs running at the same time
+    can share it.
+
+    args:
+        storefile -> str: metrics store ({workingdirectory}/metrics.jsonl)
+        genus -> str: genus (family) the metrics belong to
+        metrics -> dict: dictionary of form {metric: value}
+    """
+    line = json.dumps({"genus": genus, "metrics": metrics}) + "\n"
+    with open(storefile, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.write(line)
+        f.flush()
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_metrics(storefile: str) -> dict:
+    """
+    Read the metrics store; a metric recorded again (e.g. by a rerun) replaces
+    the earlier value.
+
+    args:
+        storefile -> str: metrics store
+    returns:
+        dictionary of form {genus: {metric: value}}, empty when there is no store
+    """
+    metrics = {}
+    if not os.path.exists(storefile):
+        return metrics
+    with open(storefile, "r") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                metrics.setdefault(record["genus"], {}).update(record["metrics"])
+    return metrics
+
+
+def format_metric(value, template: str = "{}") -> str:
+    """
+    args:
+        value: metric value, None when it was not recorded
+        template -> str: format string of a recorded value
+    returns:
+        the formatted value, NA when it was not recorded
+    """
+    if value is None:
+        return "NA"
+    return template.format(value)
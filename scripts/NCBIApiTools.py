@@ -4,6 +4,45 @@ from pathlib import Path
 import requests
 
 
+class LocalAssemblyIndex:
+    def __init__(self, indexfile: str):
+        """
+        Offline stand-in for NcbiApi.assembly_count_for_taxon, answering from an
+        index of assembly counts per taxid (BuildAssemblyIndex.py output).
+
+        args:
+            indexfile -> str: tab separated taxid, refseq count, all count
+        """
+        self.counts = {}
+        with open(indexfile, "r") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                taxid, refseq, total = line.rstrip("\n").split("\t")
+                self.counts[taxid] = (int(refseq), int(total))
+
+    def assembly_count_for_taxon(
+        self, taxon: str, filters_assembly_source: str = "all"
+    ) -> int:
+        """
+        For a given taxid, return the number of assemblies listed in the NCBI
+        assembly summaries for the taxon and its descendants, a genbank
+        assembly with a refseq copy counted once.
+
+        args:
+            taxon -> string: taxid to query (names are not resolved, as they can be ambiguous)
+            filters_assembly_source -> string: "refseq", "genbank", or "all"
+        """
+        if not str(taxon).isdigit():
+            raise ValueError(f"LocalAssemblyIndex expects a taxid, got '{taxon}'")
+        refseq, total = self.counts.get(str(taxon), (0, 0))
+        if filters_assembly_source == "refseq":
+            return refseq
+        if filters_assembly_source == "genbank":
+            return total - refseq
+        return total
+
+
 class NcbiApi:
     def __init__(self, key):
         self.ncbi_api_uri = "https://api.ncbi.nlm.nih.gov/datasets/v2"
@@ -0,0 +1,11 @@
+from __future__ import division
+import argparse
+from PafTools import write_paf_store
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-p", type=str, action='store', dest='paf', metavar='PAF', default='/dev/stdin', help='define PAF file (default: stdin)')
+parser.add_argument("-o", type=str, action='store', dest='out', help='define PAF store directory')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+write_paf_store(args.paf, args.out)
@@ -0,0 +1,339 @@
+import bisect
+import os
+
+import numpy as np
+
+from TableTools import field_bounds, iter_line_blocks, parse_bytes, parse_int
+
+PAF_INT_COLUMNS = {
+    "qlen": 1,
+    "qstart": 2,
+    "qend": 3,
+    "tlen": 6,
+    "tstart": 7,
+    "tend": 8,
+    "mapq": 11,
+}
+
+
+def iter_paf_chunks(paffile: str, chunkbytes: int = 1 << 24):
+    """
+    Parse a PAF file in blocks of complete lines into typed numpy columns.
+    Field offsets and integer values are computed for the whole block at
+    once, so no line is split in python.
+
+    args:
+        paffile -> str: PAF file written by minimap2
+        chunkbytes -> int: approximate number of bytes parsed per block
+    yields:
+        dictionary of form {column: array}, with qname/tname as bytes arrays,
+        strand as bool array (True for '-'), tp as the byte of the tp:A tag
+        and primary as bool array (tp:A:P)
+    """
+    for data in iter_line_blocks(paffile, chunkbytes):
+        starts, ends = field_bounds(data, 13)
+        chunk = {}
+        chunk["qname"] = parse_bytes(data, starts[:, 0], ends[:, 0])
+        chunk["tname"] = parse_bytes(data, starts[:, 5], ends[:, 5])
+        for name, idx in PAF_INT_COLUMNS.items():
+            chunk[name] = parse_int(data, starts[:, idx], ends[:, idx])
+        chunk["strand"] = data[starts[:, 4]] == ord("-")
+        chunk["tp"] = data[starts[:, 12] + 5]
+        chunk["primary"] = chunk["tp"] == ord("P")
+        yield chunk
+
+
+def select_alignments(chunk: dict) -> np.ndarray:
+    """
+    Mask of primary alignments covering at least 75% of the read, or 75% of
+    the part of the read that can align when the read hangs over a contig end
+    (alignment within 20bp of the contig start/end).
+
+    args:
+        chunk -> dict: PAF columns (iter_paf_chunks output)
+    """
+    qlen = chunk["qlen"]
+    qstart = chunk["qstart"]
+    qend = chunk["qend"]
+    minus = chunk["strand"]
+    plus = ~minus
+    aligned = qend - qstart
+    coverage = aligned / qlen
+    full = chunk["primary"] & (coverage >= 0.75)
+
+    contigstart = chunk["tstart"] < 20
+    contigend = (chunk["tlen"] - chunk["tend"]) < 20
+    overhang = chunk["primary"] & ~full & (contigstart | contigend)
+    readend = qend / qlen > 0.95
+    readstart = qstart / qlen < 0.05
+    with np.errstate(divide="ignore", invalid="ignore"):
+        towardsend = aligned / (qlen - qstart)
+        towardsstart = aligned / qend
+    endcoverage = np.select(
+        [
+            contigstart & plus & readend,
+            contigend & plus & readstart,
+            contigstart & minus & readstart,
+            contigend & minus & readend,
+        ],
+        [towardsend, towardsstart, towardsstart, towardsend],
+        0,
+    )
+    return full | (overhang & (endcoverage >= 0.75))
+
+
+
+PAF_STORE_COLUMNS = {
+    "qid": np.uint32,
+    "qlen": np.int32,
+    "qstart": np.int32,
+    "qend": np.int32,
+    "strand": np.bool_,
+    "tid": np.uint32,
+    "tlen": np.int64,
+    "tstart": np.int64,
+    "tend": np.int64,
+    "mapq": np.uint8,
+    "tp": np.uint8,
+}
+
+
+class _NpyColumn:
+    """
+    One dimensional .npy file written in blocks; the length in its header is
+    filled in when it is closed, so the whole column is never held in memory.
+    """
+
+    def __init__(self, filename: str, dtype):
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.f = open(filename, "wb")
+        self._write_header()
+        self.datastart = self.f.tell()
+
+    def _write_header(self):
+        self.f.seek(0)
+        np.lib.format.write_array_header_1_0(
+            self.f,
+            {"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.rows,)},
+        )
+
+    def append(self, values: np.ndarray):
+        self.f.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+        self.rows += len(values)
+
+    def close(self):
+        self._write_header()
+        if self.f.tell() != self.datastart:
+            raise ValueError("header of %s changed size" % self.f.name)
+        self.f.close()
+
+
+def _intern(names: np.ndarray, ids: dict, store: list) -> np.ndarray:
+    """
+    Map a bytes array of names to integer ids, adding unseen names to ids/store.
+    """
+    unique, inverse = np.unique(names, return_inverse=True)
+    for name in unique:
+        if name not in ids:
+            ids[name] = len(store)
+            store.append(name)
+    return np.array([ids[name] for name in unique], dtype=np.uint32)[inverse.ravel()]
+
+
+def write_paf_store(paffile: str, storedir: str, chunkbytes: int = 1 << 24, blockrows: int = 1 << 22):
+    """
+    Convert a PAF stream into a columnar store: a directory with one
+    uncompressed .npy file per column, opened memory mapped. The columns are
+    written block by block as the PAF is read and then sorted by contig
+    (stable, so PAF order within a contig), so the alignments of a contig are
+    one range of rows (toffsets) and a contig query reads only that range.
+    The PAF line of every row is kept (row). Query and target names are
+    replaced by ids; minimap2 writes all alignments of a read together, so a
+    read id is the number of the run of lines with its name. The rows of a
+    read are found through its PAF lines (qoffsets) and the row of every PAF
+    line (qrows). Names are stored in id order, with their sort order for
+    lookup by bisection.
+
+    args:
+        paffile -> str: PAF file (or /dev/stdin) written by minimap2
+        storedir -> str: output directory
+        chunkbytes -> int: approximate number of PAF bytes parsed per block
+        blockrows -> int: rows per block when sorting the columns by contig
+    """
+    os.makedirs(storedir, exist_ok=True)
+    columns = {
+        name: _NpyColumn(os.path.join(storedir, name + ".paforder.npy"), dtype)
+        for name, dtype in PAF_STORE_COLUMNS.items()
+    }
+    qoffsets = _NpyColumn(os.path.join(storedir, "qoffsets.npy"), np.int64)
+    tids, tnames, qnames = {}, [], []
+    tcounts = np.zeros(0, dtype=np.int64)
+    lastname = None
+    rows = reads = 0
+    for chunk in iter_paf_chunks(paffile, chunkbytes):
+        names = chunk["qname"]
+        newread = np.ones(len(names), dtype=bool)
+        newread[1:] = names[1:] != names[:-1]
+        if lastname is not None and names[0] == lastname:
+            newread[0] = False
+        lastname = names[-1]
+        chunk["qid"] = reads + np.cumsum(newread) - 1
+        reads += int(newread.sum())
+        qnames.append(names[newread])
+        qoffsets.append(rows + np.flatnonzero(newread))
+        chunk["tid"] = _intern(chunk["tname"], tids, tnames)
+        counts = np.bincount(chunk["tid"], minlength=len(tnames))
+        counts[: len(tcounts)] += tcounts
+        tcounts = counts
+        for name, column in columns.items():
+            column.append(chunk[name])
+        rows += len(names)
+    qoffsets.append([rows])
+    for column in list(columns.values()) + [qoffsets]:
+        column.close()
+    qnames = np.concatenate(qnames) if qnames else np.zeros(0, dtype="S1")
+    tnames = np.array(tnames, dtype=bytes) if tnames else np.zeros(0, dtype="S1")
+    for key, names in (("q", qnames), ("t", tnames)):
+        np.save(os.path.join(storedir, key + "names.npy"), names)
+        np.save(os.path.join(storedir, key + "sorted.npy"), np.argsort(names, kind="stable").astype(np.uint32))
+    del qnames
+    # PAF line of every row sorted by contig: a counting sort of the contig column
+    toffsets = np.zeros(len(tnames) + 1, dtype=np.int64)
+    np.cumsum(tcounts, out=toffsets[1:])
+    np.save(os.path.join(storedir, "toffsets.npy"), toffsets)
+    row = np.lib.format.open_memmap(os.path.join(storedir, "row.npy"), mode="w+", dtype=np.int64, shape=(rows,))
+    cursor = toffsets[:-1].copy()
+    tid = np.load(os.path.join(storedir, "tid.paforder.npy"), mmap_mode="r")
+    for start in range(0, rows, blockrows):
+        block = np.asarray(tid[start : start + blockrows], dtype=np.int64)
+        order = np.argsort(block, kind="stable")
+        block = block[order]
+        counts = np.bincount(block, minlength=len(tnames))
+        rank = np.arange(len(block)) - (np.cumsum(counts) - counts)[block]
+        row[cursor[block] + rank] = start + order
+        cursor += counts
+    del tid
+    qrows = np.lib.format.open_memmap(os.path.join(storedir, "qrows.npy"), mode="w+", dtype=np.int64, shape=(rows,))
+    for start in range(0, rows, blockrows):
+        qrows[row[start : start + blockrows]] = np.arange(start, min(start + blockrows, rows))
+    qrows.flush()
+    del qrows
+    for name, dtype in PAF_STORE_COLUMNS.items():
+        paforder = os.path.join(storedir, name + ".paforder.npy")
+        column = np.load(paforder, mmap_mode="r")
+        sortedcolumn = np.lib.format.open_memmap(os.path.join(storedir, name + ".npy"), mode="w+", dtype=dtype, shape=(rows,))
+        for start in range(0, rows, blockrows):
+            sortedcolumn[start : start + blockrows] = column[row[start : start + blockrows]]
+        sortedcolumn.flush()
+        del column, sortedcolumn
+        os.remove(paforder)
+    row.flush()
+    del row
+
+
+def load_paf_store(storedir: str) -> dict:
+    """
+    Open a store written by write_paf_store; columns are memory mapped, so
+    only the rows that are used are read.
+
+    args:
+        storedir -> str: store directory
+    """
+    store = {}
+    for filename in os.listdir(storedir):
+        if filename.endswith(".npy"):
+            store[filename[: -len(".npy")]] = np.load(os.path.join(storedir, filename), mmap_mode="r")
+    return store
+
+
+class _SortedNames:
+    """
+    Names of a store in sorted order, read through the sort order, so the
+    names are bisected without a sorted copy.
+    """
+
+    def __init__(self, names: np.ndarray, order: np.ndarray):
+        self.names = names
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.names[self.order[i]]
+
+
+def name_ids(store: dict, key: str, names) -> np.ndarray:
+    """
+    Ids of the given contigs (key 't') or reads (key 'q'), found by bisection
+    in the sorted names; unknown names are skipped.
+
+    args:
+        store -> dict: load_paf_store output
+        key -> str: 't' for contigs, 'q' for reads
+        names -> iterable of str: contig or read names
+    """
+    order = store[key + "sorted"]
+    sortednames = _SortedNames(store[key + "names"], order)
+    ids = []
+    for name in names:
+        name = name.encode()
+        left = bisect.bisect_left(sortednames, name)
+        right = bisect.bisect_right(sortednames, name, left)
+        ids.extend(order[left:right])
+    return np.array(ids, dtype=np.int64)
+
+
+def store_rows(store: dict, key: str, names) -> np.ndarray:
+    """
+    Row numbers (in PAF order per name) of all alignments of the given
+    contigs (key 't') or reads (key 'q'), looked up through the store index.
+
+    args:
+        store -> dict: load_paf_store output
+        key -> str: 't' for contigs, 'q' for reads
+        names -> iterable of str: contig or read names
+    """
+    ids = name_ids(store, key, names)
+    if len(ids) == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = store[key + "offsets"]
+    rows = np.concatenate([np.arange(offsets[i], offsets[i + 1]) for i in ids])
+    if key == "q":
+        rows = np.asarray(store["qrows"][rows])
+    return rows
+
+
+def store_chunk(store: dict, rows) -> dict:
+    """
+    Columns of the given rows in the iter_paf_chunks format, plus the read id
+    (qid) and PAF line (row) of every row.
+
+    args:
+        store -> dict: load_paf_store output
+        rows -> np.ndarray or slice: row numbers
+    """
+    chunk = {name: np.asarray(store[name][rows], dtype=np.int64) for name in PAF_INT_COLUMNS}
+    chunk["qid"] = np.asarray(store["qid"][rows])
+    chunk["qname"] = np.asarray(store["qnames"][chunk["qid"]])
+    chunk["tname"] = np.asarray(store["tnames"][np.asarray(store["tid"][rows])])
+    chunk["strand"] = np.asarray(store["strand"][rows])
+    chunk["tp"] = np.asarray(store["tp"][rows])
+    chunk["primary"] = chunk["tp"] == ord("P")
+    chunk["row"] = np.asarray(store["row"][rows])
+    return chunk
+
+
+def iter_paf_store_chunks(store: dict, chunkrows: int = 1 << 20):
+    """
+    Read a store in blocks of rows, in the iter_paf_chunks format; the rows
+    come sorted by contig, in PAF order within a contig.
+
+    args:
+        store -> dict: load_paf_store output
+        chunkrows -> int: number of alignments per block
+    """
+    rows = len(store["qid"])
+    for start in range(0, rows, chunkrows):
+        yield store_chunk(store, slice(start, min(start + chunkrows, rows)))
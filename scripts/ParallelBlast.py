@@ -0,0 +1,56 @@
+from __future__ import division
+import argparse
+import os
+import subprocess
+from CacheTools import cache_file, load_cache, save_cache, cache_lookup, cache_merge
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-j", type=str, action='append', dest='jobs', nargs=4, metavar=('NAME', 'DB', 'QUERY', 'OUT'), help='define a blastn job: cache name, database, query fasta and outfmt 6 output (repeat for several jobs)')
+parser.add_argument("-t", type=int, action='store', dest='threads', default=1, help='define number of threads, split over the jobs')
+parser.add_argument("-d", type=str, action='store', dest='cachedir', metavar='CACHEDIR',help='define classification cache directory')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+BLASTPARAMS = ['-outfmt', '6']
+
+def databaseKey(db):
+    '''
+    input:
+    - blast database prefix
+    output:
+    - cache key from size and modification time of the database and the blast parameters
+    '''
+    for suffix in ('.nsq', '.nal'):
+        if os.path.exists(db + suffix):
+            stat = os.stat(db + suffix)
+            return str(stat.st_size) + ' ' + str(int(stat.st_mtime)) + ' ' + ' '.join(BLASTPARAMS)
+    return db + ' ' + ' '.join(BLASTPARAMS)
+
+#every job with uncached queries gets an equal share of the threads and all searches run at the same time
+jobs = []
+for name, db, query, out in args.jobs:
+    if not os.path.exists(query) or os.path.getsize(query) == 0:
+        open(out, 'w').close()
+        continue
+    cachefile = cache_file(args.cachedir, name, databaseKey(db))
+    cache = load_cache(cachefile)
+    misses = out + '.misses.fa'
+    jobs.append((db, query, out, cachefile, cache, misses, cache_lookup(query, cache, misses)))
+
+running = [job for job in jobs if job[6] > 0]
+threads = str(max(args.threads // max(len(running), 1), 1))
+processes = []
+for db, query, out, cachefile, cache, misses, nmisses in running:
+    processes.append(subprocess.Popen(['blastn', '-db', db, '-query', misses, '-out', out + '.new', '-num_threads', threads] + BLASTPARAMS))
+for process in processes:
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+
+for db, query, out, cachefile, cache, misses, nmisses in jobs:
+    if nmisses == 0:
+        open(out + '.new', 'w').close()
+    added = cache_merge(query, cache, out + '.new', out)
+    if added['rows']:
+        save_cache(cachefile, added)
+    os.remove(out + '.new')
+    os.remove(misses)
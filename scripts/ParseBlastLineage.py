@@ -1,11 +1,12 @@
 from __future__ import division
 import argparse
-import configparser
-import os
 import sys
+import numpy as np
+from TableTools import iter_line_blocks, field_bounds, parse_bytes, parse_int
 
 parser = argparse.ArgumentParser()
-parser.add_argument("-b", type=str, action='store', dest='blast', metavar='BLAST',help='define blast outfmt 6')
+parser.add_argument("-b", type=str, action='store', dest='blast', metavar='BLAST', nargs='+', help='define blast outfmt 6 (one or more files)')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT', nargs='+', help='define output per blast file (default: print all to stdout)')
 parser.add_argument('--version', action='version', version='%(prog)s 1.0')
 parser.add_argument("-na", type=str, action='store', dest='namesfile', metavar='NAMES',help='NCBI names.dmp')
 parser.add_argument("-no", type=str, action='store', dest='nodesfile', metavar='NODES',help='NCBI nodes.dmp')
@@ -23,105 +24,170 @@ def readNames(names_tax_file):
     tax_names_reverse= {}
     with open(names_tax_file, 'r') as nodes_tax:
         for line in nodes_tax:
-            node = [field.strip() for field in line.split('|')]
             if 'scientific' in line:
-                tax_names[node[1]] = node[0]
-                tax_names_reverse[node[0]] = node[1]
+                node = line.split('\t|\t', 2)
+                tax_names[node[1].strip()] = int(node[0])
+                tax_names_reverse[int(node[0])] = node[1].strip()
     return tax_names_reverse,tax_names
 
 def readNodes(nodes_tax_file):
-
     '''
     input:
     - nodes.dmp (NCBI Taxonomy)
     output:
-    - dictionary of form {parent: node}
-    - dictionary of form {node: type}
+    - array of form parent[node], -1 for taxids not in nodes.dmp
+    - array of form rank[node] with rank codes
+    - dictionary of form {rank: rank code}
     '''
-
-    tax_nodes = {}
-    tax_types = {}
+    nodes = []
+    parents = []
+    ranks = []
+    rankcodes = {}
     with open(nodes_tax_file, 'r') as nodes_tax:
         for line in nodes_tax:
-            node = [field.strip() for field in line.split('|')]         #make list of line
-            tax_nodes[node[0]] = node[1]                                #couple node with parent
-            tax_types[node[0]] = node[2]                                #couple node with rank
-    return tax_nodes,tax_types
-
-
-def getTaxParent(tax_nodes, tax_types, taxid, ranking):
-
+            node = line.split('\t|\t', 3)
+            nodes.append(int(node[0]))
+            parents.append(int(node[1]))
+            ranks.append(rankcodes.setdefault(node[2].strip(), len(rankcodes)))
+    nodes = np.array(nodes, dtype=np.int64)
+    tax_parents = np.full(nodes.max() + 1, -1, dtype=np.int64)
+    tax_parents[nodes] = parents
+    tax_ranks = np.full(nodes.max() + 1, -1, dtype=np.int64)
+    tax_ranks[nodes] = ranks
+    return tax_parents,tax_ranks,rankcodes
+
+def rankAncestor(tax_parents, tax_ranks, rank):
     '''
     input:
-    - dictionary of form {parent: node} (readNodes output)
-    - dictionary of form {node: type} (readNodes output)
-    - taxid
+    - parent and rank arrays (readNodes output)
+    - rank code
     output:
-    - dictionary of form {tax_id: [descendants]}
+    - array of form ancestor[node]: the closest ancestor (excluding the node itself) of that rank, or the root when there is none
     '''
-    tax_parents = {}
-    node = str(taxid)
-    if node not in tax_types:                                       #check if node in nodes.dmp
-        tax_parents[node] = None
-        print('[Warning] Could not find {} in nodes.dmp while parsing taxonomy hierarchy\n'.format(node))
-
-    else:
-        parent = tax_nodes[node]                                    #get parent for current node
-        tax_parents[node] = [parent]                                #add node to dictionary
-
-        while parent != tax_nodes[parent] and tax_types[parent]!= ranking:    #stop when parent = parent(parent) (i.e. 1 = 1)
-            parent = tax_nodes[parent]                              #get parent of parent
-            tax_parents[node].append(parent)                        #add parent to node in dictionary
-
-    return tax_parents
-
-
-taxparents,taxtypes=readNodes(args.nodesfile)
+    known = np.flatnonzero(tax_parents >= 0)
+    ancestor = np.full(len(tax_parents), -1, dtype=np.int64)
+    current = tax_parents[known]
+    #all nodes climb one level per step until they reach the rank or the root (its own parent)
+    active = np.arange(len(known))
+    while len(active) > 0:
+        node = current[active]
+        stop = (tax_ranks[node] == rank) | (tax_parents[node] == node)
+        current[active[~stop]] = tax_parents[node[~stop]]
+        active = active[~stop]
+    ancestor[known] = current
+    return ancestor
+
+def lineageString(tax_parents, tax_ranks, taxnames, namestax, name, rank):
+    '''
+    input:
+    - parent and rank arrays (readNodes output)
+    - dictionaries of form {node: name} and {sci name: node} (readNames output)
+    - scientific name and rank code to stop at
+    output:
+    - names of the ancestors up to the rank (or the root) and the name itself, joined by ';'
+    '''
+    lineage = []
+    parent = tax_parents[namestax[name]]
+    lineage.append(parent)
+    while parent != tax_parents[parent] and tax_ranks[parent] != rank:
+        parent = tax_parents[parent]
+        lineage.append(parent)
+    return ''.join(taxnames[elem] + ';' for elem in reversed(lineage)) + name + ';'
+
+def readBlast(blastfile):
+    '''
+    input:
+    - blast outfmt 6 file, subject ids ending on |taxid
+    output:
+    - arrays of query index (in order of appearance), subject taxid (-1 if missing) and percent identity, plus the query names
+    '''
+    queries = []
+    taxids = []
+    pidents = []
+    for data in iter_line_blocks(blastfile):
+        starts, ends = field_bounds(data, 3)
+        queries.append(parse_bytes(data, starts[:, 0], ends[:, 0]))
+        #the taxid follows the last '|' of the subject id
+        pipes = np.flatnonzero(data == ord('|'))
+        last = np.searchsorted(pipes, ends[:, 1]) - 1
+        taxstart = np.where(last >= 0, pipes[np.maximum(last, 0)] + 1, 0)
+        taxstart = np.maximum(taxstart, starts[:, 1])
+        taxfield = parse_bytes(data, taxstart, ends[:, 1])
+        try:
+            taxid = taxfield.astype(np.int64)
+        except ValueError:
+            valid = np.char.isdigit(taxfield)
+            taxid = np.full(len(taxfield), -1, dtype=np.int64)
+            taxid[valid] = taxfield[valid].astype(np.int64)
+        taxids.append(taxid)
+        pidents.append(parse_bytes(data, starts[:, 2], ends[:, 2]).astype(np.float64))
+    if not queries:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0, dtype=bytes)
+    names, first, inverse = np.unique(np.concatenate(queries), return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()], np.concatenate(taxids), np.concatenate(pidents), names[order]
+
+def familyLineages(blastfile):
+    '''
+    input:
+    - blast outfmt 6 file
+    output:
+    - list of lineage strings of the families holding the majority of the top hits of a query
+    '''
+    query, taxid, pident, queries = readBlast(blastfile)
+    if len(query) == 0:
+        return []
+    #position of every hit in its block of consecutive hits of one query; the first hit is skipped, the next nine are counted
+    rows = np.arange(len(query))
+    blockstart = np.ones(len(query), dtype=bool)
+    blockstart[1:] = query[1:] != query[:-1]
+    position = rows - np.maximum.accumulate(np.where(blockstart, rows, 0))
+    keep = (position >= 1) & (position < 10) & (pident > 90)
+
+    missing = keep & ((taxid < 0) | (taxid >= len(taxparents)) | (taxparents[np.clip(taxid, 0, len(taxparents) - 1)] < 0))
+    for node in np.unique(taxid[missing]):
+        sys.stderr.write('[Warning] Could not find {} in nodes.dmp while parsing taxonomy hierarchy\n'.format(node))
+    keep &= ~missing
+    family = familyof[taxid[keep]]
+    query = query[keep]
+    rows = rows[keep]
+    #hits without a family ancestor end at the root and are not counted
+    counted = taxparents[family] != family
+    family, query, rows = family[counted], query[counted], rows[counted]
+    if len(family) == 0:
+        return []
+
+    #families are voted by name; a family wins with more than half of the counted hits of the query
+    famnames, famname = np.unique(np.array([taxnames[node] for node in family], dtype=str), return_inverse=True)
+    famname = famname.ravel()
+    key = query * len(famnames) + famname
+    pairs, firstrow, counts = np.unique(key, return_index=True, return_counts=True)
+    total = np.bincount(query, minlength=len(queries))
+    pairquery = pairs // len(famnames)
+    winners = counts > total[pairquery] // 2
+    order = np.lexsort((rows[firstrow[winners]], pairquery[winners]))
+    lineages = []
+    seen = set()
+    for name in famnames[(pairs[winners] % len(famnames))[order]]:
+        if name not in seen:
+            seen.add(name)
+            lineages.append(lineageString(taxparents, taxranks, taxnames, namestax, name, rankcodes.get('superkingdom', -2)))
+    return lineages
+
+#the taxonomy is loaded once for all blast files
+taxparents,taxranks,rankcodes=readNodes(args.nodesfile)
 taxnames,namestax=readNames(args.namesfile)
-
-currentread=""
-i=0
-familyhits={}
-f =open(args.blast,'r')
-for record in f:
-        record=record.strip()
-        readname=record.split('\t')[0]
-        if readname not  in familyhits:
-            familyhits[readname]={}
-            familyhits[readname]['families']={}
-            familyhits[readname]['total']=0
-        if readname != currentread:
-            currentread=readname
-            i=0
-        elif i < 10:
-            if float(record.split('\t')[2]) > 90:
-                taxid=record.split('\t')[1].split('|')[-1]
-                lineage=getTaxParent(taxparents,taxtypes,taxid,'family')
-                hitfamily=taxnames[lineage[taxid][-1]]
-                if hitfamily != 'root':
-                    familyhits[readname]['total']=familyhits[readname]['total']+1
-                    if hitfamily not in familyhits[readname]['families']:
-                        familyhits[readname]['families'][hitfamily] = 1
-                    else:
-                        familyhits[readname]['families'][hitfamily] = familyhits[readname]['families'][hitfamily] +1
-                    #print(readname+'\t'+record.split('\t')[1]+'\t'+taxid+'\t'+hitfamily)
-        i=i+1
-
-
-finalfams=[]
-for read in familyhits:
-    numberhits=int(int(familyhits[read]['total'])/2)
-    #print(read+'\t'+str(numberhits))
-    for fam in familyhits[read]['families']:
-        #print(read+'\t'+str(familyhits[read]['families'][fam])+'\t'+fam)
-        if int(familyhits[read]['families'][fam]) > numberhits:
-            #print(read+'\t'+str(familyhits[read]['families'][fam])+'\t'+fam)
-            if fam not in finalfams:
-                finalfams.append(fam)
-                fulllineage=getTaxParent(taxparents,taxtypes,namestax[fam],'superkingdom')
-                lineagetoconv=fulllineage[namestax[fam]]
-                lineagestring=""
-                for elem in reversed(lineagetoconv):
-                    lineagestring=lineagestring+taxnames[elem]+";"
-                lineagestring=lineagestring+fam+';'
-                print(lineagestring)
+familyof=rankAncestor(taxparents,taxranks,rankcodes.get('family', -2))
+
+for n,blastfile in enumerate(args.blast):
+    lineages=familyLineages(blastfile)
+    if args.out:
+        k=open(args.out[n],'w')
+        for lineagestring in lineages:
+            k.write(lineagestring+'\n')
+        k.close()
+    else:
+        for lineagestring in lineages:
+            print(lineagestring)
@@ -3,81 +3,110 @@ import argparse
 import configparser
 import os
 import sys
+import numpy as np
+from CoverageTools import covered_bases
+from FastaTools import read_fasta
+from PafTools import iter_paf_chunks
+from CacheTools import cache_file, load_cache, save_cache, sequence_hash
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-n", type=str, action='store', dest='nucmer', help='define nucmer coords file')
+parser.add_argument("-p", type=str, action='store', dest='paf', help='define minimap2 PAF file of the contigs against the reference genomes (instead of -n)')
 parser.add_argument("-o", type=str, action='store', dest='out',help='define contig file')
+parser.add_argument("-f", type=str, action='store', dest='fasta', help='define fasta file of all contigs, to merge the coverage of the aligned contigs with the cached coverage of the others (with -d)')
+parser.add_argument("-d", type=str, action='store', dest='cachedir', help='define alignment cache directory')
+parser.add_argument("-e", type=str, action='store', dest='engine', help='define alignment engine (cache name)')
+parser.add_argument("-k", type=str, action='store', dest='key', help='define reference genomes and parameters the alignments depend on')
+parser.add_argument("-m", type=float, action='store', dest='mincoverage', default=50, help='define percentage of a contig covered by the reference genomes to be complete (default 50)')
 parser.add_argument('--version', action='version', version='%(prog)s 1.0')
 args = parser.parse_args()
 
-def sort_condense(ivs):
-    if len(ivs) == 0:
-        return []
-    if len(ivs) == 1:
-        if ivs[0][0] > ivs[0][1]:
-            return [(ivs[0][1], ivs[0][0])]
-        else:
-            return ivs
-    eps = []
-    for iv in ivs:
-        ivl = min(iv)
-        ivr = max(iv)
-        eps.append((ivl, False))
-        eps.append((ivr, True))
-    eps.sort()
-    ret = []
-    level = 0
-    i = 0
-    while i < len(eps)-1:
-        if not eps[i][1]:
-            level = level+1
-            if level == 1:
-                left = eps[i][0]
-        else:
-            if level == 1:
-                if not eps[i+1][1] and eps[i+1][0] == eps[i][0]+1:
-                    i = i+2
-                    continue
-                right = eps[i][0]
-                ret.append((left, right))
-            level = level-1
-        i = i+1
-    ret.append((left, eps[len(eps)-1][0]))
-    return ret
+#same minimum alignment length as show-coords -L 100
+MINLENGTH = 100
+
+def readCoords(coordsfile):
+    '''
+    input:
+    - show-coords -c -l -r -T output, contigs as reference
+    output:
+    - dictionary of form {contig: index} in order of appearance, contig lengths
+    - arrays of contig index, start and end (0-based, end exclusive) of the alignments
+    '''
+    contigs={}
+    lengths=[]
+    tids=[]
+    starts=[]
+    ends=[]
+    f =open(coordsfile,'r')
+    for record in f:
+            if record[0].isdigit():
+                fields=record.rstrip('\n').split('\t')
+                query=fields[11]
+                if query not in contigs:
+                    contigs[query]=len(contigs)
+                    lengths.append(int(fields[7]))
+                tids.append(contigs[query])
+                #show-coords positions are 1-based and inclusive
+                starts.append(int(fields[0])-1)
+                ends.append(int(fields[1]))
+    f.close()
+    return contigs,lengths,np.array(tids,dtype=np.int64),np.array(starts,dtype=np.int64),np.array(ends,dtype=np.int64)
+
+def readPaf(paffile):
+    '''
+    input:
+    - PAF file, contigs as query
+    output:
+    - dictionary of form {contig: index} in sorted order (as show-coords -r), contig lengths
+    - arrays of contig index, start and end (0-based, end exclusive) of the alignments of at least MINLENGTH bases
+    '''
+    names=[]
+    lengths=[]
+    starts=[]
+    ends=[]
+    for chunk in iter_paf_chunks(paffile):
+        keep=(chunk["qend"]-chunk["qstart"])>=MINLENGTH
+        names.append(chunk["qname"][keep])
+        lengths.append(chunk["qlen"][keep])
+        starts.append(chunk["qstart"][keep])
+        ends.append(chunk["qend"][keep])
+    if not names:
+        return {},[],np.zeros(0,dtype=np.int64),np.zeros(0,dtype=np.int64),np.zeros(0,dtype=np.int64)
+    unique,first,tids=np.unique(np.concatenate(names),return_index=True,return_inverse=True)
+    contigs={name.decode():i for i,name in enumerate(unique)}
+    return contigs,np.concatenate(lengths)[first].tolist(),tids.ravel(),np.concatenate(starts),np.concatenate(ends)
 
-alns={}
-f =open(args.nucmer,'r')
-for record in f:
-        if record[0].isdigit():
-            query=record.split('\t')[11]
-            querylen=int(record.split('\t')[7])
-            start=int(record.split('\t')[0])
-            stop=int(record.split('\t')[1])
-            coords=(int(record.split('\t')[0]),int(record.split('\t')[1]))
-            if query not in alns:
-                alns[query]={}
-                alns[query]['length']=querylen
-                alns[query]['alns']=[]
-            alns[query]['alns'].append(coords)
-f.close()
+if args.paf:
+    contigs,lengths,tids,starts,ends=readPaf(args.paf)
+else:
+    contigs,lengths,tids,starts,ends=readCoords(args.nucmer)
+
+covered=covered_bases(tids,starts,ends,len(contigs))
+overview={ctg:(lengths[i],float(int(covered[i])/lengths[i])*100) for ctg,i in contigs.items()}
+
+if args.cachedir:
+    #contigs without alignments are cached without rows, so they are not aligned again either
+    cachefile=cache_file(args.cachedir,args.engine,args.key)
+    cache=load_cache(cachefile)
+    added={'header':None,'rows':{}}
+    for name,seq in read_fasta(args.fasta):
+        seqhash=sequence_hash(seq)
+        if seqhash in cache['rows']:
+            for row in cache['rows'][seqhash]:
+                length,percentagectg=row.split('\t')
+                overview[name]=(int(length),float(percentagectg))
+        elif name in overview:
+            added['rows'][seqhash]=[str(overview[name][0])+'\t'+str(overview[name][1])]
+        else:
+            added['rows'][seqhash]=[]
+    if added['rows']:
+        save_cache(cachefile,added)
 
 k=open(args.out,'w')
-finalcontigs=[]
-for ctg in alns:
-    #print(ctg+'\t'+str(alns[ctg]['length']))
-    l1=sorted(alns[ctg]['alns'])
-    finalcoords=sort_condense(l1)
-    totallen=0
-    for coord in finalcoords:
-        lencoord=coord[1]-coord[0]
-        totallen=totallen+lencoord
-    percentagectg=(float(totallen/alns[ctg]['length'])*100)
-    if percentagectg >= 50:
-        finalcontigs.append(ctg)
-        #totalreads.extend(alns[ctg]['reads'])
-        k.write(ctg+'\t'+str(alns[ctg]['length'])+'\t'+str(percentagectg)+'%\n')
-        #print(finalcoords)
+for ctg in sorted(overview):
+    length,percentagectg=overview[ctg]
+    if percentagectg >= args.mincoverage:
+        k.write(ctg+'\t'+str(length)+'\t'+str(percentagectg)+'%\n')
     else:
-        k.write('NOT COMPLETE:\t'+ctg+'\t'+str(alns[ctg]['length'])+'\t'+str(percentagectg)+'%\n')
-        #print(finalcoords)
-k.close()
\ No newline at end of file
+        k.write('NOT COMPLETE:\t'+ctg+'\t'+str(length)+'\t'+str(percentagectg)+'%\n')
+k.close()
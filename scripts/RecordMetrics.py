@@ -0,0 +1,86 @@
+from __future__ import division
+import argparse
+import json
+import os
+from FastaTools import read_fai
+from MetricsTools import record_metrics
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-m", type=str, action='store', dest='store', metavar='STORE',help='define metrics store of the sample')
+parser.add_argument("-g", type=str, action='store', dest='genus', metavar='GENUS',help='define genus')
+parser.add_argument("-c", type=str, action='append', nargs=2, dest='counts', default=[], metavar=('KEY', 'FILE'), help='record the number of ids in FILE (one per line) as KEY')
+parser.add_argument("-b", type=str, action='append', nargs=2, dest='busco', default=[], metavar=('KEY', 'SUMMARY'), help='record the score line of a BUSCO summary as KEY (null when there is none)')
+parser.add_argument("-i", type=str, action='append', nargs=3, dest='contigs', default=[], metavar=('KEY', 'FAI', 'IDS'), help='record the number and total length of the contigs in IDS as KEY_Contigs and KEY_ContigLength, with the lengths from FAI')
+parser.add_argument("-k", type=str, action='append', nargs=2, dest='kraken', default=[], metavar=('KEY', 'REPORT'), help='record the percentage of reads of the genus in a kraken report as KEY')
+parser.add_argument("-j", type=str, action='append', nargs=2, dest='json', default=[], metavar=('KEY', 'JSON'), help='record the content of a json file as KEY (null when the file is missing or empty)')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def countLines(filename):
+    '''
+    input:
+    - list of ids, one per line
+    output:
+    - number of non-empty lines (0 when the file is missing)
+    '''
+    if not os.path.exists(filename):
+        return 0
+    with open(filename, 'r') as f:
+        return sum(1 for line in f if line.strip())
+
+def buscoScore(summaryfile):
+    '''
+    input:
+    - BUSCO short summary
+    output:
+    - the one-line score (C:...), None when there is none
+    '''
+    score = None
+    if os.path.exists(summaryfile):
+        with open(summaryfile, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('C'):
+                    score = line
+    return score
+
+def krakenPercentage(reportfile, genus):
+    '''
+    input:
+    - kraken report
+    - genus
+    output:
+    - percentage of the reads classified as the genus (0 when not reported)
+    '''
+    percentage = 0
+    searchpattern = ' ' + genus + '\n'
+    with open(reportfile, 'r') as m:
+        for line in m:
+            if searchpattern in line:
+                percentage = float(line.split('\t')[0])
+    return percentage
+
+metrics = {}
+for key, filename in args.counts:
+    metrics[key] = countLines(filename)
+#a missing result is recorded as well, so it replaces the result of an earlier run
+for key, summaryfile in args.busco:
+    metrics[key] = buscoScore(summaryfile)
+for key, faifile, idsfile in args.contigs:
+    index = read_fai(faifile)
+    ids = set()
+    with open(idsfile, 'r') as f:
+        for line in f:
+            if line.strip() in index:
+                ids.add(line.strip())
+    metrics[key + '_Contigs'] = len(ids)
+    metrics[key + '_ContigLength'] = sum(index[contig][0] for contig in ids)
+for key, reportfile in args.kraken:
+    metrics[key] = krakenPercentage(reportfile, args.genus)
+for key, jsonfile in args.json:
+    metrics[key] = None
+    if os.path.exists(jsonfile) and os.path.getsize(jsonfile) > 0:
+        with open(jsonfile, 'r') as f:
+            metrics[key] = json.load(f)
+
+record_metrics(args.store, args.genus, metrics)
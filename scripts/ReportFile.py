@@ -6,6 +6,8 @@ import os
 import sys
 import glob
 import json
+from AssemblyTools import assembly_stats
+from MetricsTools import format_metric, load_metrics
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-o", type=str, action='store', dest='out',help='define report file')
@@ -17,28 +19,6 @@ parser.add_argument("-lm", type=str, action='store', dest='listmicro', help='def
 parser.add_argument('--version', action='version', version='%(prog)s 1.0')
 args = parser.parse_args()
 
-def calculate_N50(list_of_lengths):
-    """Calculate N50 for a sequence of numbers.
- 
-    Args:
-        list_of_lengths (list): List of numbers.
- 
-    Returns:
-        float: N50 value.
- 
-    """
-    tmp = []
-    for tmp_number in set(list_of_lengths):
-            tmp += [tmp_number] * list_of_lengths.count(tmp_number) * tmp_number
-    tmp.sort()
- 
-    if (len(tmp) % 2) == 0:
-        median = (tmp[int(len(tmp) / 2) - 1] + tmp[int(len(tmp) / 2)]) / 2
-    else:
-        median = tmp[int(len(tmp) / 2)]
- 
-    return median
-
 def Average(lst): 
     return sum(lst) / len(lst) 
 
@@ -128,46 +108,24 @@ for line in k:
 reportdict['SpeciesPresent'][representative]['Cluster']=clusterctgs
 k.close()
 reportdict['Families']={}
+#counts and summaries recorded by the pipeline stages
+metrics=load_metrics(wd+'/metrics.jsonl')
 for filename in glob.glob(wd+'/*/kraken.reads'):
     genusname=filename.split('/')[-2]
+    genusmetrics=metrics.get(genusname,{})
     reportdict['Families'][genusname]={}
     pdf.set_font("Arial", "B", size=12)
     pdf.cell(200,12,txt=genusname, ln=1, align="L")
     pdf.set_font("Arial", size=10)
-    if os.path.getsize(filename) > 0:
-        num_lines = sum(1 for line in open(filename))
-    else:
-        num_lines = 0
-    percentage=0
-    krakenrep=wd+'/kraken.report'
-    m=open(krakenrep,'r')
-    for line in m:
-        #line=line.strip()
-        searchpattern=' '+genusname+'\n'
-        if searchpattern in line:
-            percentage=float(line.split('\t')[0])
-    m.close()
-    pdf.cell(200, 6, txt="There are "+str(num_lines)+" reads ("+str(percentage)+"%) classified by Kraken as "+genusname+"." , ln=1, align="L")
+    #counts are None (NA) when they were not recorded, e.g. in a working directory of an older version
+    num_lines=genusmetrics.get('ClassifiedReads')
+    percentage=genusmetrics.get('ClassifiedReadsPercentage')
+    pdf.cell(200, 6, txt="There are "+format_metric(num_lines)+" reads ("+format_metric(percentage)+"%) classified by Kraken as "+genusname+"." , ln=1, align="L")
     reportdict['Families'][genusname]['ClassifiedReads']=num_lines
     reportdict['Families'][genusname]['ClassifiedReadsPercentage']=percentage
-    readfile=wd+'/'+genusname+'/'+genusname+".reads2assemble.fa"
-    counter=0
-    k=open(readfile,'r')
-    for line in k:
-        line=line.strip()
-        if line.startswith('>'):
-            counter=counter+1
-    k.close()
-    if counter > 100000:
-        reportdict['Families'][genusname]['Busco_ClassifiedReads']="Too many reads - NA "
-    buscooutput =  wd+'/'+genusname+'/buscoReads/summary.txt'
-    k=open(buscooutput,'r')
-    for line in k:
-        line=line.strip()
-        if line.startswith('C'):
-            reportdict['Families'][genusname]['Busco_ClassifiedReads']=line
-            pdf.cell(200, 6, txt=line, ln=1, align="L")
-    k.close()
+    #BUSCO scores are None (NA) when BUSCO gave no result
+    reportdict['Families'][genusname]['Busco_ClassifiedReads']=genusmetrics.get('Busco_ClassifiedReads')
+    pdf.cell(200, 6, txt=genusmetrics.get('Busco_ClassifiedReads') or 'NA', ln=1, align="L")
     pdf.cell(200, 6,ln=1, align="L")
 
     completeness=wd+'/'+genusname+'/busco/completeness_per_contig.txt'
@@ -180,14 +138,8 @@ for filename in glob.glob(wd+'/*/kraken.reads'):
         line=line.replace('\t',';')
         pdf.cell(200, 6, txt=line, ln=1, align="L")
     l.close()
-    buscooutput =  wd+'/'+genusname+'/busco/summary.txt'
-    k=open(buscooutput,'r')
-    for line in k:
-        line=line.strip()
-        if line.startswith('C'):
-            reportdict['Families'][genusname]['Busco_Assembly']=line
-            pdf.cell(200, 6, txt=line, ln=1, align="L")
-    k.close()
+    reportdict['Families'][genusname]['Busco_Assembly']=genusmetrics.get('Busco_Assembly')
+    pdf.cell(200, 6, txt=genusmetrics.get('Busco_Assembly') or 'NA', ln=1, align="L")
     pdf.cell(200, 6,ln=1, align="L")
 
     pdf.set_font("Arial", "U", size=10)
@@ -203,35 +155,19 @@ for filename in glob.glob(wd+'/*/kraken.reads'):
     l.close()
     pdf.cell(200, 6,ln=1, align="L")
 
-    readids=wd+'/'+genusname+'/'+genusname+'.final_reads.fa'
-    num_lines_reads=0
-    k=open(readids,'r')
-    for line in k:
-        line=line.strip()
-        if line.startswith('>'):
-            num_lines_reads=num_lines_reads+1
-    k.close()
-    fastafile = wd + '/' + genusname + '/' +genusname+'.finalassembly.fa'
-    num_contigs=0
-    totallen=0
-    seqlen=0
-    l=open(fastafile,'r')
-    for line in l:
-        if line.startswith('>'):
-            num_contigs=num_contigs+1
-            totallen=totallen+seqlen
-            seqlen=0
-        else:
-            seqlen=seqlen+len(line)
-    totallen=totallen+seqlen
-    mblen="{:.2f}".format(float(totallen/1000000))+"Mb"
-    pdf.cell(200, 6, txt="There are "+str(num_lines_reads)+" reads mapping to the full length of "+str(num_contigs)+" contigs ("+mblen+") containing BUSCO genes " , ln=1, align="L")
+    num_lines_reads=genusmetrics.get('BuscoNucmer_Assembly_Reads')
+    num_contigs=genusmetrics.get('BuscoNucmer_Assembly_Contigs')
+    totallen=genusmetrics.get('BuscoNucmer_Assembly_ContigLength')
+    mblen=format_metric(None if totallen is None else totallen/1000000,"{:.2f}Mb")
+    pdf.cell(200, 6, txt="There are "+format_metric(num_lines_reads)+" reads mapping to the full length of "+format_metric(num_contigs)+" contigs ("+mblen+") containing BUSCO genes " , ln=1, align="L")
     pdf.cell(200, 6, txt="and/or mapping to refseq genomes." , ln=1, align="L")
     reportdict['Families'][genusname]['BuscoNucmer_Assembly_Contigs']=num_contigs
     reportdict['Families'][genusname]['BuscoNucmer_Assembly_ContigLength']=mblen
     reportdict['Families'][genusname]['BuscoNucmer_Assembly_Reads']=num_lines_reads
 
-    if int(num_lines) > 0:
+    if num_lines is None or num_lines_reads is None:
+        totalfraction='NA'
+    elif int(num_lines) > 0:
         totalfraction="{:.2f}".format(float(num_lines_reads/num_lines)*100)
         if (float(num_lines_reads/num_lines)*100) < 80:
             pdf.set_font("Arial", "B", size=10)
@@ -244,60 +180,28 @@ for filename in glob.glob(wd+'/*/kraken.reads'):
     pdf.set_font("Arial", "U", size=10)
     pdf.cell(200, 6, txt="Hifiasm assembly", ln=1, align="L")
     pdf.set_font("Arial", size=10)
-    buscocontigs_asm= wd + '/' + genusname + '/' + genusname + '.re-assembly.fa'
-    buscocontigs=[]
-    l=open(buscocontigs_asm,'r')
-    for line in l:
-        line=line.strip()
-        if line.startswith('>'):
-            buscocontigs.append(line.split('>')[1])
-    l.close()
-    assemblyfile = wd + '/' + genusname + '/hifiasm/hifiasm.p_ctg.fasta.fai'
-    print(assemblyfile)
-    num_contigs_hifiasm = 0
-    if os.path.exists(assemblyfile) and os.path.getsize(assemblyfile) > 0:
-        num_contigs_hifiasm = sum(1 for line in open(assemblyfile))
-    lengths=[]
-    totallen=0
-    totallenbusco=0
-    if os.path.exists(assemblyfile) and os.path.getsize(assemblyfile) > 0:
-        l=open(assemblyfile,'r')
-        for line in l:
-            idname=line.split('\t')[0]
-            length=int(line.split('\t')[1])
-            if idname in buscocontigs:
-                totallenbusco=totallenbusco+length
-            totallen=totallen+length
-            lengths.append(length)
-        l.close()
-    N50=0
-    if len(lengths) > 0:
-        N50=calculate_N50(lengths)
-    kblenN50="{:.2f}".format(float(N50/1000))+"kb"
-    mblen="{:.2f}".format(float(totallen/1000000))+"Mb"
-    b_mblen="{:.2f}".format(float(totallenbusco/1000000))+"Mb"
-    pdf.cell(200, 6, txt="Hifiasm assembled "+str(num_contigs_hifiasm)+" contigs with an N50 of "+kblenN50+" and a total length of "+mblen+".", ln=1, align="L")
-    buscooutput =  wd+'/'+genusname+'/buscoAssembly/summary.txt'
-    k=open(buscooutput,'r')
-    for line in k:
-        line=line.strip()
-        if line.startswith('C'):
-            pdf.cell(200, 6, txt=line, ln=1, align="L")
-            reportdict['Families'][genusname]['Busco_Re-Assembly']=line
-    k.close()
-
-    putreadids=wd+'/'+genusname+'/'+genusname+'.re-assembly_reads.fa'
-    num_lines_put=0
-    k=open(putreadids,'r')
-    for line in k:
-        line=line.strip()
-        if line.startswith('>'):
-            num_lines_put=num_lines_put+1
-    k.close()
-    pdf.cell(200, 6, txt="There are "+str(num_lines_put)+" reads mapping to the full length of "+str(len(buscocontigs))+" contigs ("+b_mblen+") containing BUSCO genes " , ln=1, align="L")
+    #statistics written next to the assembly by GfaToFasta.py, None when hifiasm assembled nothing (NA when not recorded at all)
+    stats=genusmetrics.get('Re-Assembly_Stats')
+    if stats is None and 'Re-Assembly_Stats' in genusmetrics:
+        stats=assembly_stats([])
+    reportdict['Families'][genusname]['Re-Assembly_Stats']=stats
+    if stats is None:
+        stats=dict.fromkeys(assembly_stats([]))
+    num_contigs_hifiasm=format_metric(stats['contigs'])
+    kblenN50=format_metric(None if stats['n50'] is None else stats['n50']/1000,"{:.2f}kb")
+    mblen=format_metric(None if stats['total_length'] is None else stats['total_length']/1000000,"{:.2f}Mb")
+    pdf.cell(200, 6, txt="Hifiasm assembled "+num_contigs_hifiasm+" contigs with an N50 of "+kblenN50+" and a total length of "+mblen+".", ln=1, align="L")
+    pdf.cell(200, 6, txt=genusmetrics.get('Busco_Re-Assembly') or 'NA', ln=1, align="L")
+    reportdict['Families'][genusname]['Busco_Re-Assembly']=genusmetrics.get('Busco_Re-Assembly')
+
+    num_lines_put=genusmetrics.get('BuscoNucmer_Re-Assembly_Reads')
+    num_contigs_busco=genusmetrics.get('BuscoNucmer_Re-Assembly_Contigs')
+    totallenbusco=genusmetrics.get('BuscoNucmer_Re-Assembly_ContigLength')
+    b_mblen=format_metric(None if totallenbusco is None else totallenbusco/1000000,"{:.2f}Mb")
+    pdf.cell(200, 6, txt="There are "+format_metric(num_lines_put)+" reads mapping to the full length of "+format_metric(num_contigs_busco)+" contigs ("+b_mblen+") containing BUSCO genes " , ln=1, align="L")
     pdf.cell(200, 6, txt="and/or mapping to refseq genomes." , ln=1, align="L")
 
-    reportdict['Families'][genusname]['BuscoNucmer_Re-Assembly_Contigs']=len(buscocontigs)
+    reportdict['Families'][genusname]['BuscoNucmer_Re-Assembly_Contigs']=num_contigs_busco
     reportdict['Families'][genusname]['BuscoNucmer_Re-Assembly_ContigLength']=b_mblen
     reportdict['Families'][genusname]['BuscoNucmer_Re-Assembly_Reads']=num_lines_put
     #refseqfile=args.datadir+'/'+genusname+'/'+genusname+'.refseq.log'
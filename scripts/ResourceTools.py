@@ -0,0 +1,275 @@
+import json
+import math
+import os
+
+# prior cost of the per-genus rules, replaced by the fit of their benchmarks once
+# calibrated: cpu seconds and peak memory (MB) as base + per MB of input; the
+# memory is that of one run, per MB of the input of one run, which includes the
+# index minimap2 loads (Map2Assembly) and is a chunk of the reads when several
+# BUSCO runs are started at once (RunBuscoReads)
+DEFAULT_MODEL = {
+    "Map2Assembly": {
+        "cpu_s": 60,
+        "cpu_s_per_mb": 2,
+        "mem_mb": 2000,
+        "mem_mb_per_mb": 1.5,
+    },
+    "Hifiasm": {
+        "cpu_s": 30,
+        "cpu_s_per_mb": 30,
+        "mem_mb": 500,
+        "mem_mb_per_mb": 10,
+    },
+    "RunBusco": {
+        "cpu_s": 120,
+        "cpu_s_per_mb": 20,
+        "mem_mb": 2000,
+        "mem_mb_per_mb": 20,
+    },
+    "RunBuscoAssembly": {
+        "cpu_s": 120,
+        "cpu_s_per_mb": 20,
+        "mem_mb": 2000,
+        "mem_mb_per_mb": 20,
+    },
+    "RunBuscoReads": {
+        "cpu_s": 120,
+        "cpu_s_per_mb": 20,
+        "mem_mb": 2000,
+        "mem_mb_per_mb": 20,
+    },
+    "Map2AssemblyHifiasm": {
+        "cpu_s": 10,
+        "cpu_s_per_mb": 2,
+        "mem_mb": 500,
+        "mem_mb_per_mb": 5,
+    },
+    "NucmerRefSeqContigs": {
+        "cpu_s": 30,
+        "cpu_s_per_mb": 5,
+        "mem_mb": 1000,
+        "mem_mb_per_mb": 2,
+    },
+    "NucmerRefSeqHifiasm": {
+        "cpu_s": 30,
+        "cpu_s_per_mb": 5,
+        "mem_mb": 1000,
+        "mem_mb_per_mb": 2,
+    },
+}
+
+# number of benchmarks kept per rule, the oldest are dropped first
+MAXPOINTS = 200
+
+
+def load_resource_model(modelfile: str) -> dict:
+    """
+    Cost model of the per-genus rules, the calibrated coefficients over the priors.
+
+    args:
+        modelfile -> str: json written by save_resource_model (may not exist)
+    returns:
+        dictionary of form {"rules": {rule: coefficients}, "points": {rule: [[input MB, cpu seconds, peak MB, key(, input MB of one run)]]}}
+    """
+    model = {
+        "rules": dict((rule, dict(coef)) for rule, coef in DEFAULT_MODEL.items()),
+        "points": {},
+    }
+    if modelfile and os.path.exists(modelfile):
+        with open(modelfile, "r") as f:
+            saved = json.load(f)
+        for rule, coef in saved.get("rules", {}).items():
+            model["rules"].setdefault(rule, {}).update(coef)
+        model["points"] = saved.get("points", {})
+    return model
+
+
+def save_resource_model(modelfile: str, model: dict):
+    """
+    args:
+        modelfile -> str: output json, replaced atomically
+        model -> dict: load_resource_model output
+    """
+    tmpfile = modelfile + "." + str(os.getpid()) + ".tmp"
+    with open(tmpfile, "w") as f:
+        json.dump(model, f)
+    os.replace(tmpfile, modelfile)
+
+
+def input_mb(files) -> float:
+    """
+    args:
+        files -> list: input files of a job
+    returns:
+        total size in MB, None when a file does not exist yet
+    """
+    total = 0
+    for filename in files:
+        if not os.path.exists(filename):
+            return None
+        total += os.path.getsize(filename)
+    return total / 1e6
+
+
+def job_threads(
+    model: dict, rule: str, size: float, max_threads: int, target_seconds: float
+) -> int:
+    """
+    Threads for a job to finish in about target_seconds, so small genera share the
+    node and large ones get all of it.
+
+    args:
+        model -> dict: load_resource_model output
+        rule -> str: rule name
+        size -> float: input size in MB (input_mb output)
+        max_threads -> int: threads of the node
+        target_seconds -> float: intended wall time of a job
+    returns:
+        number of threads, max_threads when the size is not known
+    """
+    if size is None:
+        return max_threads
+    coef = model["rules"][rule]
+    cpu_s = coef["cpu_s"] + coef["cpu_s_per_mb"] * size
+    return int(min(max(math.ceil(cpu_s / target_seconds), 1), max_threads))
+
+
+def job_mem_mb(
+    model: dict, rule: str, size: float, max_mem_mb: int = None, runs: int = 1
+) -> int:
+    """
+    args:
+        model -> dict: load_resource_model output
+        rule -> str: rule name
+        size -> float: input size in MB (input_mb output), of one run when runs > 1
+        max_mem_mb -> int: memory of the node, the upper limit of the request
+        runs -> int: number of runs of the program at the same time
+    returns:
+        predicted peak memory in MB with a margin of 50%, the prior base memory when the size is not known
+    """
+    coef = model["rules"][rule]
+    if size is None:
+        mem_mb = int(DEFAULT_MODEL.get(rule, coef)["mem_mb"]) * runs
+    else:
+        mem_mb = int(
+            math.ceil(1.5 * runs * (coef["mem_mb"] + coef["mem_mb_per_mb"] * size))
+        )
+    if max_mem_mb:
+        mem_mb = min(mem_mb, int(max_mem_mb))
+    return mem_mb
+
+
+def node_mem_mb() -> int:
+    """
+    returns:
+        physical memory of the node in MB, None when not known
+    """
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1e6)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def chunk_runs(fastafile: str, chunkreads: int, threads: int, threads_per_run: int = 4):
+    """
+    Input of one run and number of runs at the same time of a program run on
+    chunks of a read set (ChunkedBusco): at most chunkreads reads per chunk and
+    one run per threads_per_run threads.
+
+    args:
+        fastafile -> str: fasta file of the reads
+        chunkreads -> int: reads per chunk
+        threads -> int: threads of the job
+        threads_per_run -> int: threads of one run
+    returns:
+        tuple of MB per run (None when the file does not exist yet) and number of runs
+    """
+    if not os.path.exists(fastafile):
+        return None, max(threads // threads_per_run, 1)
+    reads = 0
+    total = 0
+    last = b"\n"
+    with open(fastafile, "rb") as f:
+        for block in iter(lambda: f.read(1 << 24), b""):
+            reads += block.count(b"\n>") + (last == b"\n" and block[:1] == b">")
+            last = block[-1:]
+            total += len(block)
+    chunks = max(-(-reads // chunkreads), 1)
+    runs = min(max(threads // threads_per_run, 1), chunks)
+    return total / chunks / 1e6, runs
+
+
+def add_benchmark(
+    model: dict,
+    rule: str,
+    key: str,
+    size: float,
+    cpu_s: float,
+    mem_mb: float,
+    run_size: float = None,
+    runs: int = 1,
+):
+    """
+    Add a benchmark of a job, unless a benchmark with the same key was added before.
+
+    args:
+        model -> dict: load_resource_model output
+        rule -> str: rule name
+        key -> str: identifier of the benchmark (e.g. file and modification time)
+        size -> float: input size of the job in MB
+        cpu_s -> float: cpu seconds of the job
+        mem_mb -> float: peak memory of the job in MB
+        run_size -> float: input size of one run in MB, for jobs running several programs at once
+        runs -> int: number of runs at the same time
+    returns:
+        True when the benchmark was added
+    """
+    points = model["points"].setdefault(rule, [])
+    if any(point[3] == key for point in points):
+        return False
+    if run_size is None:
+        points.append([size, cpu_s, mem_mb, key])
+    else:
+        points.append([size, cpu_s, mem_mb / runs, key, run_size])
+    del points[:-MAXPOINTS]
+    return True
+
+
+def fit_resource_model(model: dict, minpoints: int = 3):
+    """
+    Least squares fit of cpu seconds and peak memory as base + per MB of input for
+    every rule with enough benchmarks of different input sizes; the other rules
+    keep their coefficients. The memory of jobs running several programs at
+    once is fitted per run, on the input of one run. Negative coefficients are
+    clipped to 0.
+
+    args:
+        model -> dict: load_resource_model output
+        minpoints -> int: minimum number of benchmarks to fit a rule
+    """
+    for rule, points in model["points"].items():
+        sizes = [point[0] for point in points]
+        if len(points) < minpoints or len(set(sizes)) < 2:
+            continue
+        coef = model["rules"].setdefault(rule, {})
+        coef["cpu_s"], coef["cpu_s_per_mb"] = _linear_fit(
+            sizes, [point[1] for point in points]
+        )
+        memsizes = [point[4] if len(point) > 4 else point[0] for point in points]
+        if len(set(memsizes)) < 2:
+            continue
+        coef["mem_mb"], coef["mem_mb_per_mb"] = _linear_fit(
+            memsizes, [point[2] for point in points]
+        )
+
+
+def _linear_fit(x: list, y: list):
+    """
+    Least squares line through the points, base and slope clipped to 0.
+    """
+    meanx = sum(x) / len(x)
+    meany = sum(y) / len(y)
+    slope = sum((a - meanx) * (b - meany) for a, b in zip(x, y)) / sum(
+        (a - meanx) ** 2 for a in x
+    )
+    return max(meany - slope * meanx, 0.0), max(slope, 0.0)
@@ -0,0 +1,29 @@
+from __future__ import division
+import argparse
+from FastaTools import read_fasta
+from SSUTools import read_consensus, consensus_kmers, kmer_hits, kmer_windows
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-m", type=str, action='store', dest='hmm', metavar='HMM',help='define SSU HMM file')
+parser.add_argument("-g", type=str, action='store', dest='genome', metavar='GENOME',help='define genome fasta file')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define fasta file of candidate windows')
+parser.add_argument("-t", type=str, action='store', dest='table', metavar='TABLE',help='define table of window coordinates on the genome')
+parser.add_argument("-k", type=int, action='store', dest='kmer', default=12, help='define k-mer length (max 31, default 12)')
+parser.add_argument("-n", type=int, action='store', dest='minhits', default=5, help='define minimum number of consensus k-mer hits per window (default 5)')
+parser.add_argument("-s", type=int, action='store', dest='maxgap', default=1000, help='define maximum distance between hits of one window (default 1000)')
+parser.add_argument("-f", type=int, action='store', dest='flank', default=2000, help='define flank added on both sides of a window (default 2000)')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+kmers = consensus_kmers(read_consensus(args.hmm), args.kmer)
+
+out = open(args.out, 'w')
+table = open(args.table, 'w')
+for name, seq in read_fasta(args.genome):
+    starts, ends = kmer_windows(kmer_hits(seq, args.kmer, kmers), len(seq), args.kmer, args.minhits, args.maxgap, args.flank)
+    for start, end in zip(starts, ends):
+        window = name + '/' + str(start + 1) + '-' + str(end)
+        out.write('>' + window + '\n' + seq[start:end].decode() + '\n')
+        table.write(window + '\t' + name + '\t' + str(start) + '\t' + str(end - start) + '\t' + str(len(seq)) + '\n')
+out.close()
+table.close()
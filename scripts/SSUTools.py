@@ -0,0 +1,351 @@
+import heapq
+
+import numpy as np
+
+from CoverageTools import interval_union
+from FastaTools import read_fasta, reverse_complement
+
+# 2-bit codes of the bases, 4 for anything but ACGT
+CODES = np.full(256, 4, dtype=np.uint8)
+for i, base in enumerate(b"ACGT"):
+    CODES[base] = i
+    CODES[ord(chr(base).lower())] = i
+
+
+def read_consensus(hmmfile: str) -> list:
+    """
+    Consensus sequence of every model in a HMMER3 profile file (CONS column
+    of the match state lines, written with CONS yes).
+
+    args:
+        hmmfile -> str: HMMER3 profile file
+    returns:
+        list of consensus sequences as upper case bytes, one per model
+    """
+    consensus = []
+    seq = []
+    inmodel = False
+    with open(hmmfile, "r") as f:
+        for line in f:
+            if line.startswith("HMM "):
+                inmodel = True
+                seq = []
+            elif line.startswith("//"):
+                inmodel = False
+                consensus.append("".join(seq).upper().encode())
+            elif inmodel:
+                fields = line.split()
+                # match state lines: node, 4 emissions, MAP, CONS, RF, MM, CS
+                if len(fields) == 10 and fields[0].isdigit():
+                    seq.append(fields[6])
+    return consensus
+
+
+def kmer_values(codes: np.ndarray, k: int) -> np.ndarray:
+    """
+    2-bit packed k-mers starting at every position of a sequence.
+
+    args:
+        codes -> np.ndarray: sequence as base codes (CODES)
+        k -> int: k-mer length (max 31)
+    returns:
+        array of k-mers, -1 for k-mers containing a base other than ACGT
+    """
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    values = np.zeros(n, dtype=np.int64)
+    for j in range(k):
+        values = (values << 2) | (codes[j : n + j] & 3)
+    invalid = np.concatenate(([0], np.cumsum(codes == 4)))
+    values[(invalid[k:] - invalid[:n]) > 0] = -1
+    return values
+
+
+def consensus_kmers(consensus: list, k: int) -> np.ndarray:
+    """
+    k-mers of the consensus sequences on both strands.
+
+    args:
+        consensus -> list: sequences as bytes (read_consensus output)
+        k -> int: k-mer length
+    returns:
+        sorted array of the distinct k-mers
+    """
+    kmers = set()
+    for cons in consensus:
+        for strand in (cons, reverse_complement(cons)):
+            values = kmer_values(CODES[np.frombuffer(strand, dtype=np.uint8)], k)
+            kmers.update(values[values >= 0].tolist())
+    return np.array(sorted(kmers), dtype=np.int64)
+
+
+def kmer_hits(seq: bytes, k: int, kmers: np.ndarray, slicelen: int = 10000000) -> np.ndarray:
+    """
+    Positions of a sequence where one of the k-mers starts; long sequences
+    are packed slice by slice to bound memory.
+
+    args:
+        seq -> bytes: sequence
+        k -> int: k-mer length
+        kmers -> np.ndarray: sorted k-mers to look for (consensus_kmers output)
+        slicelen -> int: number of positions packed at once
+    returns:
+        sorted array of 0-based positions
+    """
+    codes = CODES[np.frombuffer(seq, dtype=np.uint8)]
+    hits = []
+    for start in range(0, max(len(codes) - k + 1, 0), slicelen):
+        values = kmer_values(codes[start : start + slicelen + k - 1], k)
+        idx = np.searchsorted(kmers, values)
+        found = (kmers[np.minimum(idx, len(kmers) - 1)] == values) & (values >= 0)
+        hits.append(np.flatnonzero(found) + start)
+    if not hits:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(hits)
+
+
+def kmer_windows(pos: np.ndarray, seqlen: int, k: int, minhits: int, maxgap: int, flank: int):
+    """
+    Candidate SSU windows of a sequence: k-mer hits closer than maxgap form
+    one locus, loci with at least minhits hits are extended by flank on both
+    sides (clipped to the sequence) and overlapping windows are joined.
+
+    args:
+        pos -> np.ndarray: sorted k-mer hit positions (kmer_hits output)
+        seqlen -> int: length of the sequence
+        k -> int: k-mer length
+        minhits -> int: minimum number of hits of a locus
+        maxgap -> int: maximum distance between hits of one locus
+        flank -> int: bases added on both sides of a locus
+    returns:
+        arrays (starts, ends) of the 0-based half-open windows
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if len(pos) < minhits:
+        return empty, empty
+    first = np.flatnonzero(np.diff(pos, prepend=-maxgap - 1) > maxgap)
+    last = np.append(first[1:] - 1, len(pos) - 1)
+    keep = (last - first + 1) >= minhits
+    if not keep.any():
+        return empty, empty
+    starts = np.maximum(pos[first[keep]] - flank, 0)
+    ends = np.minimum(pos[last[keep]] + k + flank, seqlen)
+    _, starts, ends = interval_union(np.zeros(len(starts), dtype=np.int64), starts, ends)
+    return starts, ends
+
+
+def read_window_table(tablefile: str) -> dict:
+    """
+    Read a table of sequence windows (as written by SSUPrefilter.py and
+    ShardedSSUScan.py) into a dictionary.
+
+    args:
+        tablefile -> str: tab separated window, contig, 0-based offset,
+                          window length, contig length
+    returns:
+        dictionary of form {window: (contig, offset, window length, contig length)}
+    """
+    windows = {}
+    with open(tablefile, "r") as f:
+        for line in f:
+            window, contig, offset, windowlen, length = line.rstrip("\n").split("\t")
+            windows[window] = (contig, int(offset), int(windowlen), int(length))
+    return windows
+
+
+def remap_tblout_line(line: str, windows: dict, maxevalue: float = 10) -> str:
+    """
+    Translate one nhmmscan tblout line of a window back to its contig:
+    alignment/envelope coordinates are shifted by the window offset, and the
+    E-value, which nhmmscan scales with the length of the scanned sequence,
+    is rescaled from window to contig length. Hits whose rescaled E-value is
+    above the reporting threshold of a scan of the whole contig (nhmmscan -E,
+    default 10) are dropped. Comment lines are returned as is.
+
+    nhmmscan tblout: target name, accession, query name, accession, hmmfrom,
+    hmm to, alifrom, ali to, envfrom, env to, modlen, strand, E-value, score,
+    bias, description
+
+    args:
+        line -> str: tblout line
+        windows -> dict: read_window_table output
+        maxevalue -> float: reporting threshold on the contig
+    returns:
+        translated line, empty when the hit is dropped
+    """
+    if line.startswith("#"):
+        return line
+    fields = line.split()
+    contig, offset, windowlen, length = windows[fields[2]]
+    evalue = float(fields[12]) * length / windowlen
+    if evalue > maxevalue:
+        return ""
+    fields[2] = contig
+    for i in (6, 7, 8, 9):
+        fields[i] = str(int(fields[i]) + offset)
+    fields[12] = "{:.2g}".format(evalue)
+    return " ".join(fields) + "\n"
+
+
+def write_shards(fastafile: str, shardprefix: str, nshards: int, piecelen: int, overlap: int):
+    """
+    Spread the sequences of a fasta file over shards holding about the same
+    number of bases: sequences longer than piecelen + overlap are cut into
+    pieces of piecelen, each extended by overlap into the next one, and
+    every piece goes to the shard with the fewest bases so far.
+
+    args:
+        fastafile -> str: fasta file
+        shardprefix -> str: prefix of the shard fasta files ({prefix}.{i}.fa)
+        nshards -> int: number of shards
+        piecelen -> int: distance between the starts of two pieces
+        overlap -> int: bases shared by two consecutive pieces
+    returns:
+        list of (shard fasta file, bases) of the non-empty shards, and a
+        dictionary of form {piece: (sequence, offset, piece length, sequence length)}
+    """
+    shards = [shardprefix + "." + str(i) + ".fa" for i in range(nshards)]
+    handles = [open(shard, "w") for shard in shards]
+    load = [(0, i) for i in range(nshards)]
+    pieces = {}
+    for name, seq in read_fasta(fastafile):
+        if not seq:
+            continue
+        for start in range(0, max(len(seq) - overlap, 1), piecelen):
+            end = min(start + piecelen + overlap, len(seq))
+            piece = name + "/" + str(start + 1) + "-" + str(end)
+            pieces[piece] = (name, start, end - start, len(seq))
+            bases, i = heapq.heappop(load)
+            handles[i].write(">" + piece + "\n" + seq[start:end].decode() + "\n")
+            heapq.heappush(load, (bases + end - start, i))
+    for handle in handles:
+        handle.close()
+    return [(shards[i], bases) for bases, i in sorted(load, key=lambda x: x[1]) if bases > 0], pieces
+
+
+def near_cut(line: str, pieces: dict, margin: int) -> bool:
+    """
+    Whether the envelope of a tblout hit on a piece (nhmmscan layout, piece
+    coordinates) comes within margin bases of a place where its sequence was
+    cut. Such a hit may be truncated by the cut; as long as hits are shorter
+    than the overlap minus the margin, the neighbouring piece holds the whole
+    hit away from its own cuts.
+
+    args:
+        line -> str: tblout line
+        pieces -> dict: write_shards output
+        margin -> int: distance to a cut below which a hit is dropped
+    """
+    fields = line.split()
+    name, offset, piecelen, length = pieces[fields[2]]
+    envfrom, envto = sorted((int(fields[8]), int(fields[9])))
+    return (offset > 0 and envfrom <= margin) or (offset + piecelen < length and envto > piecelen - margin)
+
+
+# columns of the sequence (read/contig) and model names in the tblout layouts
+TBLOUT_LAYOUTS = {
+    "nhmmscan": (2, 0),
+    "nhmmer": (0, 2),
+}
+
+
+def best_ssu_hits(tblfile: str, layout: str = "nhmmscan") -> dict:
+    """
+    Reduce an nhmmscan or nhmmer tblout to the best hit per sequence and the
+    best domain per sequence and model, tokenising every line once. Ties keep
+    the hit seen first.
+
+    args:
+        tblfile -> str: tblout file
+        layout -> str: 'nhmmscan' (models as targets) or 'nhmmer' (models as queries)
+    returns:
+        dictionary of form {sequence: [best hit, {model: best domain}]} in order
+        of first appearance, with hits as (E-value, E-value as written, model,
+        alifrom, ali to)
+    """
+    seqcol, modelcol = TBLOUT_LAYOUTS[layout]
+    hits = {}
+    with open(tblfile, "r") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            fields = line.split()
+            model = fields[modelcol]
+            hit = (float(fields[12]), fields[12], model, int(fields[6]), int(fields[7]))
+            best = hits.get(fields[seqcol])
+            if best is None:
+                hits[fields[seqcol]] = [hit, {model: hit}]
+                continue
+            if hit[0] < best[0][0]:
+                best[0] = hit
+            if model not in best[1] or hit[0] < best[1][model][0]:
+                best[1][model] = hit
+    return hits
+
+
+def ssu_readsinfo(hits: dict, maxevalue: float = 1e-150, minlength: int = 1000):
+    """
+    Sequences whose best hit is significant, as readsinfo rows: sequence,
+    model, E-value of the best hit, E-value, start and end of the best domain
+    of that model and the domain length. The domain must be significant
+    itself or longer than minlength.
+
+    args:
+        hits -> dict: best_ssu_hits output
+        maxevalue -> float: E-value threshold
+        minlength -> int: domain length accepted regardless of its E-value
+    yields:
+        (model, tab separated readsinfo row)
+    """
+    for seq, (best, domains) in hits.items():
+        if best[0] >= maxevalue:
+            continue
+        model = best[2]
+        evalue, evaluestr, _, start, stop = domains[model]
+        length = abs(stop - start)
+        if evalue < maxevalue or length > minlength:
+            yield model, "\t".join([seq, model, best[1], evaluestr, str(start), str(stop), str(length)])
+
+
+def read_hmm_models(hmmfile: str) -> dict:
+    """
+    Length and description of every model in a HMMER3 profile file.
+
+    args:
+        hmmfile -> str: HMMER3 profile file
+    returns:
+        dictionary of form {model: (length, description)}, '-' when a model has no DESC
+    """
+    models = {}
+    with open(hmmfile, "r") as f:
+        for line in f:
+            if line.startswith("NAME "):
+                name = line.split()[1]
+                models[name] = (0, "-")
+            elif line.startswith("LENG "):
+                models[name] = (int(line.split()[1]), models[name][1])
+            elif line.startswith("DESC "):
+                models[name] = (models[name][0], line[5:].strip())
+    return models
+
+
+def nhmmer_to_nhmmscan(line: str, models: dict) -> str:
+    """
+    Rewrite one nhmmer tblout line (models as queries) in the nhmmscan layout
+    (models as targets): sequence and model columns are swapped, and the
+    sequence length and description are replaced by the model length and
+    description. Comment lines are returned as is.
+
+    args:
+        line -> str: nhmmer tblout line
+        models -> dict: read_hmm_models output
+    """
+    if line.startswith("#"):
+        return line
+    fields = line.split(None, 15)
+    fields[0:4] = fields[2:4] + fields[0:2]
+    length, description = models[fields[0]]
+    fields[10] = str(length)
+    fields[15:] = [description]
+    return " ".join(fields) + "\n"
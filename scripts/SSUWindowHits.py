@@ -0,0 +1,18 @@
+from __future__ import division
+import argparse
+from SSUTools import read_window_table, remap_tblout_line
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", type=str, action='store', dest='input', metavar='INPUT',help='define nhmmscan tblout of the prefiltered windows')
+parser.add_argument("-t", type=str, action='store', dest='table', metavar='TABLE',help='define window table written by SSUPrefilter.py')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define tblout with coordinates on the genome')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+windows=read_window_table(args.table)
+k=open(args.out,'w')
+f=open(args.input,'r')
+for line in f:
+    k.write(remap_tblout_line(line,windows))
+f.close()
+k.close()
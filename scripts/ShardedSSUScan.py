@@ -0,0 +1,130 @@
+from __future__ import division
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from SSUTools import read_hmm_models, remap_tblout_line, nhmmer_to_nhmmscan, write_shards, near_cut
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-m", type=str, action='store', dest='hmm', metavar='HMM',help='define SSU HMM file')
+parser.add_argument("-f", type=str, action='store', dest='fasta', metavar='FASTA',help='define fasta file to scan')
+parser.add_argument("-c", type=int, action='store', dest='cpu', default=1, help='define number of hmmer workers')
+parser.add_argument("-s", type=int, action='store', dest='shards', default=4, help='define number of shards per worker (default 4)')
+parser.add_argument("-v", type=int, action='store', dest='overlap', default=10000, help='define overlap between pieces of split sequences (default 10000); hits within a tenth of the overlap of a cut are taken from the neighbouring piece')
+parser.add_argument("-e", type=str, action='store', dest='engine', default='nhmmscan', choices=['auto', 'nhmmscan', 'nhmmer', 'both'], help='define hmmer program (default nhmmscan); both runs and times nhmmscan and nhmmer on the same shards and writes the hits of the program auto chooses')
+parser.add_argument("-n", type=int, action='store', dest='autoseqs', default=100, help='define number of sequences from which auto uses nhmmer (default 100)')
+parser.add_argument("-b", type=int, action='store', dest='autobases', default=10000000, help='define number of bases from which auto uses nhmmer (default 10000000)')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define merged tblout (nhmmscan layout)')
+parser.add_argument("-l", type=str, action='store', dest='log', metavar='LOG',help='define merged hmmer log')
+parser.add_argument("-t", type=str, action='store', dest='timing', metavar='TIMING',help='define file the engine, input size, auto thresholds and run time are appended to')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+def sequenceStats(fastafile):
+    seqs = 0
+    total = 0
+    with open(fastafile, 'rb') as f:
+        for line in f:
+            if line.startswith(b'>'):
+                seqs = seqs + 1
+            else:
+                total = total + len(line.strip())
+    return seqs, total
+
+def chooseEngine(engine, seqs, total):
+    '''
+    input:
+    - requested engine (auto, nhmmscan or nhmmer)
+    - number of sequences and bases to scan
+    output:
+    - engine to run; nhmmscan reloads the models for every sequence, so auto switches to nhmmer (models as queries) for many or long sequences
+    '''
+    if engine not in ('auto', 'both'):
+        return engine
+    if seqs >= args.autoseqs or total >= args.autobases:
+        return 'nhmmer'
+    return 'nhmmscan'
+
+def scanShard(shard, engine):
+    start = time.time()
+    subprocess.run([engine, '--cpu', '1', '--noali', '--tblout', shard + '.tbl', '-o', shard + '.log', args.hmm, shard], check=True)
+    return shard, time.time() - start
+
+def scanShards(shards, pieces, engine, outfile, logfile):
+    '''
+    input:
+    - list of (shard fasta file, bases) and pieces (write_shards output)
+    - hmmer program
+    - merged tblout and log
+    output:
+    - summed run time of the shards and wall time of the scan in seconds
+    '''
+    start = time.time()
+    shardbases = dict(shards)
+    #hits of every shard are translated back and appended as soon as its search finishes
+    #hits lying in the overlap of two pieces are reported by both and only written once
+    #hits touching a cut may be truncated and are only taken from the piece they lie inside
+    margin = args.overlap // 10
+    seen = set()
+    shardtime = 0
+    out = open(outfile, 'w')
+    log = open(logfile, 'w')
+    with ThreadPoolExecutor(max_workers=max(args.cpu, 1)) as pool:
+        for done in as_completed([pool.submit(scanShard, shard, engine) for shard, bases in shards]):
+            shard, seconds = done.result()
+            shardtime = shardtime + seconds
+            windows = pieces
+            if engine == 'nhmmer':
+                #nhmmer scales E-values with the size of the whole shard instead of the piece
+                windows = {piece: (name, offset, shardbases[shard], length) for piece, (name, offset, piecelen, length) in pieces.items()}
+            with open(shard + '.tbl', 'r') as tbl:
+                for line in tbl:
+                    if line.startswith('#'):
+                        continue
+                    if engine == 'nhmmer':
+                        line = nhmmer_to_nhmmscan(line, models)
+                    if near_cut(line, pieces, margin):
+                        continue
+                    hit = remap_tblout_line(line, windows)
+                    if not hit:
+                        continue
+                    fields = hit.split()
+                    key = (fields[0], fields[2], fields[6], fields[7], fields[11])
+                    if key not in seen:
+                        seen.add(key)
+                        out.write(hit)
+            with open(shard + '.log', 'r') as shardlog:
+                shutil.copyfileobj(shardlog, log)
+    out.close()
+    log.close()
+    return shardtime, time.time() - start
+
+start = time.time()
+seqs, total = sequenceStats(args.fasta)
+engine = chooseEngine(args.engine, seqs, total)
+models = read_hmm_models(args.hmm)
+tmpdir = tempfile.mkdtemp(prefix='ssu_shards.', dir=os.path.dirname(os.path.abspath(args.out)))
+nshards = max(args.cpu * args.shards, 1)
+piecelen = max(-(-total // nshards), args.overlap)
+shards, pieces = write_shards(args.fasta, tmpdir + '/shard', nshards, piecelen, args.overlap)
+preptime = time.time() - start
+
+#with both, the program auto does not choose runs first on the same shards and only its time is kept
+timings = []
+if args.engine == 'both':
+    other = 'nhmmscan' if engine == 'nhmmer' else 'nhmmer'
+    timings.append((other,) + scanShards(shards, pieces, other, tmpdir + '/other.tbl', tmpdir + '/other.log'))
+timings.append((engine,) + scanShards(shards, pieces, engine, args.out, args.log))
+shutil.rmtree(tmpdir)
+
+if args.timing:
+    newfile = not os.path.exists(args.timing)
+    k = open(args.timing, 'a')
+    if newfile:
+        k.write('requested\tengine\tsequences\tbases\tauto_sequences\tauto_bases\tshards\tworkers\tshard_seconds\twall_seconds\n')
+    for used, shardtime, walltime in timings:
+        k.write(args.engine + '\t' + used + '\t' + str(seqs) + '\t' + str(total) + '\t' + str(args.autoseqs) + '\t' + str(args.autobases) + '\t' + str(len(shards)) + '\t' + str(args.cpu) + '\t' + '{:.1f}'.format(shardtime) + '\t' + '{:.1f}'.format(preptime + walltime) + '\n')
+    k.close()
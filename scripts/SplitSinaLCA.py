@@ -0,0 +1,34 @@
+from __future__ import division
+import argparse
+import csv
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-i", type=str, action='store', dest='input', metavar='INPUT',help='define SINA csv output with several lca fields')
+parser.add_argument("-f", type=str, action='store', dest='fields', default='tax_embl_ebi_ena:tax_slv:tax_ltp', help='define colon separated lca fields, in output order (default tax_embl_ebi_ena:tax_slv:tax_ltp)')
+parser.add_argument("-o", type=str, action='store', dest='out', metavar='OUT',help='define csv output with one block per lca field')
+parser.add_argument("-t", type=str, action='store', dest='tax', metavar='TAX',help='define tab separated name and lca taxonomy output with one block per lca field')
+parser.add_argument('--version', action='version', version='%(prog)s 1.0')
+args = parser.parse_args()
+
+lcafields=['lca_'+field for field in args.fields.split(':')]
+with open(args.input,'r',newline='') as f:
+    reader=csv.reader(f)
+    header=next(reader,None)
+    rows=list(reader)
+
+#every block holds the columns of a SINA run with only this lca field, the lca column in place of the first lca column
+k=open(args.out,'w',newline='')
+t=open(args.tax,'w')
+writer=csv.writer(k,lineterminator='\n')
+if header is not None:
+    first=min(header.index(field) for field in lcafields)
+    for field in lcafields:
+        columns=[header.index(field) if i == first else i for i,column in enumerate(header) if i == first or column not in lcafields]
+        lca=header.index(field)
+        writer.writerow([header[i] for i in columns])
+        t.write(header[0]+'\t'+field+'\n')
+        for row in rows:
+            writer.writerow([row[i] for i in columns])
+            t.write(row[0]+'\t'+row[lca]+'\n')
+k.close()
+t.close()
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def iter_line_blocks(filename: str, chunkbytes: int = 1 << 24):
+    """
+    Read a text file in blocks of complete lines, so columns can be parsed
+    for a whole block at once. A missing final newline is added.
+
+    args:
+        filename -> str: file to read
+        chunkbytes -> int: approximate number of bytes per block
+    yields:
+        uint8 array of a block of lines, ending with a newline
+    """
+    rest = b""
+    with open(filename, "rb") as f:
+        while True:
+            block = f.read(chunkbytes)
+            if not block:
+                if not rest.strip():
+                    break
+                block = rest + b"\n"
+                rest = b""
+            else:
+                block = rest + block
+                cut = block.rfind(b"\n") + 1
+                block, rest = block[:cut], block[cut:]
+                if not block:
+                    continue
+            yield np.frombuffer(block, dtype=np.uint8)
+
+
+def field_bounds(data: np.ndarray, nfields: int):
+    """
+    Start and end offsets of the first nfields tab separated fields of every
+    line in a block of complete lines.
+
+    args:
+        data -> np.ndarray: uint8 view of the block, ending with a newline
+        nfields -> int: number of leading fields to locate
+    """
+    newlines = np.flatnonzero(data == 10)
+    delims = np.flatnonzero((data == 9) | (data == 10))
+    line = np.searchsorted(newlines, delims)
+    first = np.searchsorted(delims, np.append(0, newlines[:-1] + 1))
+    rank = np.arange(len(delims)) - first[line]
+    sel = rank < nfields
+    ends = np.full((len(newlines), nfields), -1, dtype=np.int64)
+    ends[line[sel], rank[sel]] = delims[sel]
+    if (ends < 0).any():
+        raise ValueError("line with less than %i columns" % nfields)
+    starts = np.empty_like(ends)
+    starts[:, 0] = np.append(0, newlines[:-1] + 1)
+    starts[:, 1:] = ends[:, :-1] + 1
+    return starts, ends
+
+
+def parse_int(data: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Parse unsigned integer fields from their byte offsets, all lines at once.
+    """
+    width = int((ends - starts).max())
+    pos = ends[:, None] - 1 - np.arange(width)
+    digits = np.where(pos >= starts[:, None], data[np.maximum(pos, 0)], 48).astype(np.int64) - 48
+    return digits @ (10 ** np.arange(width, dtype=np.int64))
+
+
+def parse_bytes(data: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Gather string fields from their byte offsets into a fixed width bytes array.
+    """
+    width = int((ends - starts).max())
+    pos = starts[:, None] + np.arange(width)
+    chars = np.where(pos < ends[:, None], data[np.minimum(pos, len(data) - 1)], 0)
+    return np.ascontiguousarray(chars.astype(np.uint8)).view("S%i" % width).ravel()
@@ -1,6 +1,6 @@
 import argparse
-import glob
 import itertools
+from BuscoTools import duplicated_copies, read_busco_hits
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-f", type=str, action='store', dest='asm', metavar='asm',help='define asm')
@@ -12,11 +12,11 @@ parser.add_argument("-l", type=str, action='store', dest='link', metavar='link',
 parser.add_argument('--version', action='version', version='%(prog)s 1.0')
 args = parser.parse_args()
 
-contiglist=[]
+contiglist=set()
 f =open(args.contigs,'r')
 for record in f:
     record=record.strip()
-    contiglist.append(record)
+    contiglist.add(record)
 f.close()
 
 m=open(args.karyo,'w')
@@ -33,39 +33,27 @@ for record in f:
 f.close()
 m.close()
 
-duplications={}
+#every BUSCO sequence is mapped to its contig through the assembly index
+contigs={}
+f =open(faidxfile, 'r')
+for record in f:
+    contigs[record.split('\t')[0]]=int(record.split('\t')[1])
+f.close()
+hits=read_busco_hits(args.buscodir.split('/done.txt')[0]+'/full_table.tsv',contigs)
+
 l=open(args.dat,'w')
-m=open(args.link,'w')
-dirname=args.buscodir.split('/done.txt')[0]+'/busco'
-for filename in glob.glob(dirname+'/run_*/full_table.tsv'):
-    k=open(filename,'r')
-    for line in k:
-        if not line.startswith('#'):
-            buscogene=line.split()[0]
-            if not 'Missing' in line:
-                if int(line.split('\t')[2].count("_")) == 2:
-                    contig='_'.join(line.split('\t')[2].split('_')[:-1])
-                elif int(line.split('\t')[2].count("_")) == 1:
-                    if line.split('\t')[2].startswith('a_'):
-                        contig=line.split('\t')[2]
-                    else:
-                        contig=line.split('\t')[2].split('_')[0]
-                else:
-                    contig=line.split('\t')[2]
-                l.write(contig+'	'+line.split('\t')[3]+'	'+line.split('\t')[4]+'	1	color=red'+'\n')
-                if 'Duplicated' in line:
-                    if buscogene not in duplications:
-                        duplications[buscogene]=[]
-                    contigfullname=contig+';'+line.split('\t')[3]+';'+line.split('\t')[4]
-                    duplications[buscogene].append(contigfullname)
+for contig,start,end in zip(hits['contig'].tolist(),hits['start'].tolist(),hits['end'].tolist()):
+    l.write(contig+'	'+str(start)+'	'+str(end)+'	1	color=red'+'\n')
 l.close()
 
+m=open(args.link,'w')
+duplications=duplicated_copies(hits)
 for busco in duplications:
     combinations=list(itertools.combinations(duplications[busco],2))
     i=0
     for pair in combinations:
         busconame=busco+'.'+str(i)
-        m.write(busconame+'	'+combinations[i][0].split(';')[0]+'	'+combinations[i][0].split(';')[1]+'	'+combinations[i][0].split(';')[2]+'\n')   
-        m.write(busconame+'	'+combinations[i][1].split(';')[0]+'	'+combinations[i][1].split(';')[1]+'	'+combinations[i][1].split(';')[2]+'\n')
+        m.write(busconame+'	'+pair[0][0]+'	'+str(pair[0][1])+'	'+str(pair[0][2])+'\n')
+        m.write(busconame+'	'+pair[1][0]+'	'+str(pair[1][1])+'	'+str(pair[1][2])+'\n')
         i=i+1
-m.close()             
\ No newline at end of file
+m.close()
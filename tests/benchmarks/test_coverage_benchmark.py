@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from CoverageTools import covered_bases
+
+
+@pytest.mark.parametrize("n", [10**3, 10**4, 10**5, 10**6, 10**7], ids=lambda n: "%.0e_intervals" % n)
+def test_covered_bases_one_contig(benchmark, n):
+    # read alignments of 15kb on average over a contig at about 30x depth
+    rng = np.random.default_rng(n)
+    length = max(n * 15000 // 30, 20000)
+    starts = rng.integers(0, length, n)
+    ends = np.minimum(starts + rng.integers(1000, 30000, n), length)
+    groups = np.zeros(n, dtype=np.int64)
+    benchmark.pedantic(covered_bases, args=(groups, starts, ends, 1), rounds=3 if n < 10**7 else 1, iterations=1)
+
+
+@pytest.mark.parametrize("n", [10**5, 10**6, 10**7], ids=lambda n: "%.0e_intervals" % n)
+def test_covered_bases_many_contigs(benchmark, n):
+    rng = np.random.default_rng(n)
+    ngroups = 2000
+    lengths = rng.integers(20000, 2000000, ngroups)
+    groups = rng.integers(0, ngroups, n)
+    starts = (rng.random(n) * lengths[groups]).astype(np.int64)
+    ends = np.minimum(starts + rng.integers(1000, 30000, n), lengths[groups])
+    benchmark.pedantic(covered_bases, args=(groups, starts, ends, ngroups), rounds=3 if n < 10**7 else 1, iterations=1)
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import run_script
+from generate_paf import synthetic_paf
+
+# set PAF_BENCHMARK_LINES (e.g. 50000000) to benchmark other PAF sizes
+SIZES = [int(float(size)) for size in os.environ.get("PAF_BENCHMARK_LINES", "1e5,1e6").split(",")]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: "%.0e_lines" % size)
+def paffile(request, tmp_path_factory):
+    paffile = str(tmp_path_factory.mktemp("paf") / "synthetic.paf")
+    synthetic_paf(paffile, request.param, ncontigs=max(200, request.param // 20000))
+    yield paffile
+    os.remove(paffile)
+
+
+def test_pafalignment(benchmark, paffile, tmp_path):
+    benchmark.pedantic(
+        run_script,
+        args=("PafAlignment.py", "-p", paffile, "-o", str(tmp_path / "out.ctgs"), "-r", str(tmp_path / "out.reads")),
+        rounds=1,
+        iterations=1,
+    )
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+TESTDIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTDIR = os.path.join(os.path.dirname(TESTDIR), "scripts")
+DATADIR = os.path.join(TESTDIR, "data")
+sys.path.insert(0, SCRIPTDIR)
+sys.path.insert(0, TESTDIR)
+
+
+def run_script(script: str, *args: str):
+    """
+    Run one of the pipeline scripts the way the Snakefile does.
+
+    args:
+        script -> str: script name in scripts/ (e.g. PafAlignment.py)
+        args -> str: command line arguments
+    returns:
+        completed process, with stdout as text
+    """
+    return subprocess.run(
+        [sys.executable, os.path.join(SCRIPTDIR, script), *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+@pytest.fixture
+def datadir():
+    return DATADIR
@@ -0,0 +1,118 @@
+import argparse
+import gzip
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+TESTDIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTDIR = os.path.join(os.path.dirname(TESTDIR), "scripts")
+
+# the options and order of the inputs NucmerRefSeqContigs runs the engines with (Snakefile defaults)
+NUCMER_PARAMS = ["--maxmatch"]
+COORDS_PARAMS = ["-c", "-l", "-L", "100", "-r", "-T"]
+ENGINES = ["nucmer", "asm5", "asm20"]
+
+
+def gunzip(gzfile: str, fastafile: str):
+    with gzip.open(gzfile, "rb") as src, open(fastafile, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def run_engine(engine: str, contigs: str, references: str, workdir: str, overview: str, threads: int):
+    """
+    Align the contigs to the references with one containment engine and write
+    the ParseNucmer.py overview.
+
+    returns:
+        description of the aligner and wall seconds of the alignment, None when the engine is not installed
+    """
+    start = time.time()
+    if engine == "nucmer":
+        if not (shutil.which("nucmer") and shutil.which("show-coords")):
+            return None
+        # -p instead of the --delta of the Snakefile, so the MUMmer 3 nucmer (as bundled with QUAST 4) runs as well
+        prefix = os.path.join(workdir, "nucmer")
+        coords = prefix + ".coords.txt"
+        subprocess.run(["nucmer", *NUCMER_PARAMS, "--threads", str(threads), "-p", prefix, contigs, references], check=True)
+        with open(coords, "w") as f:
+            subprocess.run(["show-coords", *COORDS_PARAMS, prefix + ".delta"], stdout=f, check=True)
+        seconds = time.time() - start
+        version = subprocess.run(["nucmer", "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True).stdout.split()[-1]
+        subprocess.run([sys.executable, os.path.join(SCRIPTDIR, "ParseNucmer.py"), "-n", coords, "-o", overview], check=True)
+        return "nucmer " + version, seconds
+    # the minimap2 command, as the Snakefile runs it; the presets map fewer of the divergent contigs through mappy
+    if not shutil.which("minimap2"):
+        return None
+    paffile = os.path.join(workdir, engine + ".paf")
+    with open(paffile, "w") as f:
+        subprocess.run(["minimap2", "-x", engine, "-t", str(threads), references, contigs], stdout=f, check=True)
+    seconds = time.time() - start
+    version = subprocess.run(["minimap2", "--version"], stdout=subprocess.PIPE, text=True).stdout.strip()
+    subprocess.run([sys.executable, os.path.join(SCRIPTDIR, "ParseNucmer.py"), "-p", paffile, "-o", overview], check=True)
+    return "minimap2 " + version, seconds
+
+
+def compare(reference: str, query: str) -> str:
+    return subprocess.run(
+        [sys.executable, os.path.join(SCRIPTDIR, "CompareContainment.py"), "-r", reference, "-q", query],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+
+
+def parity_report(datadir: str, outdir: str, threads: int = 1):
+    """
+    Run the containment engines on the inputs of generate_containment.py and
+    write their overviews and a report comparing each engine with the coverage
+    the contigs were built with and the minimap2 presets with nucmer
+    (CompareContainment.py output). Engines that are not installed are listed
+    as not run.
+
+    args:
+        datadir -> str: directory with references.fa.gz, contigs.fa.gz and truth.overview.txt
+        outdir -> str: directory of the overviews and parity_report.txt
+        threads -> int: threads of the aligners
+    """
+    os.makedirs(outdir, exist_ok=True)
+    truth = os.path.join(datadir, "truth.overview.txt")
+    workdir = tempfile.mkdtemp(prefix="containment.")
+    contigs = os.path.join(workdir, "contigs.fa")
+    references = os.path.join(workdir, "references.fa")
+    gunzip(os.path.join(datadir, "contigs.fa.gz"), contigs)
+    gunzip(os.path.join(datadir, "references.fa.gz"), references)
+    overviews = {}
+    lines = ["# containment engine parity on " + os.path.relpath(datadir, os.path.dirname(TESTDIR)), "# " + platform.platform() + ", python " + platform.python_version() + ", " + str(os.cpu_count()) + " cpus, " + str(threads) + " threads", ""]
+    lines.append("engine\taligner\tseconds")
+    for engine in ENGINES:
+        overview = os.path.join(outdir, engine + ".overview.txt")
+        result = run_engine(engine, contigs, references, workdir, overview, threads)
+        if result is None:
+            lines.append(engine + "\tnot installed, not run\tNA")
+            continue
+        overviews[engine] = overview
+        lines.append(engine + "\t" + result[0] + "\t" + "{:.2f}".format(result[1]))
+    for engine in ENGINES:
+        if engine in overviews:
+            lines += ["", "## " + engine + " against the coverage the contigs were built with", compare(truth, overviews[engine]).rstrip("\n")]
+    for engine in ("asm5", "asm20"):
+        if engine in overviews and "nucmer" in overviews:
+            lines += ["", "## " + engine + " against nucmer", compare(overviews["nucmer"], overviews[engine]).rstrip("\n")]
+    if "asm5" in overviews and "asm20" in overviews:
+        lines += ["", "## asm20 against asm5", compare(overviews["asm5"], overviews["asm20"]).rstrip("\n")]
+    shutil.rmtree(workdir)
+    with open(os.path.join(outdir, "parity_report.txt"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", type=str, action="store", dest="datadir", default=os.path.join(TESTDIR, "data", "containment"), metavar="DATADIR", help="define directory of the generate_containment.py output (default tests/data/containment)")
+    parser.add_argument("-o", type=str, action="store", dest="out", metavar="OUTDIR", help="define output directory of the overviews and report (default DATADIR)")
+    parser.add_argument("-t", type=int, action="store", dest="threads", default=1, metavar="THREADS", help="define number of threads of the aligners")
+    args = parser.parse_args()
+    parity_report(args.datadir, args.out or args.datadir, args.threads)
@@ -0,0 +1,115 @@
+import argparse
+import gzip
+import os
+
+import numpy as np
+
+BASES = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+# divergence of the contigs copied from a reference genome: asm5 is meant for
+# up to about 5%, asm20 for up to about 20% sequence divergence
+DIVERGENCE = [0.0, 0.002, 0.01, 0.03, 0.05, 0.08, 0.12, 0.16, 0.2]
+# part of the chimeric contigs copied from a reference genome, around the 50%
+# a contig needs to be complete
+CHIMERA = [0.3, 0.45, 0.55, 0.7]
+
+
+def random_sequence(rng: np.random.Generator, length: int) -> np.ndarray:
+    """
+    Random sequence as base codes 0-3 (ACGT).
+    """
+    return rng.integers(0, 4, length).astype(np.uint8)
+
+
+def mutate(rng: np.random.Generator, seq: np.ndarray, divergence: float) -> np.ndarray:
+    """
+    Copy of a sequence with substitutions and short (1-3 bp) insertions and
+    deletions, a fifth of the divergence being indels.
+    """
+    n = len(seq)
+    seq = seq.copy()
+    substitutions = rng.random(n) < divergence * 0.8
+    seq[substitutions] = (seq[substitutions] + rng.integers(1, 4, substitutions.sum()).astype(np.uint8)) % 4
+    indels = np.flatnonzero(rng.random(n) < divergence * 0.2)
+    pieces = []
+    last = 0
+    for position in indels.tolist():
+        size = int(rng.integers(1, 4))
+        if rng.random() < 0.5:
+            pieces.append(seq[last:position])
+            pieces.append(random_sequence(rng, size))
+            last = position
+        else:
+            pieces.append(seq[last:position])
+            last = min(position + size, n)
+    pieces.append(seq[last:])
+    return np.concatenate(pieces)
+
+
+def reverse_complement(seq: np.ndarray) -> np.ndarray:
+    return 3 - seq[::-1]
+
+
+def write_fasta(fastafile: str, records: list):
+    with gzip.open(fastafile, "wt") as f:
+        for name, seq in records:
+            f.write(">" + name + "\n")
+            text = BASES[seq].tobytes().decode()
+            for start in range(0, len(text), 80):
+                f.write(text[start : start + 80] + "\n")
+
+
+def synthetic_containment(outdir: str, ngenomes: int = 3, genomelength: int = 150000, seed: int = 1):
+    """
+    Write reference genomes of a family and contigs to check against them, as
+    aligned by NucmerRefSeqContigs: copies of reference windows at increasing
+    divergence (both strands), chimeras of a reference window and unrelated
+    sequence, and unrelated contigs; with the coverage every contig was built
+    with, in the ParseNucmer.py overview format.
+
+    args:
+        outdir -> str: output directory (references.fa.gz, contigs.fa.gz, truth.overview.txt)
+        ngenomes -> int: number of reference genomes
+        genomelength -> int: length of a reference genome
+        seed -> int: random seed
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(outdir, exist_ok=True)
+    genomes = [random_sequence(rng, genomelength) for i in range(ngenomes)]
+    write_fasta(os.path.join(outdir, "references.fa.gz"), [("NZ_CP%06i.1" % (i + 1), genome) for i, genome in enumerate(genomes)])
+
+    def window(length):
+        genome = genomes[int(rng.integers(0, ngenomes))]
+        start = int(rng.integers(0, genomelength - length))
+        return genome[start : start + length]
+
+    contigs = []
+    for divergence in DIVERGENCE:
+        for strand in "+-":
+            seq = mutate(rng, window(int(rng.integers(10000, 30000))), divergence)
+            if strand == "-":
+                seq = reverse_complement(seq)
+            contigs.append(("copy_%g_%s" % (divergence * 100, "fwd" if strand == "+" else "rev"), seq, 100.0))
+    for fraction in CHIMERA:
+        for divergence in (0.0, 0.05):
+            length = int(rng.integers(10000, 30000))
+            copied = mutate(rng, window(int(length * fraction)), divergence)
+            seq = np.concatenate([copied, random_sequence(rng, length - int(length * fraction))])
+            contigs.append(("chimera_%g_%g" % (fraction * 100, divergence * 100), seq, 100.0 * len(copied) / len(seq)))
+    for i in range(4):
+        contigs.append(("unrelated_%i" % (i + 1), random_sequence(rng, int(rng.integers(10000, 30000))), 0.0))
+    write_fasta(os.path.join(outdir, "contigs.fa.gz"), [(name, seq) for name, seq, covered in contigs])
+    with open(os.path.join(outdir, "truth.overview.txt"), "w") as f:
+        for name, seq, covered in sorted(contigs, key=lambda contig: contig[0]):
+            line = name + "\t" + str(len(seq)) + "\t" + str(covered) + "%\n"
+            f.write(line if covered >= 50 else "NOT COMPLETE:\t" + line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-g", type=int, action="store", dest="genomes", default=3, metavar="GENOMES", help="define number of reference genomes")
+    parser.add_argument("-l", type=int, action="store", dest="length", default=150000, metavar="LENGTH", help="define length of a reference genome")
+    parser.add_argument("-s", type=int, action="store", dest="seed", default=1, metavar="SEED", help="define random seed")
+    parser.add_argument("-o", type=str, action="store", dest="out", metavar="OUTDIR", help="define output directory")
+    args = parser.parse_args()
+    synthetic_containment(args.out, args.genomes, args.length, args.seed)
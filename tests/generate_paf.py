@@ -0,0 +1,88 @@
+import argparse
+
+import numpy as np
+
+
+def synthetic_paf(
+    paffile: str,
+    nlines: int,
+    ncontigs: int = 200,
+    seed: int = 1,
+    blocklines: int = 1 << 19,
+):
+    """
+    Write a synthetic minimap2 PAF of HiFi reads against an assembly, with a
+    mix of full length alignments, partial alignments, alignments hanging over
+    a contig end and secondary alignments, and contigs of very different read
+    depth, so both complete and incomplete contigs occur.
+
+    args:
+        paffile -> str: output PAF
+        nlines -> int: number of alignments
+        ncontigs -> int: number of contigs
+        seed -> int: random seed
+        blocklines -> int: alignments generated and written at once
+    """
+    rng = np.random.default_rng(seed)
+    tlens = rng.integers(20000, 300000, ncontigs)
+    depth = rng.exponential(1.0, ncontigs) * tlens
+    weights = depth / depth.sum()
+    with open(paffile, "w") as f:
+        for first in range(0, nlines, blocklines):
+            n = min(blocklines, nlines - first)
+            contig = rng.choice(ncontigs, n, p=weights)
+            tlen = tlens[contig]
+            qlen = rng.integers(2000, 25000, n)
+            kind = rng.choice(4, n, p=[0.7, 0.12, 0.1, 0.08])
+            qstart = rng.integers(0, 200, n)
+            qend = qlen - rng.integers(0, 200, n)
+            # partial alignments
+            partial = kind == 1
+            qend[partial] = qstart[partial] + (qlen[partial] * rng.uniform(0.3, 0.8, partial.sum())).astype(np.int64)
+            # alignments hanging over the start or end of a contig
+            overhang = kind == 2
+            qstart[overhang] = rng.integers(0, qlen[overhang] // 2)
+            qend[overhang] = qlen[overhang] - rng.integers(0, 100, overhang.sum())
+            aligned = np.minimum(qend - qstart, tlen - 1)
+            tstart = (rng.random(n) * (tlen - aligned)).astype(np.int64)
+            atstart = overhang & (rng.random(n) < 0.5)
+            tstart[atstart] = rng.integers(0, 20, atstart.sum())
+            atend = overhang & ~atstart
+            tstart[atend] = tlen[atend] - aligned[atend] - rng.integers(0, 20, atend.sum())
+            tstart = np.maximum(tstart, 0)
+            tend = np.minimum(tstart + aligned, tlen)
+            aligned = tend - tstart
+            strand = np.where(rng.random(n) < 0.5, "+", "-")
+            tp = np.where(kind == 3, "S", "P")
+            mapq = np.where(kind == 3, 0, rng.integers(1, 61, n))
+            reads = first + np.arange(n)
+            reads[kind == 3] = rng.integers(0, first + n, (kind == 3).sum())
+            lines = [
+                "m64011_%08i/%i/ccs\t%i\t%i\t%i\t%s\tptg%06il\t%i\t%i\t%i\t%i\t%i\t%i\ttp:A:%s\tcm:i:%i\n"
+                % (r, r % 9973, ql, qs, qe, s, c, tl, ts, te, a, a, mq, t, a // 50)
+                for r, ql, qs, qe, s, c, tl, ts, te, a, mq, t in zip(
+                    reads.tolist(),
+                    qlen.tolist(),
+                    qstart.tolist(),
+                    qend.tolist(),
+                    strand.tolist(),
+                    (contig + 1).tolist(),
+                    tlen.tolist(),
+                    tstart.tolist(),
+                    tend.tolist(),
+                    aligned.tolist(),
+                    mapq.tolist(),
+                    tp.tolist(),
+                )
+            ]
+            f.write("".join(lines))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, action="store", dest="lines", metavar="LINES", help="define number of alignments")
+    parser.add_argument("-c", type=int, action="store", dest="contigs", default=200, metavar="CONTIGS", help="define number of contigs")
+    parser.add_argument("-s", type=int, action="store", dest="seed", default=1, metavar="SEED", help="define random seed")
+    parser.add_argument("-o", type=str, action="store", dest="out", metavar="PAF", help="define PAF output")
+    args = parser.parse_args()
+    synthetic_paf(args.out, args.lines, args.contigs, args.seed)
@@ -0,0 +1,91 @@
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+TESTDIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTDIR = os.path.join(os.path.dirname(TESTDIR), "scripts")
+HMMFILE = os.path.join(os.path.dirname(TESTDIR), "SSU_Prok_Euk_Microsporidia.hmm")
+
+# contig, length, SSU model emitted into it, strand, start of the SSU
+CONTIGS = [
+    # crosses the cut between the first two pieces of ShardedSSUScan.py -c 1 -s 4 -v 4000
+    ("ctg1", 60000, "SSU_rRNA_bacteria", "+", 36500),
+    ("ctg2", 40000, "RF01960.afa", "-", 15000),
+    # close to the contig start, so its prefilter window is clipped
+    ("ctg3", 30000, "RF02542.afa", "+", 150),
+    ("ctg4", 20000, None, None, None),
+]
+
+
+def emit_ssu(model: str, seed: int) -> str:
+    """
+    One sequence sampled from an SSU model of the pipeline (hmmemit).
+    """
+    hmm = subprocess.run(["hmmfetch", HMMFILE, model], check=True, stdout=subprocess.PIPE).stdout
+    emitted = subprocess.run(["hmmemit", "-N", "1", "--seed", str(seed), "-"], input=hmm, check=True, stdout=subprocess.PIPE).stdout
+    return "".join(emitted.decode().splitlines()[1:]).upper()
+
+
+def reverse_complement(seq: str) -> str:
+    return seq[::-1].translate(str.maketrans("ACGT", "TGCA"))
+
+
+def write_genome(fastafile: str, seed: int):
+    rng = np.random.default_rng(seed)
+    with open(fastafile, "w") as f:
+        for name, length, model, strand, start in CONTIGS:
+            seq = "".join(np.array(list("ACGT"))[rng.integers(0, 4, length)])
+            if model is not None:
+                ssu = emit_ssu(model, seed)
+                if strand == "-":
+                    ssu = reverse_complement(ssu)
+                seq = seq[:start] + ssu + seq[start + len(ssu) :]
+            f.write(">" + name + "\n")
+            for i in range(0, len(seq), 80):
+                f.write(seq[i : i + 80] + "\n")
+
+
+def hmmer_tblout(program: str, fastafile: str, tblfile: str, outdir: str):
+    """
+    Scan like ShardedSSUScan.py does, from outdir so the tblout header holds
+    no absolute paths.
+    """
+    hmmfile = os.path.relpath(HMMFILE, outdir)
+    subprocess.run([program, "--cpu", "1", "--noali", "--tblout", tblfile, "-o", os.devnull, hmmfile, fastafile], cwd=outdir, check=True)
+
+
+def synthetic_ssu_genome(outdir: str, seed: int = 7):
+    """
+    Write a small assembly with SSU genes sampled from the bacterial,
+    eukaryotic and microsporidian models on random background sequence, and
+    the scans of it the SSU tests compare with: the SSUPrefilter.py windows,
+    nhmmscan of the whole assembly and of the windows, and nhmmer of the
+    whole assembly. Needs hmmfetch, hmmemit, nhmmscan and nhmmer.
+
+    args:
+        outdir -> str: output directory (genome.fa, windows.txt, genome.nhmmscan.tbl,
+                       windows.nhmmscan.tbl, genome.nhmmer.tbl)
+        seed -> int: random seed of the background and of hmmemit
+    """
+    os.makedirs(outdir, exist_ok=True)
+    write_genome(os.path.join(outdir, "genome.fa"), seed)
+    windows = os.path.join(outdir, "windows.fa")
+    subprocess.run(
+        [sys.executable, os.path.join(SCRIPTDIR, "SSUPrefilter.py"), "-m", HMMFILE, "-g", os.path.join(outdir, "genome.fa"), "-o", windows, "-t", os.path.join(outdir, "windows.txt")],
+        check=True,
+    )
+    hmmer_tblout("nhmmscan", "genome.fa", "genome.nhmmscan.tbl", outdir)
+    hmmer_tblout("nhmmscan", "windows.fa", "windows.nhmmscan.tbl", outdir)
+    hmmer_tblout("nhmmer", "genome.fa", "genome.nhmmer.tbl", outdir)
+    os.remove(windows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", type=int, action="store", dest="seed", default=7, metavar="SEED", help="define random seed")
+    parser.add_argument("-o", type=str, action="store", dest="out", metavar="OUTDIR", help="define output directory")
+    args = parser.parse_args()
+    synthetic_ssu_genome(args.out, args.seed)
@@ -0,0 +1,59 @@
+import pytest
+
+from conftest import run_script
+from NCBIApiTools import LocalAssemblyIndex
+
+NODES = [
+    # taxid, parent, rank
+    (1, 1, "no rank"),
+    (2, 1, "superkingdom"),
+    (10, 2, "family"),
+    (100, 10, "genus"),
+    (1000, 100, "species"),
+    (1001, 100, "species"),
+]
+
+
+def summary_line(accession, taxid, paired):
+    fields = [accession, "PRJNA1", "SAMN1", "", "na", str(taxid), str(taxid), "organism", "", "", "latest"]
+    fields += ["Complete Genome", "Major", "Full", "2020/01/01", "asm", "submitter", paired, "identical"]
+    return "\t".join(fields) + "\n"
+
+
+@pytest.fixture
+def assembly_index(tmp_path):
+    nodes = tmp_path / "nodes.dmp"
+    nodes.write_text("".join("%i\t|\t%i\t|\t%s\t|\n" % node for node in NODES))
+    refseq = tmp_path / "assembly_summary_refseq.txt"
+    refseq.write_text(
+        "#   See ftp://ftp.ncbi.nlm.nih.gov/genomes/README_assembly_summary.txt\n"
+        + summary_line("GCF_000000001.1", 1000, "GCA_000000001.1")
+        + summary_line("GCF_000000002.2", 1001, "GCA_000000002.1")
+    )
+    genbank = tmp_path / "assembly_summary_genbank.txt"
+    genbank.write_text(
+        # two copies of the refseq assemblies (one of an older version), two genbank only assemblies
+        summary_line("GCA_000000001.1", 1000, "GCF_000000001.1")
+        + summary_line("GCA_000000002.1", 1001, "GCF_000000002.1")
+        + summary_line("GCA_000000003.1", 1000, "na")
+        + summary_line("GCA_000000004.1", 100, "na")
+    )
+    index = tmp_path / "assembly_counts.tsv"
+    run_script("BuildAssemblyIndex.py", "-r", str(refseq), "-g", str(genbank), "-no", str(nodes), "-o", str(index))
+    return LocalAssemblyIndex(str(index))
+
+
+def test_refseq_copies_are_counted_once(assembly_index):
+    assert assembly_index.assembly_count_for_taxon("1000", "refseq") == 1
+    assert assembly_index.assembly_count_for_taxon("1000", "all") == 2
+    assert assembly_index.assembly_count_for_taxon("1000", "genbank") == 1
+    # descendants are included
+    assert assembly_index.assembly_count_for_taxon("10", "refseq") == 2
+    assert assembly_index.assembly_count_for_taxon("10", "all") == 4
+    assert assembly_index.assembly_count_for_taxon("1001", "all") == 1
+    assert assembly_index.assembly_count_for_taxon("999", "all") == 0
+
+
+def test_names_are_not_resolved(assembly_index):
+    with pytest.raises(ValueError):
+        assembly_index.assembly_count_for_taxon("Enterobacteriaceae", "all")
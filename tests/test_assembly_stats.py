@@ -0,0 +1,75 @@
+from conftest import run_script
+
+from AssemblyTools import assembly_stats, gfa_to_fasta, load_assembly_stats
+from FastaTools import write_fai
+
+SEGMENTS = [("ctg1", "ACGT" * 25), ("ctg2", "A" * 160), ("ctg3", ""), ("ctg4", "GATTACA")]
+
+
+def write_gfa(path):
+    path.write_text(
+        "H\tVN:Z:1.0\n"
+        + "".join("S\t%s\t%s\tLN:i:%i\trd:i:10\n" % (name, seq, len(seq)) for name, seq in SEGMENTS)
+        + "L\tctg1\t+\tctg2\t-\t0M\n"
+        + "A\tctg1\t0\t+\tread1\t0\t100\tid:i:1\tHG:A:*\n"
+    )
+
+
+def test_gfa_to_fasta(tmp_path):
+    gfa = tmp_path / "asm.p_ctg.gfa"
+    write_gfa(gfa)
+    fasta = tmp_path / "asm.fa"
+    lengths = gfa_to_fasta(str(gfa), str(fasta), str(fasta) + ".fai")
+    assert lengths == [100, 160, 0, 7]
+    # ctg2 is exactly two full lines, ctg3 has no sequence line
+    assert fasta.read_text() == (
+        ">ctg1\n" + "ACGT" * 20 + "\n" + "ACGT" * 5 + "\n"
+        ">ctg2\n" + "A" * 80 + "\n" + "A" * 80 + "\n"
+        ">ctg3\n"
+        ">ctg4\nGATTACA\n"
+    )
+    assert (tmp_path / "asm.fa.fai").read_text() == (
+        "ctg1\t100\t6\t80\t81\n"
+        "ctg2\t160\t114\t80\t81\n"
+        "ctg3\t0\t282\t0\t0\n"
+        "ctg4\t7\t288\t7\t8\n"
+    )
+    # the index written in the same pass is the index of the written fasta
+    write_fai(str(fasta), str(tmp_path / "reindexed.fai"))
+    assert (tmp_path / "reindexed.fai").read_text() == (tmp_path / "asm.fa.fai").read_text()
+
+
+def test_gfa_to_fasta_script(tmp_path):
+    gfa = tmp_path / "asm.p_ctg.gfa"
+    write_gfa(gfa)
+    stats = tmp_path / "asm.stats.json"
+    out = run_script("GfaToFasta.py", "-g", str(gfa), "-o", str(tmp_path / "asm.fa"), "-s", str(stats), "-e", "1000")
+    assert out.stdout == "4 contigs, 267 bp, N50 160\n"
+    assert load_assembly_stats(str(stats)) == {
+        "contigs": 4,
+        "total_length": 267,
+        "largest": 160,
+        "n50": 160,
+        "l50": 1,
+        # the assembly is smaller than half of the genome size
+        "ng50": None,
+        "lg50": None,
+    }
+
+
+def test_assembly_stats():
+    # sorted 80, 70, 50, 40, 30, 20, 10: half of 300 is reached at 80+70=150
+    stats = assembly_stats([20, 80, 10, 50, 70, 30, 40], genomesize=400)
+    assert stats == {"contigs": 7, "total_length": 300, "largest": 80, "n50": 70, "l50": 2, "ng50": 50, "lg50": 3}
+    # one past the half moves the N50 to the next contig
+    assert assembly_stats([20, 80, 10, 50, 70, 30, 41])["n50"] == 50
+    assert assembly_stats([20, 80, 10, 50, 70, 30, 40], genomesize=601)["ng50"] is None
+
+
+def test_assembly_stats_empty(tmp_path):
+    # what ReportFile reports when hifiasm assembled nothing
+    assert assembly_stats([]) == {"contigs": 0, "total_length": 0, "largest": 0, "n50": 0, "l50": 0, "ng50": None, "lg50": None}
+    assert assembly_stats([], genomesize=1000)["ng50"] is None
+    assert load_assembly_stats(str(tmp_path / "missing.json")) is None
+    (tmp_path / "empty.json").write_text("")
+    assert load_assembly_stats(str(tmp_path / "empty.json")) is None
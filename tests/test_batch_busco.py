@@ -0,0 +1,79 @@
+import os
+
+from conftest import run_script
+
+# Rickettsia is a prefix of the other two genera, Rickettsia.A even with the separator
+GENERA = {"Rickettsia": ["ctg1", "ctg2"], "Rickettsiella": ["ctg1"], "Rickettsia.A": ["ctg1"]}
+HEADER = "# The lineage dataset is: rickettsiales_odb10 (Creation date: 2020-03-06, number of genomes: 44, number of BUSCOs: 364)\n"
+BATCHTABLE = (
+    # one copy in every genus
+    "g1\tDuplicated\tRickettsia.ctg1\t1\t900\t+\t300.0\t300\n"
+    "g1\tDuplicated\tRickettsiella.ctg1\t1\t900\t+\t290.0\t300\n"
+    "g1\tDuplicated\tRickettsia.A.ctg1\t1\t900\t+\t280.0\t300\n"
+    # two copies in Rickettsia
+    "g2\tDuplicated\tRickettsia.ctg1\t1000\t1600\t+\t200.0\t200\n"
+    "g2\tDuplicated\tRickettsia.ctg2\t5\t605\t-\t199.0\t200\n"
+    "g3\tFragmented\tRickettsiella.ctg1\t2000\t2300\t+\t50.0\t100\n"
+    "g4\tMissing\n"
+)
+EXPECTED = {
+    "Rickettsia": (
+        "g1\tComplete\tctg1\t1\t900\t+\t300.0\t300\n"
+        "g2\tDuplicated\tctg1\t1000\t1600\t+\t200.0\t200\n"
+        "g2\tDuplicated\tctg2\t5\t605\t-\t199.0\t200\n"
+        "g3\tMissing\n"
+        "g4\tMissing\n",
+        "\tC:50.0%[S:25.0%,D:25.0%],F:0.0%,M:50.0%,n:4",
+    ),
+    "Rickettsiella": (
+        "g1\tComplete\tctg1\t1\t900\t+\t290.0\t300\n"
+        "g2\tMissing\n"
+        "g3\tFragmented\tctg1\t2000\t2300\t+\t50.0\t100\n"
+        "g4\tMissing\n",
+        "\tC:25.0%[S:25.0%,D:0.0%],F:25.0%,M:50.0%,n:4",
+    ),
+    "Rickettsia.A": (
+        "g1\tComplete\tctg1\t1\t900\t+\t280.0\t300\n"
+        "g2\tMissing\n"
+        "g3\tMissing\n"
+        "g4\tMissing\n",
+        "\tC:25.0%[S:25.0%,D:0.0%],F:0.0%,M:75.0%,n:4",
+    ),
+}
+
+
+def test_batch_and_demultiplex(tmp_path, monkeypatch):
+    # a BUSCO that records the headers of the batch fasta and reports BATCHTABLE
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    busco = bindir / "busco"
+    busco.write_text(
+        "#!/bin/sh\n"
+        "out=$(sed -n 's/^out_path = //p' \"$2\")\n"
+        "grep '>' \"$(sed -n 's/^in = //p' \"$2\")\" > " + str(tmp_path / "headers.txt") + "\n"
+        "mkdir -p \"$out/busco/run_rickettsiales_odb10\"\n"
+        "cp " + str(tmp_path / "batch.tsv") + " \"$out/busco/run_rickettsiales_odb10/full_table.tsv\"\n"
+    )
+    busco.chmod(0o755)
+    (tmp_path / "batch.tsv").write_text(HEADER + BATCHTABLE)
+    monkeypatch.setenv("PATH", str(bindir) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setenv("CONDA_DEFAULT_ENV", str(tmp_path))
+    fastas = []
+    for genus, contigs in GENERA.items():
+        (tmp_path / genus).mkdir()
+        fasta = tmp_path / genus / (genus + ".ctgs.fa")
+        fasta.write_text("".join(">" + contig + " len=1000\nACGT\n" for contig in contigs))
+        fastas.append(str(fasta))
+    lineages = tmp_path / "busco_lineages.txt"
+    lineages.write_text("".join(genus + "\trickettsiales_odb10\n" for genus in GENERA))
+    batchdir = tmp_path / "busco_batch"
+    run_script("BatchBusco.py", "-i", *fastas, "-r", str(tmp_path), "-l", str(lineages), "-d", str(batchdir), "-dl", str(tmp_path / "busco_data"), "-c", "1")
+    assert (tmp_path / "headers.txt").read_text() == ">Rickettsia.ctg1\n>Rickettsia.ctg2\n>Rickettsiella.ctg1\n>Rickettsia.A.ctg1\n"
+    assert os.listdir(batchdir) == ["rickettsiales_odb10.full_table.tsv"]
+    for genus, (table, score) in EXPECTED.items():
+        run_script(
+            "DemultiplexBusco.py", "-g", genus, "-l", str(lineages), "-d", str(batchdir),
+            "-t", str(tmp_path / genus / "full_table.tsv"), "-o", str(tmp_path / genus / "short_summary.txt"),
+        )
+        assert (tmp_path / genus / "full_table.tsv").read_text() == HEADER + table, genus
+        assert (tmp_path / genus / "short_summary.txt").read_text().splitlines()[3] == score, genus
@@ -0,0 +1,63 @@
+import pytest
+
+from BuscoTools import contig_of, duplicated_copies, genes_per_contig, read_busco_hits
+
+CONTIGS = {"ctg", "ctg_1", "node:7", "plain"}
+
+
+@pytest.mark.parametrize(
+    "sequence, contig",
+    [
+        ("plain", "plain"),
+        # prodigal gene number
+        ("plain_12", "plain"),
+        # metaeuk coordinates
+        ("plain:100-1300", "plain"),
+        # the name itself is a contig, not ctg with a gene number
+        ("ctg_1", "ctg_1"),
+        # the longest contig followed by a suffix wins
+        ("ctg_1_3", "ctg_1"),
+        ("ctg_2", "ctg"),
+        ("node:7:5-605", "node:7"),
+        ("node:7_2", "node:7"),
+        # no separator after the contig name
+        ("plainer_1", None),
+        ("unknown_1", None),
+        ("unknown", None),
+    ],
+)
+def test_contig_of(sequence, contig):
+    assert contig_of(sequence, CONTIGS) == contig
+
+
+def test_read_busco_hits(tmp_path):
+    table = tmp_path / "full_table.tsv"
+    table.write_text(
+        "# BUSCO version is: 5.4.3\n"
+        "# Busco id\tStatus\tSequence\tGene Start\tGene End\tStrand\tScore\tLength\n"
+        "g1\tComplete\tplain_1\t10\t910\t+\t300.5\t300\n"
+        "g2\tDuplicated\tctg_1_3\t1\t600\t-\t200.0\t200\n"
+        "g2\tDuplicated\tnode:7:5-605\t5\t605\t+\t199.0\t200\n"
+        "g3\tFragmented\tunknown_2\t1\t90\t+\t30.0\t30\n"
+        "g4\tMissing\n"
+    )
+    hits = read_busco_hits(str(table), CONTIGS)
+    # the genes of missing and dropped copies are still searched genes
+    assert hits["genes"] == ["g1", "g2", "g3", "g4"]
+    assert hits["gene"].tolist() == ["g1", "g2", "g2"]
+    assert hits["status"].tolist() == ["Complete", "Duplicated", "Duplicated"]
+    assert hits["contig"].tolist() == ["plain", "ctg_1", "node:7"]
+    assert hits["start"].tolist() == [10, 1, 5]
+    assert hits["end"].tolist() == [910, 600, 605]
+    assert hits["score"].tolist() == [300.5, 200.0, 199.0]
+    assert genes_per_contig(hits) == {"plain": {"g1"}, "ctg_1": {"g2"}, "node:7": {"g2"}}
+    assert duplicated_copies(hits) == {"g2": [("ctg_1", 1, 600), ("node:7", 5, 605)]}
+
+
+def test_read_busco_hits_nothing_found(tmp_path):
+    table = tmp_path / "full_table.tsv"
+    table.write_text("g1\tMissing\ng2\tComplete\tunknown\t1\t900\t+\t300.0\t300\n")
+    hits = read_busco_hits(str(table), CONTIGS)
+    assert hits["genes"] == ["g1", "g2"]
+    assert all(len(hits[column]) == 0 for column in ("gene", "status", "contig", "start", "end", "score"))
+    assert genes_per_contig(hits) == {}
@@ -0,0 +1,81 @@
+import os
+import subprocess
+
+import pytest
+
+from conftest import run_script
+
+from BuscoTools import gene_status, read_full_table, write_full_table, write_summary
+
+
+def test_no_finished_chunk_writes_no_score(tmp_path, monkeypatch):
+    # a BUSCO that fails on every chunk
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    busco = bindir / "busco"
+    busco.write_text("#!/bin/sh\nexit 1\n")
+    busco.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bindir) + os.pathsep + os.environ["PATH"])
+    reads = tmp_path / "reads.fa"
+    reads.write_text("".join(">r%i\nACGTACGT\n" % i for i in range(10)))
+    config = tmp_path / "busco.ini"
+    config.write_text("[busco_run]\nin = %s\nout = busco\nout_path = %s\nmode = genome\n" % (reads, tmp_path))
+    table = tmp_path / "full_table.tsv"
+    summary = tmp_path / "short_summary.txt"
+    with pytest.raises(subprocess.CalledProcessError):
+        run_script("ChunkedBusco.py", "-i", str(config), "-n", "4", "-c", "8", "-t", str(table), "-o", str(summary))
+    assert not table.exists()
+    assert not summary.exists()
+    assert not (tmp_path / "chunks").exists()
+
+
+HEADER = (
+    "# BUSCO version is: 5.4.3\n"
+    "# The lineage dataset is: bacteria_odb10 (Creation date: 2020-03-06, number of genomes: 4085, number of BUSCOs: 124)\n"
+    "# Busco id\tStatus\tSequence\tGene Start\tGene End\tStrand\tScore\tLength\n"
+)
+CHUNKS = [
+    "g1\tFragmented\tr1\t10\t400\t+\t90.5\t130\n"
+    "g2\tComplete\tr2\t1\t900\t+\t310.2\t300\n"
+    "g3\tFragmented\tr3\t5\t200\t-\t50.1\t65\n"
+    "g4\tMissing\n"
+    "g5\tComplete\tr4\t20\t620\t+\t200.0\t200\n",
+    "g1\tComplete\tr7\t3\t1200\t-\t400.3\t400\n"
+    "g2\tComplete\tr8\t7\t906\t+\t305.9\t300\n"
+    "g3\tFragmented\tr9\t1\t150\t+\t40.0\t50\n"
+    "g4\tMissing\n"
+    "g5\tMissing\n",
+]
+
+
+def test_merge_chunk_tables(tmp_path):
+    genes = {}
+    header = []
+    for i, chunk in enumerate(CHUNKS):
+        table = tmp_path / ("chunk%i.tsv" % i)
+        table.write_text(HEADER + chunk)
+        read_full_table(str(table), genes, header)
+    assert header == HEADER.splitlines(keepends=True)
+    assert [gene_status(genes[gene]) for gene in ("g1", "g2", "g3", "g4", "g5")] == ["Complete", "Duplicated", "Fragmented", "Missing", "Complete"]
+    write_full_table(str(tmp_path / "full_table.tsv"), header, genes)
+    assert (tmp_path / "full_table.tsv").read_text() == HEADER + (
+        # the complete copy of chunk 2 replaces the fragment of chunk 1
+        "g1\tComplete\tr7\t3\t1200\t-\t400.3\t400\n"
+        "g2\tDuplicated\tr2\t1\t900\t+\t310.2\t300\n"
+        "g2\tDuplicated\tr8\t7\t906\t+\t305.9\t300\n"
+        "g3\tFragmented\tr3\t5\t200\t-\t50.1\t65\n"
+        "g4\tMissing\n"
+        "g5\tComplete\tr4\t20\t620\t+\t200.0\t200\n"
+    )
+    write_summary(str(tmp_path / "short_summary.txt"), header, genes, "Results merged over 2 of 2 chunks")
+    summary = (tmp_path / "short_summary.txt").read_text().splitlines()
+    assert summary[:3] == [HEADER.splitlines()[1], "# Results merged over 2 of 2 chunks", ""]
+    assert summary[3] == "\tC:60.0%[S:40.0%,D:20.0%],F:20.0%,M:20.0%,n:5"
+    assert summary[4:] == [
+        "\t3\tComplete BUSCOs (C)",
+        "\t2\tComplete and single-copy BUSCOs (S)",
+        "\t1\tComplete and duplicated BUSCOs (D)",
+        "\t1\tFragmented BUSCOs (F)",
+        "\t1\tMissing BUSCOs (M)",
+        "\t5\tTotal BUSCO groups searched",
+    ]
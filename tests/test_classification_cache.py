@@ -0,0 +1,40 @@
+from multiprocessing import Process
+
+from CacheTools import cache_file as classification_cache_file
+from CacheTools import library_key
+from CacheTools import load_cache as load_classification_cache
+from CacheTools import save_cache as save_classification_cache
+
+
+def save_rows(cachefile, first, n):
+    for i in range(first, first + n):
+        save_classification_cache(cachefile, {"header": None, "rows": {"seq%i" % i: ["row%i" % i]}})
+
+
+def test_concurrent_saves_keep_all_entries(tmp_path):
+    cachefile = classification_cache_file(str(tmp_path / "cache"), "sina", "SILVA 138.1")
+    processes = [Process(target=save_rows, args=(cachefile, 100 * i, 25)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    rows = load_classification_cache(cachefile)["rows"]
+    assert len(rows) == 100
+    assert rows["seq301"] == ["row301"]
+
+
+def test_library_key(tmp_path):
+    library = tmp_path / "refseq.fasta"
+    library.write_text(">NC_000001.1 genome one\nACGT\nACGT\n>NC_000002.2\nGGCC\n>NZ_CP000003.1 plasmid\nTTAA\n")
+    key = library_key(str(library))
+    # the key does not depend on the block boundaries or on the order of the genomes
+    for blockbytes in (1, 5, 17, 1 << 20):
+        assert library_key(str(library), blockbytes=blockbytes) == key
+    reordered = tmp_path / "reordered.fasta"
+    reordered.write_text(">NZ_CP000003.1 plasmid\nTTAA\n>NC_000001.1 genome one\nACGT\nACGT\n>NC_000002.2\nGGCC\n")
+    assert library_key(str(reordered)) == key
+    # a new version of a genome changes it
+    updated = tmp_path / "updated.fasta"
+    updated.write_text(">NC_000001.1 genome one\nACGT\nACGT\n>NC_000002.3\nGGCC\n>NZ_CP000003.1 plasmid\nTTAA\n")
+    assert library_key(str(updated)) != key
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from conftest import run_script
+
+
+def read_text(filename: str) -> str:
+    with open(filename, "r") as f:
+        return f.read()
+
+
+def test_paf_coverage_is_on_the_contigs(tmp_path):
+    # minimap2 runs with the contigs as queries, a contig is covered by all its alignments
+    paffile = tmp_path / "contigs.paf"
+    paffile.write_text(
+        "ctg1\t1000\t0\t600\t+\tNZ_CP000001.1\t50000\t100\t700\t600\t600\t60\ttp:A:P\n"
+        "ctg1\t1000\t500\t700\t-\tNZ_CP000002.1\t40000\t0\t200\t200\t200\t60\ttp:A:P\n"
+        "ctg2\t2000\t0\t500\t+\tNZ_CP000001.1\t50000\t0\t500\t500\t500\t60\ttp:A:P\n"
+        "ctg2\t2000\t900\t950\t+\tNZ_CP000001.1\t50000\t900\t950\t50\t50\t60\ttp:A:P\n"
+    )
+    run_script("ParseNucmer.py", "-p", str(paffile), "-o", str(tmp_path / "overview.txt"))
+    assert read_text(tmp_path / "overview.txt") == "ctg1\t1000\t70.0%\nNOT COMPLETE:\tctg2\t2000\t25.0%\n"
+
+
+def read_overview(overview: str) -> dict:
+    """
+    Completeness and percentage covered of every contig in a ParseNucmer.py overview.
+    """
+    coverage = {}
+    with open(overview, "r") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            coverage[fields[-3]] = (fields[0] != "NOT COMPLETE:", float(fields[-1].rstrip("%")))
+    return coverage
+
+
+def divergence(contig: str) -> float:
+    """
+    Divergence in % a contig of generate_containment.py was copied with.
+    """
+    fields = contig.split("_")
+    if fields[0] == "copy":
+        return float(fields[1])
+    return float(fields[2]) if fields[0] == "chimera" else 0.0
+
+
+@pytest.mark.parametrize(
+    "engine,maxdivergence,tolerance",
+    [
+        # nucmer with the default minimum match of 20 bases loses most of the 20% copies
+        ("nucmer", 16, 2),
+        # minimap2 documents asm5 for up to about 5% and asm20 for up to about 20% divergence
+        ("asm5", 5, 1),
+        ("asm20", 20, 5),
+    ],
+)
+def test_engine_coverage_matches_truth(engine, maxdivergence, tolerance, tmp_path, datadir):
+    from containment_parity import gunzip, run_engine
+
+    containment = os.path.join(datadir, "containment")
+    contigs = str(tmp_path / "contigs.fa")
+    references = str(tmp_path / "references.fa")
+    gunzip(os.path.join(containment, "contigs.fa.gz"), contigs)
+    gunzip(os.path.join(containment, "references.fa.gz"), references)
+    overview = str(tmp_path / "overview.txt")
+    if run_engine(engine, contigs, references, str(tmp_path), overview, 1) is None:
+        pytest.skip(engine + " is not installed")
+    found = read_overview(overview)
+    truth = read_overview(os.path.join(containment, "truth.overview.txt"))
+    checked = [contig for contig in truth if divergence(contig) <= maxdivergence]
+    assert len(checked) >= 20
+    for contig in checked:
+        # contigs without any alignment are not in the overview
+        complete, covered = found.get(contig, (False, 0.0))
+        assert complete == truth[contig][0], contig
+        assert abs(covered - truth[contig][1]) <= tolerance, contig
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from CoverageTools import covered_bases, interval_union
+
+
+def brute_force_union(groups, starts, ends):
+    """
+    Union of half-open intervals per group from the set of covered positions.
+    """
+    positions = {}
+    for group, start, end in zip(groups, starts, ends):
+        positions.setdefault(int(group), set()).update(range(min(start, end), max(start, end)))
+    union = []
+    for group in sorted(positions):
+        covered = sorted(positions[group])
+        for i, pos in enumerate(covered):
+            if i == 0 or pos != covered[i - 1] + 1:
+                union.append([group, pos, pos + 1])
+            else:
+                union[-1][2] = pos + 1
+    return union
+
+
+def as_list(union):
+    return [[int(group), int(start), int(end)] for group, start, end in zip(*union)]
+
+
+@pytest.mark.parametrize(
+    "starts,ends,expected",
+    [
+        ([0, 5], [5, 8], [[0, 0, 8]]),  # touching
+        ([0, 2], [10, 3], [[0, 0, 10]]),  # nested
+        ([2, 0], [3, 10], [[0, 0, 10]]),  # nested, inner first
+        ([0, 6], [5, 8], [[0, 0, 5], [0, 6, 8]]),  # one base apart
+        ([8], [2], [[0, 2, 8]]),  # reversed
+        ([4, 0], [4, 3], [[0, 0, 3]]),  # empty
+        ([-5, -1], [-1, 3], [[0, -5, 3]]),  # negative
+        ([0, 0], [7, 7], [[0, 0, 7]]),  # identical
+    ],
+)
+def test_interval_union_cases(starts, ends, expected):
+    assert as_list(interval_union(np.zeros(len(starts), dtype=np.int64), np.array(starts), np.array(ends))) == expected
+
+
+def test_interval_union_empty_input():
+    groups, starts, ends = interval_union(np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0))
+    assert len(groups) == len(starts) == len(ends) == 0
+    assert covered_bases(np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), 3).tolist() == [0, 0, 0]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_interval_union_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(0, 150))
+    ngroups = int(rng.integers(1, 6))
+    # a small coordinate range gives many touching, nested and identical intervals
+    span = int(rng.integers(5, 400))
+    groups = rng.integers(0, ngroups, n)
+    starts = rng.integers(-span // 4, span, n)
+    ends = starts + rng.integers(-10, max(span // 3, 2), n)
+    union = interval_union(groups, starts, ends)
+    assert as_list(union) == brute_force_union(groups, starts, ends)
+    expected = np.zeros(ngroups, dtype=np.int64)
+    for group, start, end in brute_force_union(groups, starts, ends):
+        expected[group] += end - start
+    assert covered_bases(groups, starts, ends, ngroups).tolist() == expected.tolist()
+
+
+def test_interval_union_group_boundaries():
+    # an interval of one group must not join the next group, however far it reaches
+    groups = np.array([0, 1, 1, 3])
+    starts = np.array([0, 0, 500, 2])
+    ends = np.array([1000, 10, 501, 4])
+    assert as_list(interval_union(groups, starts, ends)) == [[0, 0, 1000], [1, 0, 10], [1, 500, 501], [3, 2, 4]]
+    assert covered_bases(groups, starts, ends, 4).tolist() == [1000, 11, 0, 2]
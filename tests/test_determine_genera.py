@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+from conftest import run_script
+
+
+@pytest.fixture
+def genera(tmp_path, datadir):
+    """
+    Run DetermineGenera.py on tests/data/genera: SILVA genus lines of the kinds
+    GetGenera passes on (homonyms, synonyms, uncultured/environmental lines,
+    chloroplasts, mitochondria, families and orders without genomes, the
+    microsporidia/Acari BLAST lineages) with a matching subset of the NCBI
+    taxonomy and assembly index. The baseline.* outputs were written for it by
+    DetermineGenera.py before the lineages were resolved through resolve().
+    """
+    genera = os.path.join(datadir, "genera")
+    outdir = tmp_path / "genera"
+    outdir.mkdir()
+    run_script(
+        "DetermineGenera.py",
+        "-i", os.path.join(genera, "SSU.reduced.SILVA.genus.txt"),
+        "-t", "family",
+        "-na", os.path.join(genera, "names.dmp"),
+        "-no", os.path.join(genera, "nodes.dmp"),
+        "-od", str(outdir),
+        "-suf", "SSU.genera_taxonomy.txt",
+        "-g", "Blastobasis lacticolella",
+        "-a", os.path.join(genera, "assembly_index.txt"),
+        "-l", str(outdir / "SSU.genera_decisions.json"),
+    )
+    return genera, outdir
+
+
+def read_lines(filename: str) -> list:
+    with open(filename, "r") as f:
+        return f.read().splitlines()
+
+
+def test_prok_matches_baseline(genera):
+    genera, outdir = genera
+    assert read_lines(outdir / "prok.SSU.genera_taxonomy.txt") == read_lines(os.path.join(genera, "baseline.prok.SSU.genera_taxonomy.txt"))
+
+
+def test_euk_matches_baseline(genera):
+    genera, outdir = genera
+    baseline = read_lines(os.path.join(genera, "baseline.euk.SSU.genera_taxonomy.txt"))
+    # the old script wrote a family again for every genus of it, the lines are now written once
+    assert len(set(baseline)) < len(baseline)
+    assert read_lines(outdir / "euk.SSU.genera_taxonomy.txt") == list(dict.fromkeys(baseline))
+
+
+def test_decision_log(genera):
+    genera, outdir = genera
+    with open(outdir / "SSU.genera_decisions.json", "r") as f:
+        decisions = json.load(f)
+    assert [decision["line"] for decision in decisions] == read_lines(os.path.join(genera, "SSU.reduced.SILVA.genus.txt"))
+    bylevel = {decision["line"].split(";")[-2]: decision for decision in decisions}
+    # homonyms are resolved on the SILVA lineage
+    assert {decision["level"] for decision in decisions if decision["sciname"] == "Bacillus"} == {"Bacillaceae", "Bacillidae"}
+    assert bylevel["Blastobasidae"]["decision"] == "species of interest"
+    assert bylevel["Chloroplast"]["decision"] == "not found"
+    assert bylevel["Metarhizium"]["decision"] == "order"
+    assert bylevel["Mermis"]["decision"] == "no genomes"
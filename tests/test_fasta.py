@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from conftest import run_script
+
+from FastaTools import read_fai, write_fai
+
+CASES = {
+    "fixed": ">s1 description\nACGT\nACGT\nAC\n>s2\nAA\n",
+    "trailing_blank_line": ">s1\nACGT\nACGT\n\n>s2\nAA\n",
+    "one_line": ">s1\nACGTACGT\n>s2\nAA\n",
+    "crlf": ">s1\r\nACGT\r\nAC\r\n>s2\r\nAA\r\n",
+    "short_line_inside": ">s1\nACGT\nAC\nACGT\n>s2\nAA\n",
+    "long_line": ">s1\nACGT\nACGTAC\n>s2\nAA\n",
+    "blank_line_inside": ">s1\nACGT\n\nACGT\n>s2\nAA\n",
+    "mixed_line_ends": ">s1\nACGT\r\nACGT\nAC\n>s2\nAA\n",
+}
+INVALID = {"short_line_inside", "long_line", "blank_line_inside", "mixed_line_ends"}
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_write_fai(case, tmp_path):
+    fastafile = tmp_path / "test.fa"
+    fastafile.write_bytes(CASES[case].encode())
+    if case in INVALID:
+        with pytest.raises(ValueError, match="Different line length in sequence 's1'"):
+            write_fai(str(fastafile), str(tmp_path / "test.fa.fai"))
+        assert not os.path.exists(tmp_path / "test.fa.fai")
+    else:
+        write_fai(str(fastafile), str(tmp_path / "test.fa.fai"))
+        sequences = CASES[case].replace("\r", "").split(">")[1:]
+        lengths = [len("".join(sequence.split("\n")[1:])) for sequence in sequences]
+        assert [entry[0] for entry in read_fai(str(tmp_path / "test.fa.fai")).values()] == lengths
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_write_fai_matches_samtools(case, tmp_path):
+    pysam = pytest.importorskip("pysam")
+    fastafile = tmp_path / "test.fa"
+    fastafile.write_bytes(CASES[case].encode())
+    try:
+        pysam.faidx(str(fastafile))
+        samtools = (tmp_path / "test.fa.fai").read_text()
+    except pysam.utils.SamtoolsError:
+        samtools = None
+    try:
+        write_fai(str(fastafile), str(tmp_path / "own.fai"))
+        own = (tmp_path / "own.fai").read_text()
+    except ValueError:
+        own = None
+    assert own == samtools
+
+
+def test_fetch_loci_of_irregular_fasta(tmp_path):
+    seq = "".join("ACGT"[(i * 7 + i // 5) % 4] for i in range(300))
+    # lines of varying length, which write_fai cannot index
+    fastafile = tmp_path / "genome.fa"
+    fastafile.write_text(">ctg1\n" + seq[:70] + "\n" + seq[70:200] + "\n" + seq[200:] + "\n>ctg2\n" + seq[:90] + "\n")
+    run_script("FastaIndex.py", "-f", str(fastafile), "-o", str(tmp_path / "genome.fai"), "-c", str(tmp_path / "genome.indexed.fa"))
+    assert not os.path.islink(tmp_path / "genome.indexed.fa")
+    assert list(read_fai(str(tmp_path / "genome.fai")).values()) == [(300, 6, 80, 81), (90, 316, 80, 81)]
+    (tmp_path / "readsinfo").write_text("ctg1\tSSU_rRNA_bacteria\t1e-160\t1e-160\t61\t240\t179\n")
+    (tmp_path / "micro").write_text("ctg2\tRF02542.afa\t1e-160\t1e-160\t80\t11\t69\n")
+    out = run_script(
+        "FetchSSULoci.py", "-g", str(tmp_path / "genome.indexed.fa"), "-x", str(tmp_path / "genome.fai"),
+        "-i", str(tmp_path / "readsinfo"), "-o", str(tmp_path / "loci.fa"), "-m", str(tmp_path / "micro"), "-n", str(tmp_path / "micro.fa"),
+    )
+    assert out.stdout == ""
+    # sliced as FetchSSUReads.py did
+    assert (tmp_path / "loci.fa").read_text() == ">ctg1\n" + seq[61:240] + "\n"
+    assert (tmp_path / "micro.fa").read_text() == ">ctg2\n" + seq[10:79].translate(str.maketrans("ACGT", "TGCA"))[::-1] + "\n"
+
+
+def test_regular_fasta_is_linked(tmp_path):
+    fastafile = tmp_path / "genome.fa"
+    fastafile.write_text(CASES["fixed"])
+    run_script("FastaIndex.py", "-f", str(fastafile), "-o", str(tmp_path / "genome.fai"), "-c", str(tmp_path / "genome.indexed.fa"))
+    assert os.path.realpath(tmp_path / "genome.indexed.fa") == os.path.realpath(fastafile)
+    assert list(read_fai(str(tmp_path / "genome.fai")).values()) == [(10, 16, 4, 5), (2, 33, 2, 3)]
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from conftest import run_script
+
+from MetricsTools import format_metric, load_metrics, record_metrics
+
+
+def test_record_and_load_metrics(tmp_path):
+    store = str(tmp_path / "metrics.jsonl")
+    assert load_metrics(store) == {}
+    record_metrics(store, "Rickettsia", {"ClassifiedReads": 120, "Busco_ClassifiedReads": None})
+    record_metrics(store, "Wolbachia", {"ClassifiedReads": 7})
+    record_metrics(store, "Rickettsia", {"Busco_Assembly": "C:90.0%[S:90.0%,D:0.0%],F:0.0%,M:10.0%,n:10"})
+    assert load_metrics(store) == {
+        "Rickettsia": {
+            "ClassifiedReads": 120,
+            # a missing BUSCO score stays None
+            "Busco_ClassifiedReads": None,
+            "Busco_Assembly": "C:90.0%[S:90.0%,D:0.0%],F:0.0%,M:10.0%,n:10",
+        },
+        "Wolbachia": {"ClassifiedReads": 7},
+    }
+    # a rerun replaces the earlier values, also by None, and keeps the others
+    record_metrics(store, "Rickettsia", {"ClassifiedReads": 130, "Busco_Assembly": None})
+    assert load_metrics(store)["Rickettsia"] == {"ClassifiedReads": 130, "Busco_ClassifiedReads": None, "Busco_Assembly": None}
+
+
+def test_format_metric():
+    assert format_metric(None) == "NA"
+    assert format_metric(None, "{:.2f}Mb") == "NA"
+    assert format_metric(0) == "0"
+    assert format_metric(1.23456, "{:.2f}Mb") == "1.23Mb"
+
+
+def test_record_metrics_script(tmp_path):
+    (tmp_path / "reads.txt").write_text("r1\nr2\n\nr3\n")
+    (tmp_path / "short_summary.txt").write_text("# BUSCO version is: 5.4.3\n\n\tC:50.0%[S:50.0%,D:0.0%],F:0.0%,M:50.0%,n:4\n\t2\tComplete BUSCOs (C)\n")
+    (tmp_path / "contigs.fa.fai").write_text("ctg1\t1000\t6\t80\t81\nctg2\t500\t1025\t80\t81\nctg3\t10\t1540\t10\t11\n")
+    (tmp_path / "contigs.txt").write_text("ctg1\nctg3\nctg1\nunknown\n")
+    (tmp_path / "kraken.report").write_text(" 12.50\t100\t100\tG\t780\t  Rickettsia\n")
+    (tmp_path / "stats.json").write_text(json.dumps({"contigs": 2}))
+    store = str(tmp_path / "metrics.jsonl")
+    run_script(
+        "RecordMetrics.py", "-m", store, "-g", "Rickettsia",
+        "-c", "ClassifiedReads", str(tmp_path / "reads.txt"),
+        "-c", "Missing", str(tmp_path / "missing.txt"),
+        "-b", "Busco_ClassifiedReads", str(tmp_path / "short_summary.txt"),
+        "-b", "Busco_Assembly", str(tmp_path / "missing_summary.txt"),
+        "-i", "BuscoNucmer_Assembly", str(tmp_path / "contigs.fa.fai"), str(tmp_path / "contigs.txt"),
+        "-k", "ClassifiedReadsPercentage", str(tmp_path / "kraken.report"),
+        "-j", "Re-Assembly_Stats", str(tmp_path / "stats.json"),
+        "-j", "Missing_Stats", str(tmp_path / "missing.json"),
+    )
+    assert load_metrics(store) == {
+        "Rickettsia": {
+            "ClassifiedReads": 3,
+            "Missing": 0,
+            "Busco_ClassifiedReads": "C:50.0%[S:50.0%,D:0.0%],F:0.0%,M:50.0%,n:4",
+            "Busco_Assembly": None,
+            "BuscoNucmer_Assembly_Contigs": 2,
+            "BuscoNucmer_Assembly_ContigLength": 1010,
+            "ClassifiedReadsPercentage": 12.5,
+            "Re-Assembly_Stats": {"contigs": 2},
+            "Missing_Stats": None,
+        }
+    }
+
+
+def write_report_inputs(wd, genus):
+    (wd / "sample.SSU.reads.txt").write_text("ctg1\n")
+    (wd / "sample.SSU.micro.txt").write_text("")
+    (wd / "sample.SSU.reduced.SILVA.genus.txt").write_text("Rickettsia\n")
+    (wd / "sample.SSU.reduced.SILVA.tax").write_text("name\tlca_tax_slv\nctg1\tBacteria;Rickettsia;\n")
+    (wd / "sample.SSU.reduced.fa.clstr").write_text(">Cluster 0\n0\t1500nt, >ctg1... *\n")
+    (wd / "removed.txt").write_text("")
+    (wd / genus / "busco").mkdir(parents=True)
+    (wd / genus / "kraken.reads").write_text("r1\n")
+    (wd / genus / "busco" / "completeness_per_contig.txt").write_text("ctg1\t90.0\n")
+    (wd / genus / (genus + "_vs_contigs.overview.txt")).write_text("GCF_1\t1000\t95.5%\n")
+
+
+def test_report_without_metrics(tmp_path):
+    pytest.importorskip("fpdf")
+    # a working directory of a version that did not record metrics.jsonl
+    write_report_inputs(tmp_path, "Rickettsia")
+    run_script(
+        "ReportFile.py", "-o", str(tmp_path / "sample.report.pdf"), "-r", str(tmp_path / "removed.txt"),
+        "-l", str(tmp_path / "sample.SSU.reads.txt"), "-lm", str(tmp_path / "sample.SSU.micro.txt"),
+    )
+    with open(tmp_path / "sample.json") as f:
+        family = json.load(f)["Families"]["Rickettsia"]
+    for key in ("ClassifiedReads", "ClassifiedReadsPercentage", "Busco_ClassifiedReads", "Busco_Assembly",
+                "BuscoNucmer_Assembly_Reads", "BuscoNucmer_Assembly_Contigs", "Re-Assembly_Stats",
+                "BuscoNucmer_Re-Assembly_Reads", "BuscoNucmer_Re-Assembly_Contigs"):
+        assert family[key] is None, key
+    assert family["BuscoNucmer_Assembly_ContigLength"] == "NA"
+    assert family["BuscoNucmer_Re-Assembly_ContigLength"] == "NA"
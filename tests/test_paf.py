@@ -0,0 +1,101 @@
+import gzip
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from conftest import run_script
+from PafTools import iter_paf_chunks, load_paf_store, store_chunk, store_rows, write_paf_store
+
+
+@pytest.fixture
+def synthetic_paf(tmp_path, datadir):
+    """
+    Synthetic PAF (tests/generate_paf.py -n 4000 -c 30 -s 7) with the .ctgs and
+    .reads written for it by PafAlignment.py before the numpy rewrite.
+    """
+    paffile = str(tmp_path / "synthetic.paf")
+    with gzip.open(os.path.join(datadir, "paf", "synthetic.paf.gz"), "rb") as src, open(paffile, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return paffile
+
+
+def read_text(filename: str) -> str:
+    with open(filename, "r") as f:
+        return f.read()
+
+
+def test_pafalignment_matches_baseline(synthetic_paf, tmp_path, datadir):
+    run_script("PafAlignment.py", "-p", synthetic_paf, "-o", str(tmp_path / "out.ctgs"), "-r", str(tmp_path / "out.reads"))
+    assert read_text(tmp_path / "out.ctgs") == read_text(os.path.join(datadir, "paf", "synthetic.baseline.ctgs"))
+    assert read_text(tmp_path / "out.reads") == read_text(os.path.join(datadir, "paf", "synthetic.baseline.reads"))
+
+
+def test_pafalignment_store_matches_baseline(synthetic_paf, tmp_path, datadir):
+    store = str(tmp_path / "synthetic.paf.store")
+    run_script("PafStore.py", "-p", synthetic_paf, "-o", store)
+    run_script("PafAlignment.py", "-p", store, "-o", str(tmp_path / "out.ctgs"), "-r", str(tmp_path / "out.reads"))
+    assert read_text(tmp_path / "out.ctgs") == read_text(os.path.join(datadir, "paf", "synthetic.baseline.ctgs"))
+    assert read_text(tmp_path / "out.reads") == read_text(os.path.join(datadir, "paf", "synthetic.baseline.reads"))
+
+
+def test_mappedcontigs_store_matches_reads_file(synthetic_paf, tmp_path, datadir):
+    store = str(tmp_path / "synthetic.paf.store")
+    run_script("PafStore.py", "-p", synthetic_paf, "-o", store)
+    mapping = os.path.join(datadir, "paf", "synthetic.baseline.ctgs")
+    fromstore = run_script("MappedContigs.py", "-m", mapping, "-s", store).stdout
+    fromreads = run_script("MappedContigs.py", "-m", mapping, "-r", os.path.join(datadir, "paf", "synthetic.baseline.reads")).stdout
+    # the reads are sorted and made unique in the Snakefile
+    assert len(fromstore) > 0
+    assert sorted(fromstore.splitlines()) == sorted(fromreads.splitlines())
+
+
+def test_store_lookup(synthetic_paf, tmp_path):
+    store = str(tmp_path / "synthetic.paf.store")
+    # small blocks, so the store and its contig index are written over several blocks
+    write_paf_store(synthetic_paf, store, chunkbytes=4096, blockrows=1000)
+    store = load_paf_store(store)
+    whole = next(iter_paf_chunks(synthetic_paf))
+    for key, column in (("t", "tname"), ("q", "qname")):
+        names = [name.decode() for name in np.unique(whole[column])[::7]]
+        rows = store_chunk(store, store_rows(store, key, names + ["unknown"]))["row"]
+        expected = np.flatnonzero(np.isin(whole[column], np.array(names, dtype=bytes)))
+        assert sorted(rows.tolist()) == expected.tolist()
+    # the rows of a contig are one range, in PAF order
+    rows = store_rows(store, "t", ["ptg000003l"])
+    assert np.array_equal(rows, np.arange(rows[0], rows[-1] + 1))
+    chunk = store_chunk(store, rows)
+    assert np.all(np.diff(chunk["row"]) > 0)
+    everything = store_chunk(store, slice(None))
+    assert sorted(everything["row"].tolist()) == list(range(len(whole["qname"])))
+    for name in ("qname", "tname", "qlen", "qstart", "qend", "tlen", "tstart", "tend", "strand", "tp"):
+        assert np.array_equal(chunk[name], whole[name][chunk["row"]]), name
+        assert np.array_equal(everything[name], whole[name][everything["row"]]), name
+
+def test_empty_store(tmp_path):
+    store = str(tmp_path / "empty.paf.store")
+    run_script("PafStore.py", "-p", os.devnull, "-o", store)
+    assert len(store_rows(load_paf_store(store), "t", ["ptg000001l"])) == 0
+    run_script("PafAlignment.py", "-p", store, "-o", str(tmp_path / "out.ctgs"), "-r", str(tmp_path / "out.reads"))
+    assert read_text(tmp_path / "out.ctgs") == read_text(tmp_path / "out.reads") == ""
+
+
+def test_paf_blocks_match_whole_file(synthetic_paf):
+    whole = next(iter_paf_chunks(synthetic_paf, chunkbytes=1 << 30))
+    blocks = list(iter_paf_chunks(synthetic_paf, chunkbytes=4096))
+    assert len(blocks) > 1
+    for name, column in whole.items():
+        assert np.array_equal(np.concatenate([block[name] for block in blocks]), column), name
+
+
+def test_one_base_gap_is_not_covered(tmp_path):
+    # the old sort_condense joined intervals one base apart, counting the gap as covered
+    paffile = tmp_path / "gap.paf"
+    paffile.write_text(
+        "r1\t1000\t0\t1000\t+\tc1\t2000\t0\t1000\t1000\t1000\t60\ttp:A:P\n"
+        "r2\t999\t0\t999\t+\tc1\t2000\t1001\t2000\t999\t999\t60\ttp:A:P\n"
+    )
+    run_script("PafAlignment.py", "-p", str(paffile), "-o", str(tmp_path / "gap.ctgs"), "-r", str(tmp_path / "gap.reads"))
+    assert read_text(tmp_path / "gap.ctgs") == "c1\t2000\t99.95%\n"
+    assert read_text(tmp_path / "gap.reads") == "c1\tr1,r2\n"
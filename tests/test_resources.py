@@ -0,0 +1,38 @@
+from ResourceTools import add_benchmark, chunk_runs, fit_resource_model, job_mem_mb, load_resource_model
+
+
+def test_job_mem_mb_is_clamped():
+    model = load_resource_model(None)
+    assert job_mem_mb(model, "Map2Assembly", 100000) > 64000
+    assert job_mem_mb(model, "Map2Assembly", 100000, max_mem_mb=64000) == 64000
+    assert job_mem_mb(model, "Map2Assembly", None, max_mem_mb=1000) == 1000
+
+
+def test_job_mem_mb_of_several_runs():
+    model = load_resource_model(None)
+    assert job_mem_mb(model, "RunBuscoReads", 10, runs=4) == 4 * job_mem_mb(model, "RunBuscoReads", 10)
+
+
+def test_chunk_runs(tmp_path):
+    fastafile = tmp_path / "reads.fa"
+    fastafile.write_text("".join(">r%i\n%s\n" % (i, "ACGT" * 25) for i in range(1000)))
+    size = fastafile.stat().st_size / 1e6
+    # 1000 reads in chunks of 100: 10 chunks, one run per 4 threads
+    runsize, runs = chunk_runs(str(fastafile), 100, 16)
+    assert runs == 4
+    assert abs(runsize - size / 10) < 1e-9
+    # fewer chunks than runs
+    runsize, runs = chunk_runs(str(fastafile), 400, 64)
+    assert runs == 3
+    assert chunk_runs(str(tmp_path / "missing.fa"), 100, 16) == (None, 4)
+
+
+def test_fit_memory_per_run():
+    model = load_resource_model(None)
+    for i, (size, runsize, runs) in enumerate([(100, 10, 4), (200, 20, 4), (400, 40, 2)]):
+        add_benchmark(model, "RunBuscoReads", str(i), size, 10 * size, runs * (1000 + 50 * runsize), runsize, runs)
+    fit_resource_model(model)
+    coef = model["rules"]["RunBuscoReads"]
+    assert abs(coef["mem_mb"] - 1000) < 1e-6
+    assert abs(coef["mem_mb_per_mb"] - 50) < 1e-6
+    assert abs(coef["cpu_s_per_mb"] - 10) < 1e-6
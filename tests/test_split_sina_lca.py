@@ -0,0 +1,31 @@
+import csv
+
+from conftest import run_script
+
+SINA = [
+    ["name", "align_ident_slv", "lca_tax_embl_ebi_ena", "lca_tax_slv", "lca_tax_ltp", "nearest_slv"],
+    ["ctg1", "98.5", "Bacteria;Proteobacteria;Wolbachia;", "Bacteria;Proteobacteria;Alphaproteobacteria;Wolbachia;", "Bacteria;Pseudomonadota;Wolbachia;", "AB001 98.9"],
+    # a comma inside a field is quoted by SINA
+    ["ctg2", "91.2", "Bacteria;Firmicutes;Candidatus Xiphinematobacter, uncultured;", "Unclassified;", "Bacteria;", "AB002 91.0,AB003 90.8"],
+]
+
+
+def test_split_three_lca_fields(tmp_path):
+    sina = tmp_path / "sina.csv"
+    with open(sina, "w", newline="") as f:
+        csv.writer(f, lineterminator="\n").writerows(SINA)
+    run_script("SplitSinaLCA.py", "-i", str(sina), "-o", str(tmp_path / "split.csv"), "-t", str(tmp_path / "split.tax"))
+    with open(tmp_path / "split.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    blocks = [rows[i : i + 3] for i in range(0, len(rows), 3)]
+    assert len(blocks) == 3
+    for lca, block in zip((2, 3, 4), blocks):
+        # the columns of a SINA run with one lca field
+        assert block == [[row[0], row[1], row[lca], row[5]] for row in SINA]
+    assert (tmp_path / "split.csv").read_text().count("\r") == 0
+    tax = (tmp_path / "split.tax").read_text().splitlines()
+    assert tax == [
+        "name\tlca_tax_embl_ebi_ena", "ctg1\t" + SINA[1][2], "ctg2\t" + SINA[2][2],
+        "name\tlca_tax_slv", "ctg1\t" + SINA[1][3], "ctg2\t" + SINA[2][3],
+        "name\tlca_tax_ltp", "ctg1\t" + SINA[1][4], "ctg2\t" + SINA[2][4],
+    ]
@@ -0,0 +1,255 @@
+import math
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+from conftest import run_script
+
+from FastaTools import read_fasta
+from SSUTools import (
+    CODES,
+    best_ssu_hits,
+    consensus_kmers,
+    kmer_hits,
+    kmer_values,
+    kmer_windows,
+    near_cut,
+    nhmmer_to_nhmmscan,
+    read_consensus,
+    read_hmm_models,
+    read_window_table,
+    remap_tblout_line,
+    write_shards,
+)
+
+HMMFILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "SSU_Prok_Euk_Microsporidia.hmm")
+
+
+def tblout_hits(tblfile):
+    """
+    E-value of every hit of an nhmmscan tblout, by model, sequence, model
+    and sequence coordinates and strand.
+    """
+    hits = {}
+    with open(tblfile) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            fields = line.split()
+            hits[(fields[0], fields[2], *map(int, fields[4:10]), fields[11])] = float(fields[12])
+    return hits
+
+
+def assert_same_hits(found, expected):
+    assert sorted(found) == sorted(expected)
+    for hit, evalue in expected.items():
+        # E-values are written with two significant digits
+        assert math.isclose(found[hit], evalue, rel_tol=0.1), hit
+
+
+def readsinfo(tmp_path, tblfile, engine="nhmmscan"):
+    """
+    GetReadsSSU.py rows of a tblout, prokaryotic then microsporidian, as lists of fields.
+    """
+    out = [str(tmp_path / name) for name in ("info", "list", "infomicro", "listmicro")]
+    run_script("GetReadsSSU.py", "-i", tblfile, "-e", engine, "-o", out[0], "-l", out[1], "-m", out[2], "-n", out[3])
+    rows = []
+    for name in (out[0], out[2]):
+        with open(name) as f:
+            rows += [line.rstrip("\n").split("\t") for line in f]
+    return rows
+
+
+def assert_same_readsinfo(found, expected):
+    assert [row[:2] + row[4:] for row in found] == [row[:2] + row[4:] for row in expected]
+    for row, other in zip(found, expected):
+        assert math.isclose(float(row[2]), float(other[2]), rel_tol=0.1)
+        assert math.isclose(float(row[3]), float(other[3]), rel_tol=0.1)
+
+
+def tblout_line(window, alifrom, alito, strand, evalue):
+    return "SSU_rRNA_bacteria RF00177 %s - 1 1533 %i %i %i %i 1533 %s %s 500.0 1.0 Bacterial small subunit ribosomal RNA\n" % (window, alifrom, alito, alifrom, alito, strand, evalue)
+
+
+def test_kmer_values():
+    codes = CODES[np.frombuffer(b"ACGTNacg", dtype=np.uint8)]
+    # A=0, C=1, G=2, T=3
+    assert kmer_values(codes, 3).tolist() == [0b000110, 0b011011, -1, -1, -1, 0b000110]
+    assert kmer_values(codes, 9).tolist() == []
+
+
+def test_kmer_hits_across_slices():
+    rng = np.random.default_rng(3)
+    seq = bytes(np.frombuffer(b"ACGT", dtype=np.uint8)[rng.integers(0, 4, 500)])
+    k = 5
+    kmers = np.unique(kmer_values(CODES[np.frombuffer(seq[100:140], dtype=np.uint8)], k))
+    expected = [i for i in range(len(seq) - k + 1) if seq[i : i + k] in {seq[j : j + k] for j in range(100, 136)}]
+    assert kmer_hits(seq, k, kmers).tolist() == expected
+    # k-mers spanning the end of a slice are still found
+    assert kmer_hits(seq, k, kmers, slicelen=7).tolist() == expected
+
+
+def test_consensus_kmers_find_the_minus_strand():
+    consensus = read_consensus(HMMFILE)
+    assert len(consensus) == 4
+    kmers = consensus_kmers(consensus, 12)
+    cons = consensus[0]
+    minus = cons.translate(bytes.maketrans(b"ACGT", b"TGCA"))[::-1]
+    assert len(kmer_hits(cons, 12, kmers)) == len(kmer_hits(minus, 12, kmers)) == len(cons) - 11
+
+
+def test_kmer_windows():
+    pos = np.array([100, 300, 500, 700, 900, 5000, 5100, 9000, 9100, 9200, 9300, 9400])
+    starts, ends = kmer_windows(pos, 9500, 12, 5, 1000, 2000)
+    # the two hits at 5000 are too few, the windows of both loci are clipped to the sequence
+    assert starts.tolist() == [0, 7000]
+    assert ends.tolist() == [2912, 9500]
+    # overlapping flanks join the windows of the last two loci
+    starts, ends = kmer_windows(pos, 9500, 12, 2, 1000, 2000)
+    assert starts.tolist() == [0, 3000]
+    assert ends.tolist() == [2912, 9500]
+    assert kmer_windows(pos[:3], 9500, 12, 5, 1000, 2000)[0].tolist() == []
+
+
+def test_remap_tblout_line(tmp_path):
+    table = tmp_path / "windows.txt"
+    table.write_text("ctg/1001-3000\tctg\t1000\t2000\t100000\n")
+    windows = read_window_table(str(table))
+    assert remap_tblout_line("# comment\n", windows) == "# comment\n"
+    fields = remap_tblout_line(tblout_line("ctg/1001-3000", 11, 1510, "+", "1e-160"), windows).split()
+    assert fields[2] == "ctg"
+    assert fields[6:10] == ["1011", "2510", "1011", "2510"]
+    assert float(fields[12]) == pytest.approx(5e-159)
+    assert " ".join(fields[15:]) == "Bacterial small subunit ribosomal RNA"
+    # minus strand, ending on the last base of the window
+    fields = remap_tblout_line(tblout_line("ctg/1001-3000", 2000, 501, "-", "1e-160"), windows).split()
+    assert fields[6:10] == ["3000", "1501", "3000", "1501"]
+    assert fields[11] == "-"
+    # not reported by a scan of the whole contig
+    assert remap_tblout_line(tblout_line("ctg/1001-3000", 11, 60, "+", "0.3"), windows) == ""
+
+
+def test_prefilter_windows_match_fixture(tmp_path, datadir):
+    ssudir = os.path.join(datadir, "ssu")
+    table = tmp_path / "windows.txt"
+    run_script("SSUPrefilter.py", "-m", HMMFILE, "-g", os.path.join(ssudir, "genome.fa"), "-o", str(tmp_path / "windows.fa"), "-t", str(table))
+    with open(os.path.join(ssudir, "windows.txt")) as f:
+        assert table.read_text() == f.read()
+
+
+def test_window_scan_recovers_every_hit(tmp_path, datadir):
+    # windows.nhmmscan.tbl is the scan of the windows in windows.txt, which
+    # test_prefilter_windows_match_fixture checks against SSUPrefilter.py
+    ssudir = os.path.join(datadir, "ssu")
+    remapped = tmp_path / "remapped.tbl"
+    run_script("SSUWindowHits.py", "-i", os.path.join(ssudir, "windows.nhmmscan.tbl"), "-t", os.path.join(ssudir, "windows.txt"), "-o", str(remapped))
+    expected = tblout_hits(os.path.join(ssudir, "genome.nhmmscan.tbl"))
+    # a plus and a minus strand gene, and one whose window is clipped at the contig start
+    assert {(hit[1], hit[-1]) for hit in expected} == {("ctg1", "+"), ("ctg2", "-"), ("ctg3", "+")}
+    assert_same_hits(tblout_hits(str(remapped)), expected)
+
+
+@pytest.mark.skipif(shutil.which("nhmmscan") is None, reason="needs nhmmscan")
+def test_window_scan_recovers_every_hit_live(tmp_path, datadir):
+    ssudir = os.path.join(datadir, "ssu")
+    windows = tmp_path / "windows.fa"
+    table = tmp_path / "windows.txt"
+    run_script("SSUPrefilter.py", "-m", HMMFILE, "-g", os.path.join(ssudir, "genome.fa"), "-o", str(windows), "-t", str(table))
+    subprocess.run(["nhmmscan", "--cpu", "1", "--noali", "--tblout", str(tmp_path / "windows.tbl"), "-o", os.devnull, HMMFILE, str(windows)], check=True)
+    run_script("SSUWindowHits.py", "-i", str(tmp_path / "windows.tbl"), "-t", str(table), "-o", str(tmp_path / "remapped.tbl"))
+    assert_same_hits(tblout_hits(str(tmp_path / "remapped.tbl")), tblout_hits(os.path.join(ssudir, "genome.nhmmscan.tbl")))
+
+
+def test_write_shards(tmp_path, datadir):
+    genome = os.path.join(datadir, "ssu", "genome.fa")
+    seqs = dict(read_fasta(genome))
+    shards, pieces = write_shards(genome, str(tmp_path / "shard"), 4, 37500, 4000)
+    written = {}
+    for shard, bases in shards:
+        shardseqs = dict(read_fasta(shard))
+        assert sum(len(seq) for seq in shardseqs.values()) == bases
+        written.update(shardseqs)
+    assert sorted(written) == sorted(pieces)
+    assert max(bases for shard, bases in shards) - min(bases for shard, bases in shards) <= max(piece[2] for piece in pieces.values())
+    for name, seq in seqs.items():
+        cuts = sorted((offset, piecelen, piece) for piece, (contig, offset, piecelen, length) in pieces.items() if contig == name)
+        assert cuts[0][0] == 0
+        assert cuts[-1][0] + cuts[-1][1] == len(seq)
+        for (offset, piecelen, piece), (nextoffset, _, _) in zip(cuts, cuts[1:]):
+            assert offset + piecelen - nextoffset == 4000
+        for offset, piecelen, piece in cuts:
+            assert written[piece] == seq[offset : offset + piecelen]
+    # the bacterial SSU at 36501-38130 crosses the cut at 37500
+    assert sorted(piece for piece in pieces if piece.startswith("ctg1/")) == ["ctg1/1-41500", "ctg1/37501-60000"]
+
+
+def test_near_cut():
+    pieces = {"ctg/1-41500": ("ctg", 0, 41500, 60000), "ctg/37501-60000": ("ctg", 37500, 22500, 60000)}
+    # the start of the contig and the end of the last piece are not cuts
+    assert not near_cut(tblout_line("ctg/1-41500", 1, 1500, "+", "1e-160"), pieces, 400)
+    assert not near_cut(tblout_line("ctg/37501-60000", 22500, 21001, "-", "1e-160"), pieces, 400)
+    assert near_cut(tblout_line("ctg/1-41500", 41200, 40001, "-", "1e-160"), pieces, 400)
+    assert near_cut(tblout_line("ctg/37501-60000", 2, 628, "+", "1e-160"), pieces, 400)
+    assert not near_cut(tblout_line("ctg/37501-60000", 401, 1628, "+", "1e-160"), pieces, 400)
+
+
+@pytest.mark.skipif(shutil.which("nhmmscan") is None, reason="needs nhmmscan")
+def test_sharded_scan_matches_unsharded(tmp_path, datadir):
+    ssudir = os.path.join(datadir, "ssu")
+    merged = str(tmp_path / "sharded.tbl")
+    # 4 shards of 37500 bases with 4 kb overlap, so the bacterial SSU of ctg1 is cut (test_write_shards)
+    run_script("ShardedSSUScan.py", "-m", HMMFILE, "-f", os.path.join(ssudir, "genome.fa"), "-c", "1", "-s", "4", "-v", "4000", "-e", "nhmmscan", "-o", merged, "-l", str(tmp_path / "sharded.log"))
+    assert_same_hits(tblout_hits(merged), tblout_hits(os.path.join(ssudir, "genome.nhmmscan.tbl")))
+    expected = readsinfo(tmp_path, os.path.join(ssudir, "genome.nhmmscan.tbl"))
+    assert [row[0] for row in expected] == ["ctg1", "ctg2"]
+    assert_same_readsinfo(readsinfo(tmp_path, merged), expected)
+
+
+def nhmmer_layout(tblfile, outfile):
+    """
+    nhmmscan tblout rewritten with the models as queries, as nhmmer writes it.
+    """
+    with open(tblfile) as f, open(outfile, "w") as out:
+        for line in f:
+            if not line.startswith("#"):
+                fields = line.split()
+                line = " ".join(fields[2:4] + fields[0:2] + fields[4:]) + "\n"
+            out.write(line)
+
+
+def test_readsinfo_of_both_layouts(tmp_path, datadir):
+    ssudir = os.path.join(datadir, "ssu")
+    nhmmscan = os.path.join(ssudir, "genome.nhmmscan.tbl")
+    nhmmer_layout(nhmmscan, str(tmp_path / "hits.nhmmer.tbl"))
+    expected = readsinfo(tmp_path, nhmmscan)
+    assert [row[:2] for row in expected] == [["ctg1", "SSU_rRNA_bacteria"], ["ctg2", "RF01960.afa"]]
+    assert readsinfo(tmp_path, str(tmp_path / "hits.nhmmer.tbl"), "nhmmer") == expected
+    # nhmmer itself finds the same best hits, listed by model; its E-values are on the whole assembly
+    found = readsinfo(tmp_path, os.path.join(ssudir, "genome.nhmmer.tbl"), "nhmmer")
+    assert sorted(row[:2] + row[4:] for row in found) == [row[:2] + row[4:] for row in expected]
+
+
+def test_nhmmer_hits_match_nhmmscan(tmp_path, datadir):
+    ssudir = os.path.join(datadir, "ssu")
+    models = read_hmm_models(HMMFILE)
+    converted = tmp_path / "converted.tbl"
+    with open(os.path.join(ssudir, "genome.nhmmer.tbl")) as f, open(converted, "w") as out:
+        for line in f:
+            out.write(nhmmer_to_nhmmscan(line, models))
+    nhmmscan = os.path.join(ssudir, "genome.nhmmscan.tbl")
+    assert set(tblout_hits(str(converted))) == set(tblout_hits(nhmmscan))
+    with open(converted) as f:
+        line = next(line for line in f if not line.startswith("#"))
+    assert line.split(None, 15)[10] == str(models[line.split()[0]][0])
+    found = best_ssu_hits(str(converted))
+    expected = best_ssu_hits(nhmmscan)
+    assert sorted(found) == sorted(expected) == ["ctg1", "ctg2", "ctg3"]
+    for seq, (best, domains) in expected.items():
+        # same best model and domains; the E-values are on the whole assembly for nhmmer
+        assert found[seq][0][2:] == best[2:]
+        assert {model: hit[2:] for model, hit in found[seq][1].items()} == {model: hit[2:] for model, hit in domains.items()}
+        # nhmmer E-values, scaled from the assembly to the sequence, are about 4 times lower than those of nhmmscan
+        length = {"ctg1": 60000, "ctg2": 40000, "ctg3": 30000}[seq]
+        assert 3 < best[0] / (found[seq][0][0] * length / 150000) < 5